@@ -1,4 +1,7 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models import CharField
+from django.db.models.functions import Lower
 
 
 class ApiConfig(AppConfig):
@@ -7,3 +10,10 @@ class ApiConfig(AppConfig):
 
     def ready(self):
         import api.signals  # noqa
+        from api.services.metrics import install_sql_timing
+
+        # Запросы к БД учитываются в замерах запроса API во всех потоках
+        connection_created.connect(install_sql_timing)
+
+        # Позволяет писать в фильтрах slug__lower для сравнения через LOWER()
+        CharField.register_lookup(Lower)
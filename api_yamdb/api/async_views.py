@@ -0,0 +1,245 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import (
+    ObjectDoesNotExist,
+    SynchronousOnlyOperation,
+    ValidationError,
+)
+from django.http import HttpResponse
+from django.urls import URLPattern
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from reviews.models import Review, Title
+
+from .db_routers import (
+    CATALOGUE_PIN,
+    ais_pinned,
+    replicas_enabled,
+    routing_scope,
+    use_replica,
+)
+from .services.cache import (
+    aget_generation,
+    build_key,
+    get_etag,
+    is_not_modified,
+)
+from .services.metrics import timed_serializer_class
+from .views import (
+    CategoryViewSet,
+    CommentViewSet,
+    GenreViewSet,
+    ReviewViewSet,
+    TitleViewSet,
+)
+
+
+def not_found(model):
+    """Ошибка с тем же текстом, что у get_object_or_404."""
+    return NotFound(f'No {model._meta.object_name} matches the given query.')
+
+
+class AsyncReadHandler:
+    """Асинхронное чтение списка и объекта для ASGI.
+
+    Повторяет ответы синхронных вьюсетов для анонимных GET-запросов
+    без фильтров: данные читаются асинхронным ORM, ответы каталога
+    кэшируются под теми же ключами, что и в CachedListViewset.
+    Queryset, сериализатор, пагинация и параметры кэша берутся из
+    вьюсета маршрута viewset_class (обязательный атрибут).
+    Остальные запросы (с токеном, фильтрами, поиском, курсором)
+    обрабатывает синхронный вьюсет, см. supports. Обработчик один
+    на маршрут, поэтому не хранит состояние запроса.
+    """
+    viewset_class = None
+    actions = ('list', 'retrieve')
+    supported_params = ('limit', 'offset')
+
+    def __init__(self):
+        assert self.viewset_class is not None, (
+            f'{type(self).__name__} должен задать viewset_class.')
+
+    @property
+    def cache_query_params(self):
+        """Параметры ключа кэша; None - ответы не кэшируются."""
+        return getattr(self.viewset_class, 'cache_query_params', None)
+
+    def supports(self, request, kwargs):
+        return (request.method == 'GET'
+                and 'format' not in kwargs
+                and 'Authorization' not in request.headers
+                and set(request.GET) <= set(self.supported_params))
+
+    async def check_parent(self, kwargs):
+        """Проверяет, что родитель публикаций существует."""
+
+    async def handle(self, request, action, kwargs):
+        with routing_scope():
+            if replicas_enabled() and not (
+                    self.viewset_class.pin_after_catalogue_change
+                    and await ais_pinned(CATALOGUE_PIN)):
+                use_replica()
+            try:
+                if self.cache_query_params is None:
+                    return self.render(
+                        await self.get_data(request, action, kwargs))
+                return await self.cached(request, action, kwargs)
+            except NotFound as error:
+                return self.render({'detail': error.detail},
+                                   status.HTTP_404_NOT_FOUND)
+
+    async def cached(self, request, action, kwargs):
+        """Асинхронный вариант cached_response."""
+        key = build_key(request, self.cache_query_params,
+                        await aget_generation())
+        etag = get_etag(key)
+        if is_not_modified(request, etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            data = await cache.aget(key)
+            if data is None:
+                data = await self.get_data(request, action, kwargs)
+                await cache.aset(key, data, settings.CATALOGUE_CACHE_TIMEOUT)
+            response = self.render(data)
+        response['ETag'] = etag
+        return response
+
+    def render(self, data, response_status=status.HTTP_200_OK):
+        """Ответ как у JSONRenderer DRF."""
+        response = HttpResponse(JSONRenderer().render(data),
+                                content_type='application/json',
+                                status=response_status)
+        response['Vary'] = 'Accept'
+        return response
+
+    async def get_data(self, request, action, kwargs):
+        await self.check_parent(kwargs)
+        queryset = self.viewset_class.get_read_queryset(action, kwargs)
+        if action == 'retrieve':
+            try:
+                obj = await queryset.aget(pk=kwargs['pk'])
+            except (ObjectDoesNotExist, ValueError, TypeError,
+                    ValidationError):
+                raise not_found(queryset.model)
+            return await self.serialize(action, obj)
+
+        drf_request = Request(request)
+        paginator = self.viewset_class.pagination_class()
+        paginator.request = drf_request
+        paginator.use_cursor = False
+        paginator.limit = paginator.get_limit(drf_request)
+        paginator.offset = paginator.get_offset(drf_request)
+        paginator.count = await queryset.acount()
+        page = [obj async for obj in queryset[
+            paginator.offset:paginator.offset + paginator.limit]]
+        return paginator.get_paginated_response(
+            await self.serialize(action, page, many=True)).data
+
+    async def serialize(self, action, data, many=False):
+        serializer_class = self.viewset_class.get_read_serializer_class(
+            action)
+        if settings.PERFORMANCE_METRICS_ENABLED:
+            serializer_class = timed_serializer_class(serializer_class)
+        try:
+            return serializer_class(data, many=many).data
+        except SynchronousOnlyOperation:
+            # Сериализатору не хватило загруженных данных (например,
+            # у произведения еще нет представления): повтор в потоке
+            return await sync_to_async(
+                lambda: serializer_class(data, many=many).data)()
+
+
+class TitleReadHandler(AsyncReadHandler):
+    viewset_class = TitleViewSet
+
+
+class CategoryReadHandler(AsyncReadHandler):
+    viewset_class = CategoryViewSet
+    actions = ('list',)
+
+
+class GenreReadHandler(CategoryReadHandler):
+    viewset_class = GenreViewSet
+
+
+class ReviewReadHandler(AsyncReadHandler):
+    viewset_class = ReviewViewSet
+
+    async def check_parent(self, kwargs):
+        if not await Title.objects.filter(id=kwargs['title_id']).aexists():
+            raise not_found(Title)
+
+
+class CommentReadHandler(AsyncReadHandler):
+    viewset_class = CommentViewSet
+
+    async def check_parent(self, kwargs):
+        if not await Review.objects.filter(
+                id=kwargs['review_id'], title=kwargs['title_id']).aexists():
+            raise not_found(Review)
+
+
+# Имена маршрутов роутера и их асинхронные обработчики
+ASYNC_READ_HANDLERS = {
+    'titles': TitleReadHandler(),
+    'categories': CategoryReadHandler(),
+    'genres': GenreReadHandler(),
+    'reviews': ReviewReadHandler(),
+    'comments': CommentReadHandler(),
+}
+
+
+def async_read_view(sync_view, handler, action):
+    """Асинхронное представление маршрута: запросы, которые поддерживает
+    обработчик, выполняются в цикле событий, остальные передаются
+    синхронному вьюсету в поток."""
+
+    @csrf_exempt
+    async def view(request, *args, **kwargs):
+        if handler.supports(request, kwargs):
+            return await handler.handle(request, action, kwargs)
+        return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+    view.cls = sync_view.cls
+    view.initkwargs = sync_view.initkwargs
+    return view
+
+
+class AsyncReadURLPattern(URLPattern):
+    """Маршрут роутера, который при включенной настройке
+    ASYNC_READ_VIEWS отдает асинхронное представление.
+
+    Настройка проверяется при каждом разрешении адреса: под WSGI
+    асинхронное представление выполнялось бы через async_to_sync
+    и только замедляло бы ответ.
+    """
+
+    def __init__(self, pattern, async_view):
+        super().__init__(pattern.pattern, pattern.callback,
+                         pattern.default_args, pattern.name)
+        self.async_view = async_view
+
+    def resolve(self, path):
+        match = super().resolve(path)
+        if match is not None and settings.ASYNC_READ_VIEWS:
+            match.func = self.async_view
+        return match
+
+
+def with_async_reads(urlpatterns):
+    """Подменяет маршруты чтения роутера на AsyncReadURLPattern."""
+    patterns = []
+    for pattern in urlpatterns:
+        basename, _, route = (pattern.name or '').rpartition('-')
+        handler = ASYNC_READ_HANDLERS.get(basename)
+        action = 'retrieve' if route == 'detail' else route
+        if handler is not None and action in handler.actions:
+            pattern = AsyncReadURLPattern(pattern, async_read_view(
+                pattern.callback, handler, action))
+        patterns.append(pattern)
+    return patterns
@@ -0,0 +1,51 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .services.cache import cache_user, get_cached_user, get_user_version
+from .services.metrics import measure
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT с кэшем пользователей.
+
+    Пользователь хранится в памяти процесса AUTH_USER_CACHE_TIMEOUT секунд.
+    Перед выдачей из кэша сверяется версия пользователя в общем кэше:
+    сигналы повышают ее при изменении или удалении пользователя,
+    поэтому смена роли действует сразу во всех процессах.
+    """
+
+    def authenticate(self, request):
+        with measure('auth'):
+            return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+
+        version = get_user_version(user_id)
+        user = get_cached_user(user_id, version)
+        if user is None:
+            # Проверки активности и пароля выполняет родительский класс
+            user = super().get_user(validated_token)
+            cache_user(user_id, user, version)
+            return user
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code='password_changed')
+        return user
@@ -0,0 +1,73 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Приложения, чтение которых можно направлять на реплики
+REPLICATED_APPS = ('reviews',)
+
+PIN_KEY_TEMPLATE = 'replica:pin:{}'
+CATALOGUE_PIN = 'catalogue'
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replicas_enabled():
+    return bool(settings.DATABASE_REPLICAS)
+
+
+@contextmanager
+def routing_scope():
+    """Ограничивает выбор реплики одним запросом: по выходу из блока
+    чтение снова идет с основной БД."""
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_replica():
+    """Направляет дальнейшее чтение в текущем запросе на случайную
+    реплику."""
+    _read_alias.set(random.choice(settings.DATABASE_REPLICAS))
+
+
+def pin_to_primary(key):
+    """Направляет чтение по ключу (клиенту или каталогу) на основную БД
+    на REPLICA_PIN_SECONDS, пока реплики догоняют запись."""
+    cache.set(PIN_KEY_TEMPLATE.format(key), True,
+              timeout=settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(key):
+    return cache.get(PIN_KEY_TEMPLATE.format(key), False)
+
+
+async def ais_pinned(key):
+    return await cache.aget(PIN_KEY_TEMPLATE.format(key), False)
+
+
+class ReplicaRouter:
+    """Читает модели REPLICATED_APPS с реплики, выбранной для запроса
+    (см. api.viewsets.ReplicaReadMixin). Запись, миграции и чтение вне
+    таких запросов идут в основную БД."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in REPLICATED_APPS:
+            return _read_alias.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная БД
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
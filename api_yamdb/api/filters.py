@@ -1,16 +1,56 @@
 import django_filters
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
 
 from reviews.models import Title
 
+from .services.search import search
+
 
 class TitleFilter(django_filters.FilterSet):
     """Фильтр для произведений"""
     genre = django_filters.CharFilter(field_name='genre__slug',
-                                      lookup_expr='iexact')
+                                      method='filter_slug_iexact')
     category = django_filters.CharFilter(field_name='category__slug',
-                                         lookup_expr='iexact')
+                                         method='filter_slug_iexact')
     year = django_filters.NumberFilter(field_name='year')
 
     class Meta:
         model = Title
         fields = ('genre', 'category', 'year', 'name')
+
+    def filter_slug_iexact(self, queryset, name, value):
+        """Сравнивает slug без учета регистра через LOWER(),
+        чтобы запрос мог использовать индекс по Lower('slug')."""
+        return queryset.filter(**{f'{name}__lower': value.lower()})
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск по параметру q.
+
+    Вьюсет задает вид объектов search_kind (см. api.services.search)
+    и, для публикаций, метод get_search_parent_id. Результаты
+    упорядочены по релевантности.
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        get_parent_id = getattr(view, 'get_search_parent_id', None)
+        ids = search(view.search_kind, query,
+                     get_parent_id() if get_parent_id else None)
+        if not ids:
+            return queryset.none()
+        # Одно выражение CASE вместо Case(When(...)) для каждого id:
+        # сборка сотен When в ORM дороже самого поиска
+        quote_name = connections[queryset.db].ops.quote_name
+        column = (f'{quote_name(queryset.model._meta.db_table)}.'
+                  f'{quote_name("id")}')
+        ranking = RawSQL(
+            f'CASE {column} {" ".join(["WHEN %s THEN %s"] * len(ids))} END',
+            [param for position, pk in enumerate(ids)
+             for param in (pk, position)])
+        return queryset.filter(id__in=ids).order_by(ranking)
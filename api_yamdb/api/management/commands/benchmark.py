@@ -0,0 +1,154 @@
+import argparse
+import json
+from contextlib import nullcontext
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import connection
+
+from api.services.benchmark import (
+    PROFILES,
+    SCENARIOS,
+    BenchmarkDatabaseError,
+    BenchmarkProfileError,
+    dedicated_database,
+    run_profile,
+    run_scenario,
+)
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py benchmark reviews
+# Первый параметр - сценарий нагрузки (список: --help).
+# --requests необязательный параметр. Общее количество запросов.
+# По умолчанию 500.
+# --concurrency необязательный параметр. Количество потоков.
+# По умолчанию 4.
+# --corpus-size необязательный параметр. Количество отзывов в корпусе
+# сценария search. По умолчанию 1000000.
+# --force необязательный параметр. Разрешает сценарию search создать корпус
+# в непустой БД или в БД, имя которой не содержит benchmark.
+# --batch-size необязательный параметр. Количество объектов в одном
+# запросе сценария titles-batch. По умолчанию 100.
+# --profile необязательный параметр, можно указать несколько раз. Профиль
+# БД (список: --help): каждый профиль прогоняется в отдельном процессе
+# с переменными окружения DB_ENGINE, DB_CONN_MAX_AGE, DB_POOL, затем
+# выводится таблица сравнения.
+# --use-default-db необязательный параметр. Прогон в настроенной БД.
+# Сценарии catalogue и catalogue-async сравнивают чтение через WSGI
+# (потоки) и ASGI (одновременные соединения одного цикла событий).
+# По умолчанию прогон идет в отдельной БД: временный файл SQLite или БД
+# <имя>_benchmark в PostgreSQL. Она создается миграциями перед прогоном
+# и удаляется после него, настроенная БД не изменяется.
+
+
+class Command(BaseCommand):
+    help = 'Измеряет пропускную способность API на сценарии нагрузки'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            'scenario', choices=sorted(SCENARIOS),
+            help='; '.join(f'{name}: {scenario.description}'
+                           for name, scenario in sorted(SCENARIOS.items())))
+        parser.add_argument('--requests', type=int, default=500,
+                            help='Общее количество запросов')
+        parser.add_argument('--concurrency', type=int, default=4,
+                            help='Количество потоков')
+        parser.add_argument('--corpus-size', type=int, default=None,
+                            help=('Размер синтетического корпуса для '
+                                  'сценария search (по умолчанию: 1000000)'))
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help=('Количество объектов в запросе сценария '
+                                  'titles-batch (по умолчанию: 100)'))
+        parser.add_argument('--force', action='store_true',
+                            help=('Создавать корпус сценария search в любой '
+                                  'БД'))
+        parser.add_argument('--profile', action='append',
+                            choices=sorted(PROFILES),
+                            help=('Профиль БД для сравнения, можно указать '
+                                  'несколько раз'))
+        parser.add_argument('--use-default-db', action='store_true',
+                            help=('Выполнить прогон в настроенной БД вместо '
+                                  'отдельной'))
+        parser.add_argument('--json-report', action='store_true',
+                            help=argparse.SUPPRESS)
+
+    def check_options(self, options: dict) -> None:
+        if options['requests'] < 1:
+            raise CommandError('Количество запросов должно быть не меньше 1.')
+        if options['concurrency'] < 1:
+            raise CommandError('Количество потоков должно быть не меньше 1.')
+        for name in ('corpus_size', 'batch_size'):
+            if options[name] is not None and options[name] < 1:
+                raise CommandError(
+                    f'--{name.replace("_", "-")} должен быть не меньше 1.')
+
+    def handle(self, *args, **options):
+        self.check_options(options)
+        if options['profile']:
+            return self.compare_profiles(options)
+        database = (nullcontext() if options['use_default_db']
+                    else dedicated_database())
+        with database:
+            scenario, report = self.run(options)
+        if options['json_report']:
+            self.stdout.write(json.dumps({
+                'report': report._asdict(), 'summary': scenario.summary()}))
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'{scenario.description}: {report.requests} запросов '
+            f'за {report.elapsed:.2f} с, {report.throughput:.1f} запр/с, '
+            f'{report.objects_throughput:.1f} объектов/с, '
+            f'p50 {report.latency_p50 * 1000:.1f} мс, '
+            f'p95 {report.latency_p95 * 1000:.1f} мс, '
+            f'ошибок: {report.errors}'))
+        if summary := scenario.summary():
+            self.stdout.write(summary)
+
+    def run(self, options):
+        """Выполняет прогон сценария в текущей БД."""
+        settings_dict = connection.settings_dict
+        if not options['json_report']:
+            self.stdout.write(
+                f'БД: {connection.vendor}, '
+                f'CONN_MAX_AGE: {settings_dict["CONN_MAX_AGE"]}, '
+                f'OPTIONS: {settings_dict.get("OPTIONS", {})}')
+        scenario = SCENARIOS[options['scenario']](
+            options['requests'], options['concurrency'],
+            corpus_size=options['corpus_size'],
+            batch_size=options['batch_size'], force=options['force'])
+        try:
+            return scenario, run_scenario(scenario)
+        except BenchmarkDatabaseError as error:
+            raise CommandError(error)
+
+    def compare_profiles(self, options):
+        """Прогоняет сценарий на каждом профиле БД и выводит таблицу
+        сравнения."""
+        arguments = [options['scenario'],
+                     '--requests', str(options['requests']),
+                     '--concurrency', str(options['concurrency'])]
+        for name in ('corpus_size', 'batch_size'):
+            if options[name] is not None:
+                arguments += [f'--{name.replace("_", "-")}',
+                              str(options[name])]
+        for name in ('force', 'use_default_db'):
+            if options[name]:
+                arguments.append(f'--{name.replace("_", "-")}')
+        self.stdout.write(f'{"Профиль":<20} {"запр/с":>10} {"p50 мс":>10} '
+                          f'{"p95 мс":>10} {"ошибок":>8}')
+        for profile in options['profile']:
+            try:
+                report, summary = run_profile(profile, arguments)
+            except BenchmarkProfileError as error:
+                self.stdout.write(self.style.ERROR(
+                    f'{profile:<20} ошибка прогона: {error}'))
+                continue
+            self.stdout.write(
+                f'{profile:<20} {report.throughput:>10.1f} '
+                f'{report.latency_p50 * 1000:>10.1f} '
+                f'{report.latency_p95 * 1000:>10.1f} {report.errors:>8}')
+            if summary:
+                self.stdout.write(f'{"":<20} {summary}')
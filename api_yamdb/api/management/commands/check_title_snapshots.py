@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from api.services.snapshots import find_stale_snapshots, refresh_snapshots
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py check_title_snapshots
+# --fix необязательный параметр. если установлен,
+# найденные устаревшие представления будут пересобраны.
+
+
+class Command(BaseCommand):
+    help = ('Проверяет, что готовые представления произведений '
+            'совпадают с актуальными данными')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--fix', action='store_true',
+                            help='Пересобрать устаревшие представления')
+
+    def handle(self, *args, **options):
+        """Сравнивает каждое представление с заново сериализованным
+        произведением.
+
+        Raises:
+            CommandError: Если есть устаревшие представления и не задан --fix
+        """
+        if not settings.TITLE_SNAPSHOTS_ENABLED:
+            self.stdout.write(self.style.WARNING(
+                'Представления отключены (TITLE_SNAPSHOTS_ENABLED)'))
+            return
+        stale = find_stale_snapshots()
+        if not stale:
+            self.stdout.write(self.style.SUCCESS(
+                'Все представления актуальны'))
+            return
+        if options['fix']:
+            refresh_snapshots(stale)
+            self.stdout.write(self.style.SUCCESS(
+                f'Пересобрано представлений: {len(stale)}'))
+            return
+        raise CommandError(
+            f'Устаревшие представления произведений ({len(stale)}): '
+            f'{", ".join(map(str, stale[:20]))}')
@@ -0,0 +1,49 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import connections
+
+from api.services.ratings import flush_dirty_titles
+from api.services.ratings.deferred import FLUSH_BATCH_SIZE
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py flush_ratings
+# Пересчитывает рейтинг произведений, отмеченных при отложенном
+# пересчете (RATING_UPDATE_MODE=worker).
+# --batch-size необязательный параметр. Количество произведений
+# в одном UPDATE-запросе. По умолчанию 500.
+# --loop необязательный параметр. Не завершаться, а пересчитывать
+# каждые --interval секунд (по умолчанию RATING_MAX_STALENESS).
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинг отмеченных произведений'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int,
+                            default=FLUSH_BATCH_SIZE,
+                            help=('Количество произведений за один запрос '
+                                  f'(по умолчанию: {FLUSH_BATCH_SIZE})'))
+        parser.add_argument('--loop', action='store_true',
+                            help='Пересчитывать непрерывно')
+        parser.add_argument('--interval', type=float,
+                            default=settings.RATING_MAX_STALENESS,
+                            help='Пауза между пересчетами, секунды')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        while True:
+            count = flush_dirty_titles(options['batch_size'])
+            if count or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Рейтинг пересчитан для произведений: {count}'))
+            if not options['loop']:
+                break
+            connections.close_all()
+            time.sleep(options['interval'])
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connections
+
+from api.services.verify_codes import get_code_stats, purge_codes
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py purge_codes
+# --batch-size необязательный параметр. Количество кодов, удаляемых
+# в одной транзакции. По умолчанию VERIFY_CODE_PURGE_BATCH_SIZE.
+# --loop необязательный параметр. Не завершаться, а удалять коды
+# каждые --interval секунд (по умолчанию 3600).
+
+
+class Command(BaseCommand):
+    help = 'Удаляет использованные и истекшие коды подтверждения'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.VERIFY_CODE_PURGE_BATCH_SIZE,
+                            help='Количество кодов за одну транзакцию')
+        parser.add_argument('--loop', action='store_true',
+                            help='Удалять коды непрерывно')
+        parser.add_argument('--interval', type=float, default=3600,
+                            help='Пауза между проходами, секунды')
+
+    def handle(self, *args, **options):
+        while True:
+            report = purge_codes(options['batch_size'])
+            stats = get_code_stats()
+            self.stdout.write(self.style.SUCCESS(
+                f'Удалено кодов: {report.purged} '
+                f'({report.batches} пачек за {report.elapsed:.2f} с), '
+                f'в таблице: {stats.total}, из них устаревших: '
+                f'{stats.stale}'))
+            if not options['loop']:
+                break
+            connections.close_all()
+            time.sleep(options['interval'])
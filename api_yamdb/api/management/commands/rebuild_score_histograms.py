@@ -0,0 +1,31 @@
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from api.services.ratings import recount_all_titles
+from api.services.snapshots.title_snapshots import REBUILD_BATCH_SIZE
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py rebuild_score_histograms
+# --batch-size необязательный параметр. Количество произведений,
+# пересчитываемых одним запросом. По умолчанию 1000.
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает гистограмму оценок, сумму, количество оценок '
+            'и рейтинг всех произведений по отзывам')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int,
+                            default=REBUILD_BATCH_SIZE,
+                            help=('Количество произведений за один запрос '
+                                  f'(по умолчанию: {REBUILD_BATCH_SIZE})'))
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        count = recount_all_titles(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Гистограммы оценок пересчитаны для произведений: {count}'))
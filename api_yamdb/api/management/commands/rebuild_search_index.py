@@ -0,0 +1,34 @@
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from api.services.search import SEARCH_KINDS, rebuild_search_index
+from api.services.search.index import REBUILD_BATCH_SIZE
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py rebuild_search_index
+# --kind необязательный параметр. Виды объектов (title, review, comment),
+# индекс которых строится заново. По умолчанию - все.
+# --batch-size необязательный параметр. Количество объектов,
+# индексируемых за один проход. По умолчанию 5000.
+
+
+class Command(BaseCommand):
+    help = 'Строит индекс полнотекстового поиска заново'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--kind', nargs='+', choices=sorted(SEARCH_KINDS),
+                            help='Виды объектов для индексации')
+        parser.add_argument('--batch-size', type=int,
+                            default=REBUILD_BATCH_SIZE,
+                            help=('Количество объектов за один проход '
+                                  f'(по умолчанию: {REBUILD_BATCH_SIZE})'))
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        count = rebuild_search_index(options['kind'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано объектов: {count}'))
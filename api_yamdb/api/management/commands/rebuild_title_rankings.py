@@ -0,0 +1,30 @@
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+
+from api.services.rankings import rebuild_rankings
+from api.services.snapshots.title_snapshots import REBUILD_BATCH_SIZE
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py rebuild_title_rankings
+# --batch-size необязательный параметр. Количество произведений,
+# пересобираемых за один проход. По умолчанию 1000.
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает строки рейтинга всех произведений'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int,
+                            default=REBUILD_BATCH_SIZE,
+                            help=('Количество произведений за один проход '
+                                  f'(по умолчанию: {REBUILD_BATCH_SIZE})'))
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        count = rebuild_rankings(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобран рейтинг произведений: {count}'))
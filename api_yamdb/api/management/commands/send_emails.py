@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.db import connections
+
+from api.services.email import deliver_batch, get_queue_depth
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py send_emails
+# --batch-size необязательный параметр. Количество писем, отправляемых
+# через одно соединение. По умолчанию EMAIL_OUTBOX_BATCH_SIZE.
+# --loop необязательный параметр. Не завершаться, а проверять очередь
+# каждые --interval секунд (по умолчанию EMAIL_OUTBOX_POLL_INTERVAL).
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+                            help='Количество писем за одно соединение')
+        parser.add_argument('--loop', action='store_true',
+                            help='Обрабатывать очередь непрерывно')
+        parser.add_argument('--interval', type=float,
+                            default=settings.EMAIL_OUTBOX_POLL_INTERVAL,
+                            help='Пауза между проверками очереди, секунды')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        while True:
+            self.drain(options['batch_size'])
+            if not options['loop']:
+                break
+            connections.close_all()
+            time.sleep(options['interval'])
+
+    def drain(self, batch_size):
+        """Отправляет пачки писем, пока они не закончатся."""
+        while True:
+            report = deliver_batch(batch_size)
+            if not (report.sent or report.failed):
+                break
+            self.stdout.write(self.style.SUCCESS(
+                f'Отправлено: {report.sent}, с ошибкой: {report.failed}, '
+                f'в очереди: {get_queue_depth()}, задержка доставки: '
+                f'средняя {report.latency_avg:.2f} с, '
+                f'максимальная {report.latency_max:.2f} с'))
+            if report.failed:
+                break
@@ -0,0 +1,36 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py sync_replicas
+# Копирует основную БД SQLite в файлы реплик из DB_REPLICAS, чтобы
+# проверить чтение с реплик локально. Реплики PostgreSQL обновляет
+# потоковая репликация сервера.
+
+
+class Command(BaseCommand):
+    help = 'Копирует основную БД SQLite в реплики'
+
+    def handle(self, *args, **options):
+        primary = connections['default']
+        if primary.vendor != 'sqlite':
+            raise CommandError('Команда копирует только БД SQLite')
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Реплики не заданы (DB_REPLICAS)')
+        source = sqlite3.connect(primary.settings_dict['NAME'])
+        try:
+            for alias in settings.DATABASE_REPLICAS:
+                replica = connections[alias]
+                replica.close()
+                target = sqlite3.connect(replica.settings_dict['NAME'])
+                try:
+                    source.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(self.style.SUCCESS(
+                    f'Реплика {alias} обновлена'))
+        finally:
+            source.close()
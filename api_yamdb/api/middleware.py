@@ -0,0 +1,48 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .services.metrics import observe_request, timing_scope
+
+
+class PerformanceMiddleware:
+    """Замеряет время обработки запроса, количество и время запросов
+    к БД, время сериализаторов и аутентификации.
+
+    Замеры отдаются клиенту в заголовке Server-Timing и собираются
+    в гистограммы по маршрутам (имени представления), которые
+    отдает адрес /metrics/. Работает и под WSGI, и под ASGI без
+    переключения в поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not settings.PERFORMANCE_METRICS_ENABLED:
+            return self.get_response(request)
+        with timing_scope() as timing:
+            response = self.get_response(request)
+            self.finish(request, response, timing)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.PERFORMANCE_METRICS_ENABLED:
+            return await self.get_response(request)
+        with timing_scope() as timing:
+            response = await self.get_response(request)
+            self.finish(request, response, timing)
+        return response
+
+    def finish(self, request, response, timing):
+        match = request.resolver_match
+        if match is not None and match.view_name != 'metrics':
+            timing.view_name = match.view_name
+            observe_request(timing, request.method, timing.total)
+        response['Server-Timing'] = timing.server_timing()
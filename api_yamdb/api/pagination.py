@@ -0,0 +1,109 @@
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class PublicationPagination(LimitOffsetPagination):
+    """Пагинация публикаций.
+
+    По умолчанию работает как limit/offset. Если в запросе есть параметр
+    cursor (для первой страницы - пустой), страницы выбираются по ключу
+    (pub_date, id) в порядке PublicationBaseModel.Meta.ordering:
+    время ответа не зависит от номера страницы, а новые публикации
+    не сдвигают уже полученные. Общее количество в этом режиме считается
+    только по запросу с параметром count=true.
+    """
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    cursor_salt = 'api.pagination.cursor'
+    ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request)
+        self.count = None
+        if request.query_params.get(self.count_query_param) == 'true':
+            self.count = self.get_count(queryset)
+
+        pub_date, pk, reverse = self.decode_cursor(request)
+        queryset = queryset.order_by(*self.ordering)
+        if reverse:
+            queryset = queryset.reverse()
+        if pub_date is not None:
+            # pub_date__lte дает индексу границу диапазона,
+            # условие в скобках отсекает уже выданные записи
+            if reverse:
+                queryset = queryset.filter(
+                    Q(pub_date__gt=pub_date) | Q(id__gt=pk),
+                    pub_date__gte=pub_date)
+            else:
+                queryset = queryset.filter(
+                    Q(pub_date__lt=pub_date) | Q(id__lt=pk),
+                    pub_date__lte=pub_date)
+
+        page = list(queryset[:self.limit + 1])
+        has_more = len(page) > self.limit
+        page = page[:self.limit]
+        if reverse:
+            page.reverse()
+            self.has_next = pub_date is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = pub_date is not None
+        self.page = page
+        return page
+
+    def decode_cursor(self, request):
+        """Возвращает (pub_date, id, reverse) из параметра cursor."""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, None, False
+        try:
+            pub_date, pk, reverse = signing.loads(token, salt=self.cursor_salt)
+            return datetime.fromisoformat(pub_date), int(pk), bool(reverse)
+        except (signing.BadSignature, TypeError, ValueError):
+            raise NotFound('Неверный курсор.')
+
+    def encode_cursor(self, obj, reverse):
+        """Возвращает ссылку на страницу после (или перед) объектом."""
+        token = signing.dumps(
+            (obj.pub_date.isoformat(), obj.pk, reverse), salt=self.cursor_salt)
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def get_next_link(self):
+        if not self.use_cursor:
+            return super().get_next_link()
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.use_cursor:
+            return super().get_previous_link()
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        response = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.count is not None:
+            response = {'count': self.count, **response}
+        return Response(response)
@@ -1,6 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import RegexValidator
 from django.shortcuts import get_object_or_404
+from django.utils.encoding import smart_str
 from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from rest_framework_simplejwt.tokens import RefreshToken
@@ -94,6 +95,37 @@ class TitleModifySerializer(serializers.ModelSerializer):
         return value
 
 
+class PreloadedSlugRelatedField(serializers.SlugRelatedField):
+    """Поле связи по slug, которое ищет объекты в словаре из контекста.
+
+    Словарь context[context_key] заполняется одним запросом на всю
+    пачку объектов, поэтому проверка элемента пачки не обращается к БД.
+    """
+
+    def __init__(self, context_key, **kwargs):
+        self.context_key = context_key
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        try:
+            return self.context[self.context_key][data]
+        except KeyError:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=smart_str(data))
+        except TypeError:
+            self.fail('invalid')
+
+
+class TitleBatchSerializer(TitleModifySerializer):
+    """Сериализатор для проверки произведений пачки."""
+
+    genre = PreloadedSlugRelatedField(
+        'genres', slug_field='slug', queryset=Genre.objects.all(),
+        many=True, required=True)
+    category = PreloadedSlugRelatedField(
+        'categories', slug_field='slug', queryset=Category.objects.all())
+
+
 class TitleReadSerializer(serializers.ModelSerializer):
     """Сериализатор для чтения произведений."""
 
@@ -113,6 +145,55 @@ class TitleReadSerializer(serializers.ModelSerializer):
         return CategorySerializer(obj.category).data
 
 
+class TitleSnapshotSerializer(serializers.BaseSerializer):
+    """Сериализатор для чтения произведений из готовых представлений.
+
+    Если представление еще не построено, произведение сериализуется
+    обычным способом.
+    """
+
+    def to_representation(self, instance):
+        try:
+            data = instance.snapshot.data
+        except Title.snapshot.RelatedObjectDoesNotExist:
+            return TitleReadSerializer(instance, context=self.context).data
+        return {
+            field: instance.rating if field == 'rating' else data[field]
+            for field in TitleReadSerializer.Meta.fields
+        }
+
+
+class TitleDetailSerializer(TitleReadSerializer):
+    """Сериализатор для чтения одного произведения
+    с гистограммой оценок."""
+
+    score_histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True)
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('score_histogram',)
+
+
+class TitleStatsSerializer(serializers.ModelSerializer):
+    """Сериализатор статистики оценок произведения.
+    Все значения читаются из счетчиков произведения."""
+
+    average = serializers.SerializerMethodField()
+    score_histogram = serializers.DictField(
+        child=serializers.IntegerField(), read_only=True)
+
+    class Meta:
+        model = Title
+        fields = ('id', 'rating', 'review_count', 'average',
+                  'score_histogram')
+
+    def get_average(self, obj):
+        """Средняя оценка без округления до целого."""
+        if not obj.review_count:
+            return None
+        return round(obj.score_sum / obj.review_count, 2)
+
+
 class BaseUserSerializer(serializers.ModelSerializer):
     """Базовый сериализатор пользователей."""
     class Meta:
@@ -195,19 +276,17 @@ class TokenSerializer(serializers.Serializer):
         code = user.confirmation_code.filter(is_used=False).first()
         if not code or confirmation_code != code.code:
             if code:
-                code.increase_attempts
+                code.increase_attempts()
             raise serializers.ValidationError(
                 {'confirmation_code': 'Неверный код'}
             )
         if code.is_valid:
-            code.is_used = True
-            code.save()
+            code.mark_used()
             refresh = RefreshToken.for_user(user)
             return {
                 'token': str(refresh.access_token)
             }
-        code.is_used = True
-        code.save()
+        code.mark_used()
         raise serializers.ValidationError(
             {
                 'confirmation_code': (
@@ -237,21 +316,13 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date', 'score')
         model = Review
 
-    def validate(self, data):
-        """
-        Проверяет, что пользователь еще не оставлял отзыв на это произведение,
-        """
-        request = self.context.get('request')
-        view = self.context.get('view')
-        if request.method == 'POST':
-            title_id = view.kwargs.get('title_id')
-            review = Review.objects.filter(
-                author=request.user, title_id=title_id)
-            if review.exists():
-                raise serializers.ValidationError(
-                    'Вы уже оставили отзыв на это произведение.')
 
-        return data
+class ReviewBatchSerializer(ReviewSerializer):
+    """Сериализатор для проверки отзывов пачки: автор задается
+    в каждом отзыве."""
+
+    author = PreloadedSlugRelatedField(
+        'authors', slug_field='username', queryset=User.objects.all())
 
 
 class CommentSerializer(serializers.ModelSerializer):
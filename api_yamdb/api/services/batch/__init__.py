@@ -0,0 +1 @@
+from .creators import BatchResult, create_reviews, create_titles  # noqa
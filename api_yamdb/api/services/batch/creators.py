@@ -0,0 +1,140 @@
+from collections import Counter
+from typing import NamedTuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
+
+from api.serializers import ReviewBatchSerializer, TitleBatchSerializer
+from reviews.models import Category, Genre, Review, Title
+
+from ..cache import bump_generation
+from ..rankings import refresh_rankings
+from ..ratings import mark_title_dirty
+from ..search import index_objects
+from ..snapshots import refresh_snapshots
+
+User = get_user_model()
+
+
+class BatchResult(NamedTuple):
+    """Итог создания пачки: созданные объекты и ошибки проверки
+    по индексам элементов запроса."""
+    created: dict
+    errors: dict
+
+
+def collect_values(items, field):
+    """Собирает строковые значения поля (или списка в поле) всех
+    элементов пачки для одного запроса IN."""
+    values = set()
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        value = item.get(field)
+        for value in value if isinstance(value, list) else [value]:
+            if isinstance(value, str):
+                values.add(value)
+    return values
+
+
+def validate_items(serializer_class, items, context):
+    """Проверяет элементы пачки по отдельности."""
+    valid, errors = {}, {}
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item, context=context)
+        if serializer.is_valid():
+            valid[index] = serializer.validated_data
+        else:
+            errors[index] = serializer.errors
+    return valid, errors
+
+
+def create_titles(items, context=None):
+    """Создает произведения пачки.
+
+    Жанры и категории всех элементов получаются двумя запросами IN,
+    произведения и их связи с жанрами записываются двумя bulk_create.
+    bulk_create не отправляет сигналы, поэтому представления, индекс
+    поиска и кэш каталога обновляются здесь для всей пачки сразу.
+    """
+    context = {
+        **(context or {}),
+        'genres': Genre.objects.in_bulk(
+            collect_values(items, 'genre'), field_name='slug'),
+        'categories': Category.objects.in_bulk(
+            collect_values(items, 'category'), field_name='slug'),
+    }
+    valid, errors = validate_items(TitleBatchSerializer, items, context)
+    if not valid:
+        return BatchResult({}, errors)
+
+    indexes = list(valid)
+    with transaction.atomic():
+        titles = Title.objects.bulk_create(
+            Title(**{field: value for field, value in valid[index].items()
+                     if field != 'genre'})
+            for index in indexes)
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.id, genre_id=genre.id)
+            for index, title in zip(indexes, titles)
+            for genre in set(valid[index]['genre']))
+        title_ids = [title.id for title in titles]
+        refresh_snapshots(title_ids)
+        refresh_rankings(title_ids)
+        index_objects(Title, titles)
+        transaction.on_commit(bump_generation)
+
+    loaded = Title.objects.select_related('category').prefetch_related(
+        'genre').in_bulk(title_ids)
+    return BatchResult(
+        {index: loaded[title.id] for index, title in zip(indexes, titles)},
+        errors)
+
+
+def create_reviews(title, items, context=None):
+    """Создает отзывы пачки к произведению title от разных авторов.
+
+    Авторы получаются одним запросом IN, уже оставленные ими отзывы -
+    еще одним. Отзывы записываются одним bulk_create, рейтинг
+    произведения изменяется одним UPDATE на всю пачку.
+    """
+    context = {
+        **(context or {}),
+        'authors': User.objects.in_bulk(
+            collect_values(items, 'author'), field_name='username'),
+    }
+    valid, errors = validate_items(ReviewBatchSerializer, items, context)
+    reviewed = set(Review.objects.filter(
+        title=title,
+        author__in=[data['author'] for data in valid.values()]
+    ).values_list('author_id', flat=True))
+    for index, data in list(valid.items()):
+        if data['author'].id in reviewed:
+            del valid[index]
+            errors[index] = {api_settings.NON_FIELD_ERRORS_KEY: [
+                'Автор уже оставил отзыв на это произведение.']}
+        reviewed.add(data['author'].id)
+    if not valid:
+        return BatchResult({}, dict(sorted(errors.items())))
+
+    try:
+        with transaction.atomic():
+            reviews = Review.objects.bulk_create(
+                Review(title=title, **data) for data in valid.values())
+            if settings.RATING_UPDATE_MODE == 'sync':
+                Title.objects.filter(id=title.id).change_scores(
+                    sum(review.score for review in reviews), len(reviews),
+                    Counter(review.score for review in reviews))
+            else:
+                mark_title_dirty(title.id)
+            index_objects(Review, reviews)
+            transaction.on_commit(bump_generation)
+    except IntegrityError:
+        # Отзыв того же автора, записанный параллельным запросом
+        raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+            'Часть авторов уже оставила отзыв на это произведение.']})
+    return BatchResult(dict(zip(valid, reviews)),
+                       dict(sorted(errors.items())))
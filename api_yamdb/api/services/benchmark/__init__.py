@@ -0,0 +1,14 @@
+from .runner import (  # noqa
+    PROFILES,
+    BenchmarkProfileError,
+    BenchmarkReport,
+    dedicated_database,
+    run_profile,
+    run_scenario,
+)
+from .scenarios import (  # noqa
+    SCENARIOS,
+    BenchmarkDatabaseError,
+    Scenario,
+    register,
+)
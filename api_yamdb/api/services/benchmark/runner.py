@@ -0,0 +1,170 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from statistics import quantiles
+from time import perf_counter
+from typing import NamedTuple
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import override_settings
+
+# Профили БД для сравнения: переменные окружения процесса прогона
+PROFILES = {
+    'sqlite': {'DB_ENGINE': 'sqlite'},
+    'sqlite-no-reuse': {'DB_ENGINE': 'sqlite', 'DB_CONN_MAX_AGE': '0'},
+    'postgresql': {'DB_ENGINE': 'postgresql'},
+    'postgresql-no-reuse': {'DB_ENGINE': 'postgresql',
+                            'DB_CONN_MAX_AGE': '0'},
+    'postgresql-pool': {'DB_ENGINE': 'postgresql', 'DB_POOL': 'true'},
+}
+
+
+class BenchmarkProfileError(Exception):
+    """Прогон профиля БД завершился ошибкой."""
+
+
+class BenchmarkReport(NamedTuple):
+    """Итог прогона сценария."""
+    requests: int
+    errors: int
+    elapsed: float
+    throughput: float
+    objects_throughput: float
+    latency_p50: float
+    latency_p95: float
+
+
+def run_worker(scenario, worker):
+    """Выполняет запросы потока worker, возвращает их длительности
+    и количество ответов с неожиданным статусом."""
+    client = scenario.get_client(worker)
+    latencies, errors = [], 0
+    try:
+        for idx in range(worker, scenario.total, scenario.concurrency):
+            start = perf_counter()
+            response = scenario.make_request(client, idx)
+            latencies.append(perf_counter() - start)
+            if not scenario.is_expected(response):
+                errors += 1
+    finally:
+        # У каждого потока свое соединение с БД
+        connections.close_all()
+    return latencies, errors
+
+
+async def run_async_worker(scenario, worker):
+    """Асинхронный вариант run_worker: выполняет запросы одного
+    соединения в общем цикле событий."""
+    client = scenario.get_client(worker)
+    latencies, errors = [], 0
+    for idx in range(worker, scenario.total, scenario.concurrency):
+        start = perf_counter()
+        response = await scenario.amake_request(client, idx)
+        latencies.append(perf_counter() - start)
+        if not scenario.is_expected(response):
+            errors += 1
+    return latencies, errors
+
+
+async def run_async_workers(scenario):
+    return await asyncio.gather(*(
+        run_async_worker(scenario, worker)
+        for worker in range(scenario.concurrency)))
+
+
+def run_scenario(scenario):
+    """Готовит данные, выполняет запросы сценария в concurrency потоков
+    (для асинхронных сценариев - в concurrency одновременных соединений
+    одного цикла событий) и удаляет данные после прогона."""
+    scenario.check_database()
+    scenario.setup()
+    try:
+        start = perf_counter()
+        if scenario.is_async:
+            results = async_to_sync(run_async_workers)(scenario)
+        else:
+            with ThreadPoolExecutor(scenario.concurrency) as pool:
+                results = list(pool.map(
+                    lambda worker: run_worker(scenario, worker),
+                    range(scenario.concurrency)))
+        elapsed = perf_counter() - start
+    finally:
+        scenario.teardown()
+
+    latencies = sorted(
+        latency for worker_latencies, _ in results
+        for latency in worker_latencies)
+    percentiles = (quantiles(latencies, n=100) if len(latencies) > 1
+                   else latencies * 99)
+    return BenchmarkReport(
+        requests=len(latencies),
+        errors=sum(errors for _, errors in results),
+        elapsed=elapsed,
+        throughput=len(latencies) / elapsed,
+        objects_throughput=(len(latencies) * scenario.objects_per_request
+                            / elapsed),
+        latency_p50=percentiles[49],
+        latency_p95=percentiles[94],
+    )
+
+
+@contextmanager
+def dedicated_database():
+    """Переключает БД default на отдельную БД для прогона и удаляет ее
+    после прогона.
+
+    БД создается миграциями как тестовая: для SQLite - временный файл,
+    для PostgreSQL - БД <имя>_benchmark (нужно право CREATEDB). Реплики
+    на время прогона отключаются: они читают рабочую БД.
+
+    Yields:
+        Имя отдельной БД.
+    """
+    connection = connections[DEFAULT_DB_ALIAS]
+    old_name = connection.settings_dict['NAME']
+    old_test = connection.settings_dict.get('TEST', {})
+    with tempfile.TemporaryDirectory() as directory, override_settings(
+            DATABASE_REPLICAS=[]):
+        test_name = (os.path.join(directory, 'benchmark.sqlite3')
+                     if connection.vendor == 'sqlite'
+                     else f'{old_name}_benchmark')
+        connection.settings_dict['TEST'] = {**old_test, 'NAME': test_name}
+        try:
+            yield connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            connection.settings_dict['TEST'] = old_test
+
+
+def run_profile(profile, arguments):
+    """Выполняет прогон в отдельном процессе с переменными окружения
+    профиля БД: настройки БД читаются при запуске процесса.
+
+    Args:
+        profile: Название профиля из PROFILES
+        arguments: Аргументы команды benchmark
+
+    Returns:
+        Итог прогона и дополнительные итоги сценария.
+
+    Raises:
+        BenchmarkProfileError: Если прогон завершился ошибкой.
+    """
+    result = subprocess.run(
+        [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'),
+         'benchmark', *arguments, '--json-report'],
+        env={**os.environ, **PROFILES[profile]},
+        capture_output=True, text=True)
+    if result.returncode:
+        lines = result.stderr.strip().splitlines() or ['нет вывода']
+        raise BenchmarkProfileError(lines[-1])
+    data = json.loads(result.stdout.strip().splitlines()[-1])
+    return BenchmarkReport(**data['report']), data['summary']
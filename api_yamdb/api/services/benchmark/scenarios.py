@@ -0,0 +1,390 @@
+import random
+import threading
+import uuid
+from http import HTTPStatus
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.services.search import index_objects, remove_objects
+from api.utils.code_generator import GeneratingCodeService
+from reviews.models import Category, Genre, Review, Title
+from users.models import VerifyCode
+
+User = get_user_model()
+
+SCENARIOS = {}
+
+
+class BenchmarkDatabaseError(Exception):
+    """БД не подходит для сценария нагрузки."""
+
+
+def is_benchmark_database():
+    """БД выделена для нагрузочных прогонов: имя содержит benchmark."""
+    return 'benchmark' in str(connection.settings_dict['NAME'])
+
+
+def register(scenario):
+    """Добавляет сценарий в список доступных команде benchmark."""
+    SCENARIOS[scenario.name] = scenario
+    return scenario
+
+
+class Scenario:
+    """Сценарий нагрузки.
+
+    setup готовит данные для total запросов в concurrency потоков,
+    make_request выполняет запрос номер idx клиентом потока,
+    teardown удаляет подготовленные данные. objects_per_request -
+    сколько объектов обрабатывает один запрос (для пакетных запросов).
+    """
+    name = ''
+    description = ''
+    expected_status = HTTPStatus.OK
+    objects_per_request = 1
+    # Асинхронные сценарии выполняют amake_request через ASGI
+    is_async = False
+
+    def __init__(self, total, concurrency, **options):
+        self.total = total
+        self.concurrency = concurrency
+        self.options = options
+        self.prefix = f'benchmark-{uuid.uuid4().hex[:8]}'
+
+    def check_database(self):
+        """Проверяет, что сценарий можно выполнить на текущей БД.
+
+        Raises:
+            BenchmarkDatabaseError: Если данные сценария нельзя создать.
+        """
+
+    def setup(self):
+        pass
+
+    def get_client(self, worker):
+        return Client()
+
+    def make_request(self, client, idx):
+        raise NotImplementedError
+
+    async def amake_request(self, client, idx):
+        raise NotImplementedError
+
+    def is_expected(self, response):
+        return response.status_code == self.expected_status
+
+    def teardown(self):
+        pass
+
+    def summary(self):
+        """Дополнительные итоги сценария для вывода команды."""
+        return ''
+
+
+@register
+class ReviewWriteScenario(Scenario):
+    """Каждый запрос создает отзыв: потоки пишут отзывы от своих
+    пользователей на общий набор произведений."""
+    name = 'reviews'
+    description = 'POST /api/v1/titles/{id}/reviews/'
+    expected_status = HTTPStatus.CREATED
+
+    def setup(self):
+        self.users = User.objects.bulk_create(
+            User(username=f'{self.prefix}-{worker}',
+                 email=f'{self.prefix}-{worker}@yamdb.fake')
+            for worker in range(self.concurrency)
+        )
+        titles_count = -(-self.total // self.concurrency)
+        self.titles = Title.objects.bulk_create(
+            Title(name=f'{self.prefix}-{idx}', year=2000)
+            for idx in range(titles_count)
+        )
+
+    def get_client(self, worker):
+        token = AccessToken.for_user(self.users[worker])
+        return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def make_request(self, client, idx):
+        # Пара (произведение, автор) уникальна для каждого запроса
+        title = self.titles[idx // self.concurrency]
+        return client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'benchmark', 'score': idx % 10 + 1},
+            content_type='application/json',
+        )
+
+    def teardown(self):
+        Title.objects.filter(name__startswith=self.prefix).delete()
+        User.objects.filter(username__startswith=self.prefix).delete()
+
+
+@register
+class TitleWriteScenario(Scenario):
+    """Каждый запрос администратора создает одно произведение."""
+    name = 'titles'
+    description = 'POST /api/v1/titles/'
+    expected_status = HTTPStatus.CREATED
+
+    def setup(self):
+        self.admin = User.objects.create(
+            username=self.prefix, email=f'{self.prefix}@yamdb.fake',
+            role=User.Role.ADMIN)
+        self.category = Category.objects.create(
+            name=self.prefix, slug=self.prefix)
+        self.genres = Genre.objects.bulk_create(
+            Genre(name=f'{self.prefix}-{idx}', slug=f'{self.prefix}-{idx}')
+            for idx in range(2))
+
+    def get_client(self, worker):
+        token = AccessToken.for_user(self.admin)
+        return Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def make_title(self, idx):
+        return {'name': f'{self.prefix}-{idx}', 'year': 2000,
+                'genre': [genre.slug for genre in self.genres],
+                'category': self.category.slug}
+
+    def make_request(self, client, idx):
+        return client.post('/api/v1/titles/', data=self.make_title(idx),
+                           content_type='application/json')
+
+    def teardown(self):
+        Title.objects.filter(name__startswith=self.prefix).delete()
+        Genre.objects.filter(slug__startswith=self.prefix).delete()
+        self.category.delete()
+        self.admin.delete()
+
+
+@register
+class TitleBatchWriteScenario(TitleWriteScenario):
+    """Каждый запрос создает пачку из --batch-size произведений:
+    сравнение пропускной способности с одиночным созданием (titles)."""
+    name = 'titles-batch'
+    description = 'POST /api/v1/titles/batch/'
+
+    def __init__(self, total, concurrency, **options):
+        super().__init__(total, concurrency, **options)
+        self.objects_per_request = options.get('batch_size') or 100
+
+    def make_request(self, client, idx):
+        start = idx * self.objects_per_request
+        return client.post(
+            '/api/v1/titles/batch/',
+            data=[self.make_title(start + offset)
+                  for offset in range(self.objects_per_request)],
+            content_type='application/json',
+        )
+
+
+@register
+class CatalogueReadScenario(Scenario):
+    """Анонимное чтение произведений и отзывов через WSGI: каждый поток
+    обслуживает одно соединение."""
+    name = 'catalogue'
+    description = 'GET /api/v1/titles/{id}/ и /api/v1/titles/{id}/reviews/'
+    titles_count = 20
+    reviews_per_title = 10
+
+    def setup(self):
+        self.users = User.objects.bulk_create(
+            User(username=f'{self.prefix}-{idx}',
+                 email=f'{self.prefix}-{idx}@yamdb.fake')
+            for idx in range(self.reviews_per_title)
+        )
+        self.titles = Title.objects.bulk_create(
+            Title(name=f'{self.prefix}-{idx}', year=2000)
+            for idx in range(self.titles_count)
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='benchmark', score=5)
+            for title in self.titles for author in self.users
+        )
+        # bulk_create не отправляет сигналы: счетчики оценок пересчитываются
+        # явно, иначе удаление отзывов в teardown уведет их в минус
+        Title.objects.filter(
+            name__startswith=self.prefix).recount_ratings()
+
+    def get_url(self, idx):
+        title = self.titles[idx // 2 % len(self.titles)]
+        if idx % 2:
+            return f'/api/v1/titles/{title.id}/reviews/'
+        return f'/api/v1/titles/{title.id}/'
+
+    def make_request(self, client, idx):
+        return client.get(self.get_url(idx))
+
+    def teardown(self):
+        Title.objects.filter(name__startswith=self.prefix).delete()
+        User.objects.filter(username__startswith=self.prefix).delete()
+
+
+@register
+class AsyncCatalogueReadScenario(CatalogueReadScenario):
+    """Те же запросы через ASGI с асинхронным чтением: concurrency
+    одновременных соединений обслуживает один цикл событий."""
+    name = 'catalogue-async'
+    description = (f'{CatalogueReadScenario.description} '
+                   '(ASGI, ASYNC_READ_VIEWS)')
+    is_async = True
+
+    def setup(self):
+        super().setup()
+        self.async_reads = override_settings(ASYNC_READ_VIEWS=True)
+        self.async_reads.enable()
+
+    def get_client(self, worker):
+        return AsyncClient()
+
+    async def amake_request(self, client, idx):
+        return await client.get(self.get_url(idx))
+
+    def teardown(self):
+        self.async_reads.disable()
+        super().teardown()
+
+
+@register
+class ReviewSearchScenario(Scenario):
+    """Полнотекстовый поиск отзывов произведения по синтетическому корпусу
+    из --corpus-size отзывов. Частоты слов корпуса и запросов
+    распределены по закону Ципфа."""
+    name = 'search'
+    description = 'GET /api/v1/titles/{id}/reviews/?q='
+    reviews_per_title = 1000
+    words_per_review = 12
+    vocabulary_size = 5000
+    syllables = ('ка', 'ро', 'ми', 'ту', 'ле', 'на', 'вос', 'при', 'гор',
+                 'да', 'сет', 'ви', 'лу', 'ко', 'зе', 'бра')
+
+    def check_database(self):
+        """Корпус создается только в пустой БД, выделенной для нагрузочных
+        прогонов, если не задан --force."""
+        if self.options.get('force'):
+            return
+        if not is_benchmark_database():
+            raise BenchmarkDatabaseError(
+                f'Сценарий {self.name} создает --corpus-size отзывов, '
+                'а имя БД не содержит benchmark. Запустите его на отдельной '
+                'БД или подтвердите --force.')
+        if Review.objects.exists():
+            raise BenchmarkDatabaseError(
+                f'Сценарий {self.name} создает --corpus-size отзывов, '
+                'а в БД уже есть отзывы. Запустите его на пустой БД '
+                'или подтвердите --force.')
+
+    def setup(self):
+        corpus_size = self.options.get('corpus_size') or 1_000_000
+        self.random = random.Random(corpus_size)
+        vocabulary = sorted({
+            ''.join(self.random.choices(self.syllables, k=3))
+            for _ in range(self.vocabulary_size)
+        })
+        self.random.shuffle(vocabulary)
+        self.vocabulary = vocabulary
+        self.weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+        authors_count = min(self.reviews_per_title, corpus_size)
+        self.users = User.objects.bulk_create(
+            User(username=f'{self.prefix}-{idx}',
+                 email=f'{self.prefix}-{idx}@yamdb.fake')
+            for idx in range(authors_count)
+        )
+        self.titles = Title.objects.bulk_create(
+            Title(name=f'{self.prefix}-{idx}', year=2000)
+            for idx in range(-(-corpus_size // authors_count))
+        )
+        reviews = (
+            Review(title=self.titles[idx // authors_count],
+                   author=self.users[idx % authors_count],
+                   text=self.make_text(self.words_per_review),
+                   score=idx % 10 + 1)
+            for idx in range(corpus_size)
+        )
+        while batch := list(islice(reviews, 10000)):
+            with transaction.atomic():
+                index_objects(Review, Review.objects.bulk_create(batch))
+
+    def make_text(self, words):
+        return ' '.join(self.random.choices(
+            self.vocabulary, weights=self.weights, k=words))
+
+    def make_request(self, client, idx):
+        title = self.titles[idx % len(self.titles)]
+        return client.get(f'/api/v1/titles/{title.id}/reviews/',
+                          data={'q': self.make_text(1 + idx % 2)})
+
+    def teardown(self):
+        # Отзывы удаляются одним DELETE без сигналов: пересчет рейтинга
+        # по каждому из миллиона отзывов не нужен
+        titles = Title.objects.filter(name__startswith=self.prefix)
+        reviews = Review.objects.filter(title__in=titles)
+        remove_objects(Review, reviews.values_list('id', flat=True))
+        review_table = connection.ops.quote_name(Review._meta.db_table)
+        title_table = connection.ops.quote_name(Title._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {review_table} WHERE title_id IN '
+                f'(SELECT id FROM {title_table} WHERE name LIKE %s)',
+                [f'{self.prefix}%'])
+        titles.delete()
+        User.objects.filter(username__startswith=self.prefix).delete()
+
+
+@register
+class TokenAttackScenario(Scenario):
+    """Подбор кода подтверждения одного пользователя с разных IP.
+
+    Считает запросы на запись в БД: ограничение частоты по имени
+    пользователя не дает им расти вместе с числом попыток.
+    """
+    name = 'token-attack'
+    description = 'POST /api/v1/auth/token/ с неверным кодом'
+    write_statements = ('INSERT', 'UPDATE', 'DELETE')
+
+    def setup(self):
+        self.user = User.objects.create(
+            username=self.prefix, email=f'{self.prefix}@yamdb.fake')
+        VerifyCode.objects.create(
+            user=self.user, code=GeneratingCodeService.generate_code())
+        self.writes = 0
+        self.statuses = {}
+        self.lock = threading.Lock()
+
+    def count_writes(self, execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith(self.write_statements):
+            with self.lock:
+                self.writes += 1
+        return execute(sql, params, many, context)
+
+    def make_request(self, client, idx):
+        with connection.execute_wrapper(self.count_writes):
+            response = client.post(
+                '/api/v1/auth/token/',
+                data={'username': self.user.username,
+                      'confirmation_code': 'wrong'},
+                content_type='application/json',
+                REMOTE_ADDR=f'10.0.{idx // 256 % 256}.{idx % 256}',
+            )
+        with self.lock:
+            self.statuses[response.status_code] = (
+                self.statuses.get(response.status_code, 0) + 1)
+        return response
+
+    def is_expected(self, response):
+        return response.status_code in (HTTPStatus.BAD_REQUEST,
+                                        HTTPStatus.TOO_MANY_REQUESTS)
+
+    def teardown(self):
+        self.user.delete()
+
+    def summary(self):
+        statuses = ', '.join(
+            f'{status}: {count}'
+            for status, count in sorted(self.statuses.items()))
+        return f'ответы {statuses}; запросов на запись в БД: {self.writes}'
@@ -0,0 +1,16 @@
+from .catalogue import (  # noqa
+    aget_generation,
+    build_key,
+    bump_generation,
+    cached_response,
+    get_etag,
+    get_generation,
+    is_not_modified,
+)
+from .users import (  # noqa
+    bump_user_version,
+    cache_user,
+    clear_user_cache,
+    get_cached_user,
+    get_user_version,
+)
@@ -0,0 +1,100 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from ...db_routers import CATALOGUE_PIN, pin_to_primary, replicas_enabled
+
+GENERATION_KEY = 'catalogue:generation'
+
+
+def new_generation():
+    """Номер поколения, который не повторяет прежние даже после
+    вытеснения счетчика из кэша."""
+    return time.time_ns()
+
+
+def get_generation():
+    """Возвращает текущее поколение данных каталога."""
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, new_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    """Асинхронный вариант get_generation."""
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, new_generation(), timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def bump_generation():
+    """Делает недействительными все закэшированные ответы каталога."""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, new_generation(), timeout=None)
+    if replicas_enabled():
+        # Новые ответы кэшируются с основной БД, пока реплики отстают
+        pin_to_primary(CATALOGUE_PIN)
+
+
+def build_key(request, query_params, generation=None):
+    """Ключ ответа: поколение, адрес и значимые параметры запроса
+    в упорядоченном виде."""
+    params = sorted(
+        (param, value)
+        for param in query_params
+        for value in request.GET.getlist(param)
+    )
+    query = urlencode(params)
+    # Адрес хэшируется: в ключах кэша нельзя использовать пробелы
+    # и произвольные символы
+    url = hashlib.md5(
+        f'{request.get_host()}{request.path}?{query}'.encode()).hexdigest()
+    if generation is None:
+        generation = get_generation()
+    return f'catalogue:{generation}:{url}'
+
+
+def get_etag(key):
+    return '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+
+
+def is_not_modified(request, etag):
+    """Клиент прислал If-None-Match с актуальным ETag."""
+    return etag in parse_etags(request.headers.get('If-None-Match', ''))
+
+
+def cached_response(handler, request, query_params, *args, **kwargs):
+    """Отдает ответ из кэша, а при его отсутствии вызывает обработчик
+    и кэширует успешный ответ.
+
+    Если клиент прислал If-None-Match с актуальным ETag, возвращает 304
+    без обращения к кэшу ответов и к БД.
+    """
+    key = build_key(request, query_params)
+    etag = get_etag(key)
+    if is_not_modified(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED,
+                        headers={'ETag': etag})
+
+    data = cache.get(key)
+    if data is None:
+        response = handler(request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        cache.set(key, response.data, settings.CATALOGUE_CACHE_TIMEOUT)
+    else:
+        response = Response(data)
+    response['ETag'] = etag
+    return response
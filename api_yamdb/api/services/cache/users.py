@@ -0,0 +1,61 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .catalogue import new_generation
+
+VERSION_KEY_TEMPLATE = 'auth:user:{}:version'
+
+# Пользователи в памяти процесса: id -> (пользователь, версия, срок)
+_users = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_user_version(user_id):
+    """Версия данных пользователя, общая для всех процессов."""
+    return cache.get(VERSION_KEY_TEMPLATE.format(user_id))
+
+
+def bump_user_version(user_id):
+    """Делает недействительным пользователя в кэшах всех процессов."""
+    key = VERSION_KEY_TEMPLATE.format(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, new_generation(), timeout=None)
+
+
+def get_cached_user(user_id, version):
+    """Возвращает копию пользователя из кэша процесса или None,
+    если его там нет, срок хранения истек или версия устарела."""
+    with _lock:
+        entry = _users.get(user_id)
+        if entry is None:
+            return None
+        user, cached_version, expires_at = entry
+        if cached_version != version or expires_at < time.monotonic():
+            del _users[user_id]
+            return None
+        _users.move_to_end(user_id)
+    return copy.copy(user)
+
+
+def cache_user(user_id, user, version):
+    """Сохраняет пользователя в кэше процесса, вытесняя давно
+    не использованных сверх AUTH_USER_CACHE_SIZE."""
+    expires_at = time.monotonic() + settings.AUTH_USER_CACHE_TIMEOUT
+    with _lock:
+        _users[user_id] = (copy.copy(user), version, expires_at)
+        _users.move_to_end(user_id)
+        while len(_users) > settings.AUTH_USER_CACHE_SIZE:
+            _users.popitem(last=False)
+
+
+def clear_user_cache():
+    """Очищает кэш пользователей текущего процесса."""
+    with _lock:
+        _users.clear()
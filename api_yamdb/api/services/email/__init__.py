@@ -1 +1,7 @@
 from .mail_sender import sender_mail  # noqa
+from .outbox import (  # noqa
+    deliver_batch,
+    deliver_pending,
+    get_queue_depth,
+    notify_outbox,
+)
@@ -1,12 +1,19 @@
-from django.conf import settings
-from django.core.mail import send_mail
+from django.db import transaction
+
+from users.models import OutgoingEmail
+
+from .outbox import notify_outbox
 
 
 def sender_mail(confirmation_code, recipient):
-    send_mail(
+    """Ставит письмо с кодом подтверждения в очередь на отправку.
+
+    Письмо записывается в текущей транзакции, а обработчик очереди
+    узнает о нем только после ее фиксации.
+    """
+    OutgoingEmail.objects.create(
         subject='Код подтверждения',
-        message=f'confirmation_code: {confirmation_code}',
-        from_email=settings.SENDERS_EMAIL,
-        recipient_list=[f'{recipient}'],
-        fail_silently=True,
+        body=f'confirmation_code: {confirmation_code}',
+        recipient=recipient,
     )
+    transaction.on_commit(notify_outbox)
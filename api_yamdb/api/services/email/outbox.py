@@ -0,0 +1,208 @@
+import logging
+import threading
+from datetime import timedelta
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+from ..metrics import REGISTRY, Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+
+class DeliveryReport(NamedTuple):
+    """Итог отправки одной пачки писем."""
+    sent: int = 0
+    failed: int = 0
+    latency_avg: float = 0.0
+    latency_max: float = 0.0
+
+
+def get_queue_depth():
+    """Количество писем, ожидающих отправки."""
+    return OutgoingEmail.objects.filter(
+        status=OutgoingEmail.Status.PENDING).count()
+
+
+EMAILS_SENT = Counter(
+    'yamdb_email_sent_total', 'Письма, отправленные процессом.')
+EMAILS_FAILED = Counter(
+    'yamdb_email_failed_total',
+    'Письма, отправка которых завершилась ошибкой.')
+EMAIL_QUEUE_DEPTH = Gauge(
+    'yamdb_email_queue_depth', 'Письма, ожидающие отправки.',
+    get_queue_depth)
+
+REGISTRY.register(EMAILS_SENT, EMAILS_FAILED, EMAIL_QUEUE_DEPTH)
+
+
+def retry_delay(attempt):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (attempt - 1))
+
+
+def claim_batch(batch_size):
+    """Забирает пачку писем, срок отправки которых наступил, помечая
+    их отправляемыми в короткой транзакции.
+
+    Письма, результат отправки которых не отмечен за
+    EMAIL_OUTBOX_CLAIM_TIMEOUT секунд (обработчик завершился во время
+    отправки), забираются снова.
+    """
+    now = timezone.now()
+    due = Q(status=OutgoingEmail.Status.PENDING,
+            next_attempt_at__lte=now) | Q(
+        status=OutgoingEmail.Status.SENDING,
+        claimed_at__lte=now - timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT))
+    with transaction.atomic():
+        # Блокировка строк не дает двум обработчикам забрать
+        # одно письмо (там, где БД ее поддерживает)
+        emails = list(OutgoingEmail.objects.select_for_update(
+            skip_locked=True).filter(due)[:batch_size])
+        if emails:
+            OutgoingEmail.objects.filter(
+                id__in=[email.id for email in emails]).update(
+                    status=OutgoingEmail.Status.SENDING, claimed_at=now)
+    return emails
+
+
+def send_claimed(emails):
+    """Отправляет письма по одному через одно соединение с почтовым
+    сервером. Вызывается вне транзакции.
+
+    Returns:
+        Отправленные письма, неотправленные письма и ошибка отправки.
+    """
+    sent = []
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                connection.send_messages([EmailMessage(
+                    email.subject, email.body, settings.SENDERS_EMAIL,
+                    [email.recipient])])
+                sent.append(email)
+    except Exception as error:
+        # Письма после ошибки не отправлялись: соединение уже ненадежно
+        return sent, emails[len(sent):], error
+    return sent, [], None
+
+
+def save_results(sent, failed, error):
+    """Отмечает результат отправки писем в короткой транзакции.
+
+    Неотправленные письма откладываются с экспоненциальной задержкой,
+    после EMAIL_OUTBOX_MAX_ATTEMPTS попыток помечаются как неотправленные.
+    """
+    now = timezone.now()
+    for email in failed:
+        email.attempts += 1
+        email.last_error = str(error)
+        email.next_attempt_at = now + retry_delay(email.attempts)
+        email.claimed_at = None
+        email.status = (
+            OutgoingEmail.Status.FAILED
+            if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+            else OutgoingEmail.Status.PENDING)
+    with transaction.atomic():
+        if sent:
+            OutgoingEmail.objects.filter(
+                id__in=[email.id for email in sent]).update(
+                    status=OutgoingEmail.Status.SENT, sent_at=now,
+                    claimed_at=None, attempts=F('attempts') + 1,
+                    last_error='')
+        if failed:
+            OutgoingEmail.objects.bulk_update(
+                failed, ('attempts', 'last_error', 'next_attempt_at',
+                         'claimed_at', 'status'))
+    return now
+
+
+def deliver_batch(batch_size=None):
+    """Отправляет пачку писем, срок отправки которых наступил.
+
+    Письма забираются и отмечаются в отдельных коротких транзакциях,
+    а отправка идет вне транзакции: блокировка записи в БД не держится
+    на время работы с почтовым сервером, а письма, отправленные до
+    ошибки, отмечаются отправленными и не уходят повторно.
+    """
+    emails = claim_batch(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE)
+    if not emails:
+        return DeliveryReport()
+    sent, failed, error = send_claimed(emails)
+    sent_at = save_results(sent, failed, error)
+    EMAILS_SENT.inc(len(sent))
+    EMAILS_FAILED.inc(len(failed))
+    if failed:
+        logger.warning('Письма не отправлены (%s): %s', len(failed), error)
+    latencies = [
+        (sent_at - email.created_at).total_seconds() for email in sent]
+    return DeliveryReport(
+        sent=len(sent),
+        failed=len(failed),
+        latency_avg=sum(latencies) / len(latencies) if sent else 0.0,
+        latency_max=max(latencies, default=0.0),
+    )
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет пачки писем, пока очередь не опустеет
+    или пачка не завершится ошибкой."""
+    total_sent = 0
+    while (report := deliver_batch(batch_size)).sent:
+        total_sent += report.sent
+    return total_sent
+
+
+class OutboxWorker(threading.Thread):
+    """Фоновый поток, отправляющий письма из очереди.
+
+    Просыпается по сигналу о новом письме или раз в
+    EMAIL_OUTBOX_POLL_INTERVAL секунд, чтобы повторить отложенные письма.
+    """
+
+    def __init__(self):
+        super().__init__(name='email-outbox', daemon=True)
+        self.wakeup = threading.Event()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(settings.EMAIL_OUTBOX_POLL_INTERVAL)
+            self.wakeup.clear()
+            try:
+                deliver_pending()
+            except Exception:
+                logger.exception('Ошибка обработчика очереди писем')
+            finally:
+                connections.close_all()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def notify_outbox():
+    """Сообщает обработчику очереди о новом письме.
+
+    Режим задается настройкой EMAIL_OUTBOX_MODE:
+        eager - письма отправляются сразу в текущем потоке (для тестов);
+        thread - письма отправляет фоновый поток процесса;
+        worker - письма отправляет только команда send_emails.
+    """
+    global _worker
+    mode = settings.EMAIL_OUTBOX_MODE
+    if mode == 'eager':
+        deliver_pending()
+    elif mode == 'thread':
+        with _worker_lock:
+            if _worker is None or not _worker.is_alive():
+                _worker = OutboxWorker()
+                _worker.start()
+        _worker.wakeup.set()
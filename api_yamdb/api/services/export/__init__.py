@@ -0,0 +1,2 @@
+from .streams import export_stream  # noqa
+from .tables import EXPORT_TABLES  # noqa
@@ -0,0 +1,90 @@
+import csv
+import json
+import zlib
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+EXPORT_CHUNK_SIZE = 2000
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+encoder = DjangoJSONEncoder()
+
+
+class LineBuffer:
+    """Файлоподобный объект для csv.writer: возвращает записанную строку
+    вместо накопления в памяти."""
+
+    def write(self, value):
+        return value
+
+
+def iterate_rows(table, since=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Строки таблицы по возрастанию id. Записи читаются из БД пачками,
+    поэтому память не зависит от размера таблицы."""
+    queryset = table.model.objects.order_by('id')
+    if since is not None:
+        queryset = queryset.filter(**{f'{table.date_field}__gte': since})
+    return queryset.values_list(*table.columns).iterator(
+        chunk_size=chunk_size)
+
+
+def format_value(value):
+    """Значение ячейки CSV: даты в формате ISO, как в файлах static/data."""
+    if value is None:
+        return ''
+    if isinstance(value, str | int):
+        return value
+    return encoder.default(value)
+
+
+def stream_csv(table, rows):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(table.columns)
+    for row in rows:
+        yield writer.writerow([format_value(value) for value in row])
+
+
+def stream_ndjson(table, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(table.columns, row)), cls=DjangoJSONEncoder,
+                         ensure_ascii=False) + '\n'
+
+
+STREAMS = {
+    'csv': (stream_csv, 'text/csv'),
+    'ndjson': (stream_ndjson, 'application/x-ndjson'),
+}
+
+
+def join_lines(lines, min_size=STREAM_BLOCK_SIZE):
+    """Склеивает строки в блоки не меньше min_size символов, чтобы
+    сервер не отправлял каждую строку отдельно."""
+    block, size = [], 0
+    for line in lines:
+        block.append(line)
+        size += len(line)
+        if size >= min_size:
+            yield ''.join(block)
+            block, size = [], 0
+    if block:
+        yield ''.join(block)
+
+
+def gzip_stream(blocks):
+    """Сжимает поток блоков в формат gzip."""
+    compressor = zlib.compressobj(wbits=31)
+    for block in blocks:
+        data = compressor.compress(block.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def export_stream(table, export_format, since=None, compress=False):
+    """Возвращает (поток данных, тип содержимого) выгрузки таблицы."""
+    stream, content_type = STREAMS[export_format]
+    blocks = join_lines(stream(table, iterate_rows(table, since)))
+    if compress:
+        return gzip_stream(blocks), 'application/gzip'
+    return blocks, content_type
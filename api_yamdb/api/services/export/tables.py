@@ -0,0 +1,38 @@
+from typing import NamedTuple
+
+from django.contrib.auth import get_user_model
+from django.db.models import Model
+
+from reviews.models import Category, Comment, Genre, Review, Title
+
+User = get_user_model()
+
+
+class ExportTable(NamedTuple):
+    """Выгружаемая таблица: модель, колонки в порядке файлов
+    static/data (их принимает команда download) и поле даты для
+    инкрементальной выгрузки."""
+    model: type[Model]
+    columns: tuple[str, ...]
+    date_field: str | None = None
+
+
+EXPORT_TABLES = {
+    'category': ExportTable(Category, ('id', 'name', 'slug')),
+    'genre': ExportTable(Genre, ('id', 'name', 'slug')),
+    # description в файле title.csv нет, download загружает его как есть
+    'title': ExportTable(
+        Title, ('id', 'name', 'year', 'category_id', 'description')),
+    'title_genre': ExportTable(
+        Title.genre.through, ('id', 'title_id', 'genre_id')),
+    'review': ExportTable(
+        Review, ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+        'pub_date'),
+    'comment': ExportTable(
+        Comment, ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+        'pub_date'),
+    'user': ExportTable(
+        User, ('id', 'username', 'email', 'role', 'bio', 'first_name',
+               'last_name'),
+        'date_joined'),
+}
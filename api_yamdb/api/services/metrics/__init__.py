@@ -0,0 +1,16 @@
+from .registry import (  # noqa
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    observe_request,
+)
+from .timing import (  # noqa
+    RequestTiming,
+    get_timing,
+    install_sql_timing,
+    measure,
+    timed_serializer_class,
+    timing_scope,
+)
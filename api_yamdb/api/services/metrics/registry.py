@@ -0,0 +1,155 @@
+import threading
+from bisect import bisect_left
+
+# Границы корзин гистограмм по умолчанию, секунды
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+                   5.0, 10.0)
+
+
+class Histogram:
+    """Гистограмма значений по наборам меток в формате Prometheus."""
+
+    def __init__(self, name, documentation, label_names,
+                 buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = buckets
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        with self.lock:
+            counts, total = self.series.get(
+                labels, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect_left(self.buckets, value)] += 1
+            self.series[labels] = counts, total + value
+
+    def format_labels(self, labels, **extra):
+        pairs = [*zip(self.label_names, labels), *extra.items()]
+        escaped = (
+            (name, str(value).replace('\\', r'\\').replace('"', r'\"'))
+            for name, value in pairs)
+        return '{' + ','.join(f'{name}="{value}"'
+                              for name, value in escaped) + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}',
+                 f'# TYPE {self.name} histogram']
+        with self.lock:
+            series = sorted(
+                (labels, list(counts), total)
+                for labels, (counts, total) in self.series.items())
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                lines.append(
+                    f'{self.name}_bucket'
+                    f'{self.format_labels(labels, le=bound)} {cumulative}')
+            lines.append(
+                f'{self.name}_sum{self.format_labels(labels)} {total}')
+            lines.append(
+                f'{self.name}_count{self.format_labels(labels)} '
+                f'{cumulative}')
+        return lines
+
+    def clear(self):
+        with self.lock:
+            self.series.clear()
+
+
+class Counter:
+    """Счетчик событий процесса в формате Prometheus."""
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def render(self):
+        return [f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} counter',
+                f'{self.name} {self.value}']
+
+    def clear(self):
+        with self.lock:
+            self.value = 0
+
+
+class Gauge:
+    """Текущее значение, которое вычисляется функцией collect
+    при каждом сборе метрик."""
+
+    def __init__(self, name, documentation, collect):
+        self.name = name
+        self.documentation = documentation
+        self.collect = collect
+
+    def render(self):
+        return [f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} gauge',
+                f'{self.name} {self.collect()}']
+
+    def clear(self):
+        pass
+
+
+class MetricsRegistry:
+    """Метрики процесса. Каждый процесс сервера собирает свои метрики,
+    Prometheus опрашивает процессы по отдельности."""
+
+    def __init__(self, *metrics):
+        self.metrics = list(metrics)
+
+    def register(self, *metrics):
+        """Добавляет метрики других сервисов."""
+        self.metrics.extend(metrics)
+
+    def render(self):
+        return '\n'.join(
+            line for metric in self.metrics for line in metric.render()
+        ) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+LABELS = ('view', 'method')
+
+REQUEST_DURATION = Histogram(
+    'yamdb_request_duration_seconds',
+    'Время обработки запроса.', LABELS)
+SQL_DURATION = Histogram(
+    'yamdb_request_sql_duration_seconds',
+    'Время запросов к БД за один запрос API.', LABELS)
+SQL_QUERIES = Histogram(
+    'yamdb_request_sql_queries',
+    'Количество запросов к БД за один запрос API.', LABELS,
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100))
+SERIALIZER_DURATION = Histogram(
+    'yamdb_request_serializer_duration_seconds',
+    'Время работы сериализаторов за один запрос API.', LABELS)
+AUTH_DURATION = Histogram(
+    'yamdb_request_auth_duration_seconds',
+    'Время аутентификации за один запрос API.', LABELS)
+
+REGISTRY = MetricsRegistry(REQUEST_DURATION, SQL_DURATION, SQL_QUERIES,
+                           SERIALIZER_DURATION, AUTH_DURATION)
+
+
+def observe_request(timing, method, total):
+    """Добавляет замеры завершенного запроса в гистограммы маршрута."""
+    labels = (timing.view_name or 'unknown', method)
+    REQUEST_DURATION.observe(total, *labels)
+    SQL_DURATION.observe(timing.sql_time, *labels)
+    SQL_QUERIES.observe(timing.sql_count, *labels)
+    SERIALIZER_DURATION.observe(
+        timing.durations.get('serializer', 0.0), *labels)
+    AUTH_DURATION.observe(timing.durations.get('auth', 0.0), *labels)
@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache
+from time import perf_counter
+
+
+class RequestTiming:
+    """Время обработки запроса по составляющим.
+
+    sql_time и sql_count собирает обертка запросов к БД, остальные
+    составляющие (auth, serializer) - measure. Время составляющих
+    не включает время запросов к БД, выполненных внутри них.
+    """
+
+    def __init__(self):
+        self.start = perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.durations = {}
+        self.view_name = None
+
+    @property
+    def total(self):
+        return perf_counter() - self.start
+
+    def add(self, name, duration):
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += perf_counter() - start
+            self.sql_count += 1
+
+    def server_timing(self):
+        """Значение заголовка Server-Timing, длительности в мс."""
+        metrics = [f'total;dur={self.total * 1000:.1f}',
+                   f'sql;dur={self.sql_time * 1000:.1f};'
+                   f'desc="{self.sql_count} queries"']
+        metrics.extend(f'{name};dur={duration * 1000:.1f}'
+                       for name, duration in self.durations.items())
+        if self.view_name:
+            metrics.append(f'view;desc="{self.view_name}"')
+        return ', '.join(metrics)
+
+
+_timing = ContextVar('request_timing', default=None)
+
+
+def get_timing():
+    """Возвращает замеры текущего запроса или None вне запроса."""
+    return _timing.get()
+
+
+@contextmanager
+def timing_scope():
+    """Собирает замеры запроса: время и количество запросов ко всем БД
+    (их учитывает record_query)."""
+    timing = RequestTiming()
+    token = _timing.set(timing)
+    try:
+        yield timing
+    finally:
+        _timing.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """Обертка запросов к БД: добавляет запрос к замерам текущего
+    запроса API, если они собираются."""
+    timing = _timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing.execute_wrapper(execute, sql, params, many, context)
+
+
+def install_sql_timing(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает record_query
+    к соединению с БД.
+
+    Соединения у каждого потока свои, а под ASGI запросы к БД идут
+    в потоках sync_to_async, поэтому обертка ставится на каждое
+    соединение, а не на соединения потока, начавшего запрос. Замеры
+    запроса record_query находит через ContextVar, который
+    sync_to_async передает в поток.
+
+    Обертка ставится первой: соединение может открыться внутри
+    connection.execute_wrapper(), который при выходе снимает последнюю
+    обертку списка.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+@contextmanager
+def measure(name):
+    """Добавляет время блока к составляющей name текущего запроса."""
+    timing = _timing.get()
+    if timing is None:
+        yield
+        return
+    start, sql_time = perf_counter(), timing.sql_time
+    try:
+        yield
+    finally:
+        timing.add(name, perf_counter() - start
+                   - (timing.sql_time - sql_time))
+
+
+class TimedSerializerMixin:
+    """Замеряет проверку и представление данных сериализатором."""
+
+    def run_validation(self, *args, **kwargs):
+        with measure('serializer'):
+            return super().run_validation(*args, **kwargs)
+
+    def to_representation(self, instance):
+        with measure('serializer'):
+            return super().to_representation(instance)
+
+
+@cache
+def timed_serializer_class(serializer_class):
+    """Подкласс сериализатора с замером времени.
+
+    Для списков (many=True) замеряется каждый элемент, вложенные
+    сериализаторы входят во время внешнего.
+    """
+    return type(serializer_class.__name__,
+                (TimedSerializerMixin, serializer_class), {})
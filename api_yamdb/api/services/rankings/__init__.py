@@ -0,0 +1,6 @@
+from .top_titles import (  # noqa
+    build_rankings,
+    rebuild_rankings,
+    refresh_rankings,
+    top_titles,
+)
@@ -0,0 +1,70 @@
+from django.db import transaction
+
+from reviews.models import Title, TitleRanking
+
+from ..snapshots.title_snapshots import REBUILD_BATCH_SIZE, iterate_title_ids
+
+
+def build_rankings(title_ids):
+    """Строит строки рейтинга произведений: общую и по одной на жанр."""
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=title_ids).values_list('title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    return [
+        TitleRanking(title_id=title_id, genre_id=genre_id,
+                     category_id=category_id, year=year, rating=rating,
+                     review_count=review_count)
+        for title_id, category_id, year, rating, review_count
+        in Title.objects.filter(id__in=title_ids).values_list(
+            'id', 'category_id', 'year', 'rating', 'review_count')
+        for genre_id in [None, *genres.get(title_id, ())]
+    ]
+
+
+def refresh_rankings(title_ids):
+    """Пересобирает строки рейтинга перечисленных произведений.
+
+    Нужна после изменения жанров, категории или года произведения;
+    рейтинг и количество отзывов переносит TitleQuerySet.sync_rankings.
+    """
+    title_ids = list(title_ids)
+    with transaction.atomic():
+        TitleRanking.objects.filter(title_id__in=title_ids).delete()
+        TitleRanking.objects.bulk_create(build_rankings(title_ids))
+
+
+def rebuild_rankings(batch_size=REBUILD_BATCH_SIZE):
+    """Пересобирает строки рейтинга всех произведений пачками.
+
+    Returns:
+        Количество обработанных произведений.
+    """
+    count = 0
+    for title_ids in iterate_title_ids(batch_size):
+        refresh_rankings(title_ids)
+        count += len(title_ids)
+    return count
+
+
+def top_titles(queryset, genre=None, category=None, year=None):
+    """Фильтрует произведения по строкам рейтинга и упорядочивает
+    по убыванию рейтинга, при равном рейтинге - по количеству отзывов.
+
+    Без жанра используется общая строка произведения, поэтому
+    каждое произведение попадает в результат один раз. Все условия
+    заданы одним filter(), чтобы сортировка шла по той же строке
+    рейтинга, а запрос читал ее по индексу жанра.
+    """
+    # Поиск slug__lower зарегистрирован в ApiConfig.ready
+    lookups = {'rankings__rating__isnull': False}
+    if genre is None:
+        lookups['rankings__genre__isnull'] = True
+    else:
+        lookups['rankings__genre__slug__lower'] = genre.lower()
+    if category is not None:
+        lookups['rankings__category__slug__lower'] = category.lower()
+    if year is not None:
+        lookups['rankings__year'] = year
+    return queryset.filter(**lookups).order_by(
+        '-rankings__rating', '-rankings__review_count', 'id')
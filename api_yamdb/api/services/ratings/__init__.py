@@ -0,0 +1,6 @@
+from .deferred import (  # noqa
+    flush_dirty_titles,
+    mark_title_dirty,
+    recount_all_titles,
+    recount_titles,
+)
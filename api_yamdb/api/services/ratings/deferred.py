@@ -0,0 +1,110 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+
+from reviews.models import DirtyTitle, Title
+
+from ..cache import bump_generation
+from ..snapshots.title_snapshots import REBUILD_BATCH_SIZE, iterate_title_ids
+
+logger = logging.getLogger(__name__)
+
+FLUSH_BATCH_SIZE = 500
+
+
+def mark_title_dirty(title_id):
+    """Ставит произведение в очередь на пересчет рейтинга.
+
+    Повторные отметки до пересчета игнорируются. Отметка пишется в
+    транзакции изменения отзыва, поэтому не теряется при сбое.
+    """
+    DirtyTitle.objects.bulk_create(
+        [DirtyTitle(title_id=title_id)], ignore_conflicts=True)
+    transaction.on_commit(notify_rating_worker)
+
+
+def recount_titles(title_ids):
+    """Пересчитывает счетчики оценок, гистограмму и рейтинг произведений
+    по их отзывам (см. TitleQuerySet.recount_ratings)."""
+    return Title.objects.filter(id__in=title_ids).recount_ratings()
+
+
+def recount_all_titles(batch_size=REBUILD_BATCH_SIZE):
+    """Пересчитывает счетчики, гистограмму и рейтинг всех произведений:
+    один сгруппированный UPDATE на пачку произведений.
+
+    Returns:
+        Количество пересчитанных произведений.
+    """
+    total = 0
+    for title_ids in iterate_title_ids(batch_size):
+        with transaction.atomic():
+            recount_titles(title_ids)
+        total += len(title_ids)
+    transaction.on_commit(bump_generation)
+    return total
+
+
+def flush_dirty_titles(batch_size=FLUSH_BATCH_SIZE):
+    """Пересчитывает рейтинг отмеченных произведений пачками.
+
+    Отметки удаляются до пересчета в той же транзакции: изменение
+    отзыва, зафиксированное позже, отметит произведение заново.
+    Возвращает количество пересчитанных произведений.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            title_ids = list(DirtyTitle.objects.select_for_update(
+                skip_locked=True).values_list(
+                    'title_id', flat=True)[:batch_size])
+            if not title_ids:
+                break
+            DirtyTitle.objects.filter(title_id__in=title_ids).delete()
+            recount_titles(title_ids)
+        total += len(title_ids)
+    if total:
+        bump_generation()
+        logger.info('Пересчитан рейтинг произведений: %s', total)
+    return total
+
+
+class RatingWorker(threading.Thread):
+    """Фоновый поток, пересчитывающий рейтинг отмеченных произведений
+    не чаще раза в RATING_MAX_STALENESS секунд.
+
+    Отзывы, измененные за это время, пересчитываются одним запросом.
+    """
+
+    def __init__(self):
+        super().__init__(name='rating-worker', daemon=True)
+
+    def run(self):
+        while True:
+            time.sleep(settings.RATING_MAX_STALENESS)
+            try:
+                flush_dirty_titles()
+            except Exception:
+                logger.exception('Ошибка пересчета рейтинга')
+            finally:
+                connections.close_all()
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def notify_rating_worker():
+    """Запускает фоновый поток пересчета, если он еще не запущен
+    (режим thread). В режиме worker пересчет выполняет команда
+    flush_ratings."""
+    global _worker
+    if settings.RATING_UPDATE_MODE != 'thread':
+        return
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = RatingWorker()
+            _worker.start()
@@ -0,0 +1,8 @@
+from .index import (  # noqa
+    KINDS_BY_MODEL,
+    SEARCH_KINDS,
+    index_objects,
+    rebuild_search_index,
+    remove_objects,
+    search,
+)
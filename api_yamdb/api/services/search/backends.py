@@ -0,0 +1,145 @@
+import re
+from functools import reduce
+from operator import and_
+
+from django.db.models import Q
+
+# Конфигурация полнотекстового поиска PostgreSQL (см. миграцию
+# reviews.0041_search_index)
+POSTGRESQL_CONFIG = 'russian'
+
+# Больше слов в запросе не учитывается
+MAX_QUERY_WORDS = 8
+
+
+def split_query(query):
+    """Слова запроса без операторов и кавычек языка поиска СУБД."""
+    return re.findall(r'\w+', query.lower())[:MAX_QUERY_WORDS]
+
+
+class SearchBackend:
+    """Поиск без индекса: LIKE по полям модели.
+
+    Используется для СУБД, для которых миграция не создает таблиц
+    поиска. Записи индекса не ведутся.
+    """
+
+    def index(self, cursor, kind, rows):
+        pass
+
+    def remove(self, cursor, kind, ids):
+        pass
+
+    def clear(self, cursor, kind):
+        pass
+
+    def search(self, cursor, kind, words, parent_id, limit):
+        queryset = kind.model.objects.filter(reduce(and_, (
+            reduce(lambda left, right: left | right, (
+                Q(**{f'{field}__icontains': word}) for field in kind.fields
+            ))
+            for word in words
+        )))
+        if parent_id is not None:
+            queryset = queryset.filter(**{kind.parent_field: parent_id})
+        return list(queryset.values_list('id', flat=True)[:limit])
+
+
+class SqliteSearchBackend(SearchBackend):
+    """Поиск по виртуальным таблицам FTS5, rowid - id объекта.
+
+    Родитель публикации хранится токеном p<id> в колонке parent, чтобы
+    FTS5 отбирал публикации одного произведения (отзыва) по индексу.
+    """
+
+    def columns(self, kind):
+        return (('parent',) if kind.parent_field else ()) + kind.fields
+
+    def index(self, cursor, kind, rows):
+        table = f'search_{kind.name}'
+        columns = self.columns(kind)
+        # OR REPLACE заменяет прежнюю запись с тем же rowid
+        cursor.executemany(
+            f'INSERT OR REPLACE INTO {table} (rowid, {", ".join(columns)}) '
+            f'VALUES ({", ".join(["%s"] * (len(columns) + 1))})',
+            [
+                (pk, *((f'p{parent_id}',) if kind.parent_field else ()),
+                 *texts)
+                for pk, parent_id, *texts in rows
+            ],
+        )
+
+    def remove(self, cursor, kind, ids):
+        cursor.executemany(f'DELETE FROM search_{kind.name} WHERE rowid = %s',
+                           [(pk,) for pk in ids])
+
+    def clear(self, cursor, kind):
+        cursor.execute(f'DELETE FROM search_{kind.name}')
+
+    def search(self, cursor, kind, words, parent_id, limit):
+        table = f'search_{kind.name}'
+        terms = ' AND '.join(f'"{word}"*' for word in words)
+        match = f'{{{" ".join(kind.fields)}}} : ({terms})'
+        if parent_id is not None:
+            match = f'parent : "p{parent_id}" AND {match}'
+        # Первое поле весит больше: название важнее описания
+        weights = ([0.0] if kind.parent_field else []) + [
+            10.0 ** (len(kind.fields) - position - 1)
+            for position in range(len(kind.fields))
+        ]
+        cursor.execute(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+            f'ORDER BY bm25({table}, {", ".join(map(str, weights))}) '
+            'LIMIT %s',
+            [match, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Поиск по колонке tsvector с GIN-индексом."""
+    weights = 'ABCD'
+
+    def document_sql(self, kind):
+        return ' || '.join(
+            f"setweight(to_tsvector('{POSTGRESQL_CONFIG}', %s), "
+            f"'{self.weights[position]}')"
+            for position in range(len(kind.fields)))
+
+    def index(self, cursor, kind, rows):
+        cursor.executemany(
+            f'INSERT INTO search_{kind.name} (id, parent_id, document) '
+            f'VALUES (%s, %s, {self.document_sql(kind)}) '
+            'ON CONFLICT (id) DO UPDATE SET parent_id = EXCLUDED.parent_id, '
+            'document = EXCLUDED.document',
+            rows)
+
+    def remove(self, cursor, kind, ids):
+        cursor.execute(f'DELETE FROM search_{kind.name} WHERE id = ANY(%s)',
+                       [list(ids)])
+
+    def clear(self, cursor, kind):
+        cursor.execute(f'TRUNCATE search_{kind.name}')
+
+    def search(self, cursor, kind, words, parent_id, limit):
+        table = f'search_{kind.name}'
+        parent_sql, params = '', [' & '.join(f'{word}:*' for word in words)]
+        if parent_id is not None:
+            parent_sql = 'AND parent_id = %s '
+            params.append(parent_id)
+        cursor.execute(
+            f'SELECT id FROM {table}, '
+            f"to_tsquery('{POSTGRESQL_CONFIG}', %s) query "
+            f'WHERE document @@ query {parent_sql}'
+            'ORDER BY ts_rank(document, query) DESC LIMIT %s',
+            params + [limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+BACKENDS = {
+    'sqlite': SqliteSearchBackend(),
+    'postgresql': PostgresSearchBackend(),
+}
+
+
+def get_backend(connection):
+    return BACKENDS.get(connection.vendor, SearchBackend())
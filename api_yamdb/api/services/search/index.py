@@ -0,0 +1,98 @@
+from itertools import islice
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Model
+
+from reviews.models import Comment, Review, Title
+
+from .backends import get_backend, split_query
+
+REBUILD_BATCH_SIZE = 5000
+
+
+class SearchKind(NamedTuple):
+    """Вид индексируемых объектов: модель, поля поиска в порядке
+    убывания веса и поле родителя, внутри которого ищут публикации."""
+    name: str
+    model: type[Model]
+    fields: tuple[str, ...]
+    parent_field: str | None = None
+
+
+SEARCH_KINDS = {
+    kind.name: kind for kind in (
+        SearchKind('title', Title, ('name', 'description')),
+        SearchKind('review', Review, ('text',), 'title_id'),
+        SearchKind('comment', Comment, ('text',), 'review_id'),
+    )
+}
+
+KINDS_BY_MODEL = {kind.model: kind for kind in SEARCH_KINDS.values()}
+
+
+def get_rows(kind, objects):
+    """Строки индекса: (id, id родителя, тексты полей)."""
+    return [
+        (obj.pk,
+         getattr(obj, kind.parent_field) if kind.parent_field else None,
+         *(getattr(obj, field) for field in kind.fields))
+        for obj in objects
+    ]
+
+
+def index_objects(model, objects):
+    """Добавляет или обновляет объекты в индексе поиска."""
+    kind = KINDS_BY_MODEL[model]
+    connection = connections[router.db_for_write(model)]
+    with connection.cursor() as cursor:
+        get_backend(connection).index(cursor, kind, get_rows(kind, objects))
+
+
+def remove_objects(model, ids):
+    """Удаляет объекты из индекса поиска."""
+    kind = KINDS_BY_MODEL[model]
+    connection = connections[router.db_for_write(model)]
+    with connection.cursor() as cursor:
+        get_backend(connection).remove(cursor, kind, ids)
+
+
+def search(kind_name, query, parent_id=None):
+    """Возвращает id объектов, подходящих под запрос, от самых
+    релевантных, не больше SEARCH_MAX_RESULTS.
+
+    Публикации ищутся только внутри родителя parent_id.
+    """
+    words = split_query(query)
+    if not words:
+        return []
+    kind = SEARCH_KINDS[kind_name]
+    connection = connections[router.db_for_read(kind.model)]
+    with connection.cursor() as cursor:
+        return get_backend(connection).search(
+            cursor, kind, words, parent_id, settings.SEARCH_MAX_RESULTS)
+
+
+def rebuild_search_index(kind_names=None, batch_size=REBUILD_BATCH_SIZE):
+    """Строит индекс указанных видов заново пачками объектов.
+
+    Индекс вида очищается и заполняется в одной транзакции: поиск
+    до ее фиксации работает по прежнему индексу.
+    Возвращает количество проиндексированных объектов.
+    """
+    total = 0
+    for kind_name in kind_names or SEARCH_KINDS:
+        kind = SEARCH_KINDS[kind_name]
+        fields = ('id',) + ((kind.parent_field,) if kind.parent_field
+                            else ()) + kind.fields
+        connection = connections[router.db_for_write(kind.model)]
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                get_backend(connection).clear(cursor, kind)
+            objects = kind.model.objects.only(*fields).order_by(
+                'id').iterator(chunk_size=batch_size)
+            while batch := list(islice(objects, batch_size)):
+                index_objects(kind.model, batch)
+                total += len(batch)
+    return total
@@ -0,0 +1,6 @@
+from .title_snapshots import (  # noqa
+    build_snapshot_data,
+    find_stale_snapshots,
+    rebuild_snapshots,
+    refresh_snapshots,
+)
@@ -0,0 +1,76 @@
+from django.conf import settings
+
+from api.serializers import TitleReadSerializer
+from reviews.models import Title, TitleSnapshot
+
+# Сколько произведений обновляется за один проход при полной пересборке
+REBUILD_BATCH_SIZE = 1000
+
+
+def build_snapshot_data(title):
+    """Сериализует произведение для хранения в представлении.
+    Рейтинг не сохраняется, он подставляется при чтении."""
+    data = TitleReadSerializer(title).data
+    data.pop('rating')
+    return dict(data)
+
+
+def titles_for_snapshots(title_ids):
+    return Title.objects.filter(id__in=title_ids).select_related(
+        'category').prefetch_related('genre')
+
+
+def refresh_snapshots(title_ids):
+    """Пересобирает представления перечисленных произведений."""
+    if not settings.TITLE_SNAPSHOTS_ENABLED:
+        return
+    snapshots = [
+        TitleSnapshot(title=title, data=build_snapshot_data(title))
+        for title in titles_for_snapshots(title_ids)
+    ]
+    TitleSnapshot.objects.bulk_create(
+        snapshots, update_conflicts=True, unique_fields=('title',),
+        update_fields=('data', 'updated_at'))
+
+
+def iterate_title_ids(batch_size=REBUILD_BATCH_SIZE):
+    """Отдает id всех произведений пачками по возрастанию."""
+    last_id = 0
+    while title_ids := list(
+            Title.objects.filter(id__gt=last_id).order_by('id')
+            .values_list('id', flat=True)[:batch_size]):
+        yield title_ids
+        last_id = title_ids[-1]
+
+
+def rebuild_snapshots(batch_size=REBUILD_BATCH_SIZE):
+    """Пересобирает представления всех произведений пачками.
+
+    Returns:
+        Количество пересобранных представлений.
+    """
+    if not settings.TITLE_SNAPSHOTS_ENABLED:
+        return 0
+    count = 0
+    for title_ids in iterate_title_ids(batch_size):
+        refresh_snapshots(title_ids)
+        count += len(title_ids)
+    return count
+
+
+def find_stale_snapshots(batch_size=REBUILD_BATCH_SIZE):
+    """Находит произведения, у которых представление отсутствует
+    или не совпадает с актуальными данными.
+
+    Returns:
+        Список id таких произведений.
+    """
+    stale = []
+    for title_ids in iterate_title_ids(batch_size):
+        stored = dict(TitleSnapshot.objects.filter(
+            title_id__in=title_ids).values_list('title_id', 'data'))
+        stale.extend(
+            title.id for title in titles_for_snapshots(title_ids)
+            if stored.get(title.id) != build_snapshot_data(title)
+        )
+    return stale
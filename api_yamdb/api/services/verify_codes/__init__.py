@@ -0,0 +1,6 @@
+from .purge import (  # noqa
+    PurgeReport,
+    get_code_stats,
+    purge_codes,
+    start_purge_scheduler,
+)
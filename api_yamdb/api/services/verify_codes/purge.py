@@ -0,0 +1,101 @@
+import logging
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from users.models import VerifyCode
+
+logger = logging.getLogger(__name__)
+
+
+class PurgeReport(NamedTuple):
+    """Итог очистки кодов подтверждения."""
+    purged: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+
+class CodeStats(NamedTuple):
+    """Размер таблицы кодов подтверждения."""
+    total: int
+    stale: int
+
+
+def stale_codes():
+    """Использованные коды и коды с истекшим сроком действия."""
+    return VerifyCode.objects.filter(
+        Q(is_used=True) | Q(expires_at__lt=timezone.now()))
+
+
+def get_code_stats():
+    """Количество всех кодов и кодов, ожидающих удаления."""
+    return CodeStats(**VerifyCode.objects.aggregate(
+        total=Count('id'),
+        stale=Count('id', filter=Q(is_used=True)
+                    | Q(expires_at__lt=timezone.now()))))
+
+
+def purge_codes(batch_size=None, max_batches=None):
+    """Удаляет использованные и истекшие коды пачками.
+
+    Каждая пачка удаляется в отдельной короткой транзакции, поэтому
+    запись в таблицу не блокируется надолго даже при большом
+    количестве накопившихся кодов.
+    """
+    batch_size = batch_size or settings.VERIFY_CODE_PURGE_BATCH_SIZE
+    start = time.perf_counter()
+    purged = batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            ids = list(stale_codes().order_by().values_list(
+                'id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = VerifyCode.objects.filter(id__in=ids).delete()
+        purged += deleted
+        batches += 1
+    report = PurgeReport(purged, batches, time.perf_counter() - start)
+    if purged:
+        logger.info('Удалено кодов подтверждения: %s за %.2f с',
+                    purged, report.elapsed)
+    return report
+
+
+class PurgeScheduler(threading.Thread):
+    """Фоновый поток, удаляющий устаревшие коды раз в
+    VERIFY_CODE_PURGE_INTERVAL секунд."""
+
+    def __init__(self):
+        super().__init__(name='verify-code-purge', daemon=True)
+
+    def run(self):
+        while True:
+            time.sleep(settings.VERIFY_CODE_PURGE_INTERVAL)
+            try:
+                purge_codes()
+            except Exception:
+                logger.exception('Ошибка очистки кодов подтверждения')
+            finally:
+                connections.close_all()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_purge_scheduler():
+    """Запускает фоновую очистку кодов, если она включена настройкой
+    VERIFY_CODE_PURGE_INTERVAL и еще не запущена. Без нее коды удаляет
+    команда purge_codes."""
+    global _scheduler
+    if not settings.VERIFY_CODE_PURGE_INTERVAL:
+        return
+    with _scheduler_lock:
+        if _scheduler is None or not _scheduler.is_alive():
+            _scheduler = PurgeScheduler()
+            _scheduler.start()
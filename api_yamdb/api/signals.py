@@ -1,20 +1,187 @@
-from django.db.models import Avg
-from django.db.models.signals import post_delete, post_save
+from functools import partial
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+)
 from django.dispatch import receiver
 
-from reviews.models import Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import catalogue_imported
+from users.models import VerifyCode
 
+from .services.cache import bump_generation, bump_user_version
+from .services.rankings import rebuild_rankings, refresh_rankings
+from .services.ratings import mark_title_dirty
+from .services.search import (
+    index_objects,
+    rebuild_search_index,
+    remove_objects,
+)
+from .services.snapshots import rebuild_snapshots, refresh_snapshots
+from .services.verify_codes import start_purge_scheduler
 
-@receiver([post_save, post_delete], sender=Review)
-def update_title_rating(sender, instance, **kwargs):
+User = get_user_model()
+
+
+@receiver(post_save, sender=Review)
+def update_title_rating(sender, instance, created, **kwargs):
     """Обновляет рейтинг произведения.
-    Вызывается после сохранения или удаления записи в модели Review
+    Вызывается после сохранения записи в модели Review
     """
-    title_id = instance.title_id
-    reviews = Review.objects.filter(title_id=title_id)
-    if reviews:
-        avg_rating = reviews.aggregate(Avg('score'))['score__avg']
-        rating = round(avg_rating)
+    previous_score = getattr(instance, '_loaded_score', None)
+    if settings.RATING_UPDATE_MODE != 'sync':
+        # Отложенный режим: рейтинг пересчитает обработчик очереди
+        if created or previous_score != instance.score:
+            mark_title_dirty(instance.title_id)
+        instance._loaded_score = instance.score
+        return
+    if created:
+        score_delta, count_delta = instance.score, 1
+        histogram_delta = {instance.score: 1}
+    elif previous_score is None:
+        # Отзыв не загружался из БД: прежняя оценка неизвестна.
+        Title.objects.filter(id=instance.title_id).recount_ratings()
+        score_delta = count_delta = 0
     else:
-        rating = None
-    Title.objects.filter(id=title_id).update(rating=rating)
+        score_delta, count_delta = instance.score - previous_score, 0
+        histogram_delta = {previous_score: -1, instance.score: 1}
+    if score_delta or count_delta:
+        Title.objects.filter(id=instance.title_id).change_scores(
+            score_delta, count_delta, histogram_delta)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def reduce_title_rating(sender, instance, **kwargs):
+    """Обновляет рейтинг произведения.
+    Вызывается после удаления записи в модели Review
+    """
+    if settings.RATING_UPDATE_MODE != 'sync':
+        mark_title_dirty(instance.title_id)
+        return
+    Title.objects.filter(id=instance.title_id).change_scores(
+        -instance.score, -1, {instance.score: -1})
+
+
+def refresh_titles(title_ids):
+    """Обновляет представления и строки рейтинга произведений."""
+    title_ids = list(title_ids)
+    refresh_snapshots(title_ids)
+    refresh_rankings(title_ids)
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Genre)
+@receiver([post_save, post_delete], sender=Title)
+@receiver([post_save, post_delete], sender=Review)
+@receiver(m2m_changed, sender=Title.genre.through)
+@receiver(catalogue_imported)
+def invalidate_catalogue_cache(sender, **kwargs):
+    """Сбрасывает кэш ответов каталога после фиксации транзакции,
+    чтобы новое поколение не закэшировало еще не записанные данные."""
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_snapshot(sender, instance, **kwargs):
+    """Обновляет представление и строки рейтинга сохраненного
+    произведения."""
+    refresh_titles([instance.id])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_genre_titles_snapshots(sender, instance, action, reverse,
+                                   pk_set, **kwargs):
+    """Обновляет представления произведений при изменении их жанров.
+    При изменении со стороны жанра (genre.titles) pk_set содержит id
+    произведений, а при очистке связей они запоминаются заранее."""
+    if not reverse:
+        if action.startswith('post_'):
+            refresh_titles([instance.id])
+    elif action == 'pre_clear':
+        instance._snapshot_title_ids = list(
+            instance.titles.values_list('id', flat=True))
+    elif action == 'post_clear':
+        refresh_titles(instance._snapshot_title_ids)
+    elif action in ('post_add', 'post_remove'):
+        refresh_titles(pk_set)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def refresh_related_titles_snapshots(sender, instance, created, **kwargs):
+    """Обновляет представления произведений измененной категории
+    или жанра."""
+    if not created:
+        refresh_snapshots(instance.titles.values_list('id', flat=True))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def remember_related_titles(sender, instance, **kwargs):
+    """Запоминает произведения удаляемой категории или жанра:
+    после удаления связи с ними уже не найти."""
+    instance._snapshot_title_ids = list(
+        instance.titles.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def refresh_orphaned_titles_snapshots(sender, instance, **kwargs):
+    """Обновляет представления произведений удаленной категории
+    или жанра. Строки рейтинга удаляет или обновляет сама БД
+    (on_delete у TitleRanking)."""
+    refresh_snapshots(instance._snapshot_title_ids)
+
+
+@receiver(catalogue_imported)
+def rebuild_titles_snapshots(sender, **kwargs):
+    """Пересобирает представления и строки рейтинга после массовой
+    загрузки данных."""
+    rebuild_snapshots()
+    rebuild_rankings()
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Сбрасывает пользователя в кэшах аутентификации всех процессов
+    после фиксации транзакции."""
+    transaction.on_commit(partial(bump_user_version, instance.pk))
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, **kwargs):
+    """Обновляет объект в индексе полнотекстового поиска."""
+    index_objects(sender, [instance])
+
+
+@receiver(post_delete, sender=Title)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, **kwargs):
+    """Удаляет объект из индекса полнотекстового поиска."""
+    remove_objects(sender, [instance.pk])
+
+
+@receiver(catalogue_imported)
+def rebuild_search(sender, search_index=True, **kwargs):
+    """Строит индекс поиска заново после массовой загрузки данных,
+    если отправитель не отложил это (search_index=False)."""
+    if search_index:
+        rebuild_search_index()
+
+
+@receiver(post_save, sender=VerifyCode)
+def schedule_codes_purge(sender, created, **kwargs):
+    """Запускает фоновую очистку кодов подтверждения при выдаче
+    первого кода, если она включена."""
+    if created:
+        transaction.on_commit(start_purge_scheduler)
@@ -0,0 +1,85 @@
+import hashlib
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Ограничение частоты запросов по скользящему окну.
+
+    В отличие от SimpleRateThrottle, который хранит в кэше время каждого
+    запроса, хранятся только два счетчика: текущего и предыдущего окна.
+    Число запросов за последние duration секунд оценивается как текущий
+    счетчик плюс доля предыдущего, пропорциональная перекрытию окон.
+    Счетчик увеличивается атомарным cache.incr, поэтому параллельные
+    запросы не теряют друг друга.
+    """
+
+    def get_rate(self):
+        # Частота читается при каждом запросе, а не при импорте класса,
+        # чтобы ее можно было изменить в настройках
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window, self.elapsed = divmod(self.now / self.duration, 1)
+        current_key = f'{self.key}:{int(window)}'
+        counters = self.cache.get_many(
+            [current_key, f'{self.key}:{int(window) - 1}'])
+        self.current = counters.pop(current_key, 0)
+        self.previous = next(iter(counters.values()), 0)
+        if (self.previous * (1 - self.elapsed) + self.current
+                >= self.num_requests):
+            return self.throttle_failure()
+        self.increment(current_key)
+        return True
+
+    def increment(self, key):
+        # Счетчик живет два окна: следующее окно читает его как предыдущий
+        self.cache.add(key, 0, 2 * self.duration)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, 2 * self.duration)
+
+    def wait(self):
+        """Секунды до момента, когда оценка опустится ниже лимита."""
+        if self.current < self.num_requests:
+            # Лимит освободится, когда уменьшится доля предыдущего окна
+            fraction = 1 - (self.num_requests - self.current) / self.previous
+            return max(fraction - self.elapsed, 0) * self.duration
+        # До конца окна и дальше, пока не уменьшится доля текущего
+        fraction = 1 - self.num_requests / self.current
+        return (1 - self.elapsed + fraction) * self.duration
+
+
+class AuthIPThrottle(SlidingWindowThrottle):
+    """Ограничивает регистрацию и получение токена с одного IP."""
+    scope = 'auth_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {
+            'scope': self.scope,
+            'ident': self.get_ident(request),
+        }
+
+
+class AuthUsernameThrottle(SlidingWindowThrottle):
+    """Ограничивает регистрацию и получение токена для одного имени
+    пользователя, с каких бы адресов ни приходили запросы."""
+    scope = 'auth_username'
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        username = data.get('username') if hasattr(data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None
+        # Имя еще не проверено: в ключ кэша попадает только его хэш
+        ident = hashlib.md5(username.lower().encode()).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
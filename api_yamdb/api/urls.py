@@ -1,11 +1,13 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework import routers
 
 from constants.constants import FIRST_API_VERSION
 
+from .async_views import with_async_reads
 from .views import (
     CategoryViewSet,
     CommentViewSet,
+    ExportView,
     GenreViewSet,
     ReviewViewSet,
     TitleViewSet,
@@ -29,5 +31,8 @@ router_v1.register(
 urlpatterns = [
     path(f'{FIRST_API_VERSION}/auth/token/',
          TokenView.as_view(), name='token'),
-    path(f'{FIRST_API_VERSION}/', include(router_v1.urls)),
+    re_path(rf'^{FIRST_API_VERSION}/export/(?P<table>\w+)'
+            r'\.(?P<export_format>csv|ndjson)(?P<compress>\.gz)?/?$',
+            ExportView.as_view(), name='export'),
+    path(f'{FIRST_API_VERSION}/', include(with_async_reads(router_v1.urls))),
 ]
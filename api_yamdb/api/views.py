@@ -1,17 +1,36 @@
+from datetime import datetime, time
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, permissions, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import MethodNotAllowed
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import (
+    MethodNotAllowed,
+    NotFound,
+    ValidationError,
+)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework_simplejwt import views as simplejwtviews
 
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import (
+    SCORE_FIELDS,
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+)
 from users.models import VerifyCode
 
-from .filters import TitleFilter
+from .filters import FullTextSearchFilter, TitleFilter
 from .permissions import AdminOnly
 from .serializers import (
     CategorySerializer,
@@ -19,24 +38,38 @@ from .serializers import (
     GenreSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitleDetailSerializer,
     TitleModifySerializer,
     TitleReadSerializer,
+    TitleSnapshotSerializer,
+    TitleStatsSerializer,
     TokenSerializer,
     UserSerializer,
 )
+from .services.batch import create_reviews, create_titles
+from .services.cache import cached_response
 from .services.email import sender_mail
+from .services.export import EXPORT_TABLES, export_stream
+from .services.metrics import REGISTRY
+from .services.rankings import top_titles
+from .throttling import AuthIPThrottle, AuthUsernameThrottle
 from .utils.code_generator import GeneratingCodeService
 from .viewsets import (
+    BatchCreateMixin,
+    CachedListViewset,
+    CachedReadViewset,
     PublicationViewset,
     RestrictedMethodsViewset,
+    SerializerTimingMixin,
     SlugNameViewset,
 )
 
 User = get_user_model()
 
 
-class TokenView(simplejwtviews.TokenViewBase):
+class TokenView(SerializerTimingMixin, simplejwtviews.TokenViewBase):
     """Вьюсет для выдачи токенов"""
+    throttle_classes = (AuthIPThrottle, AuthUsernameThrottle)
 
     def get_serializer_class(self):
         return TokenSerializer
@@ -49,7 +82,7 @@ class TokenView(simplejwtviews.TokenViewBase):
             )
 
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(SerializerTimingMixin, viewsets.ModelViewSet):
     """Вьюсет для работы с пользователями, регистрация, редакт польз."""
     queryset = User.objects.all()
     filter_backends = (filters.SearchFilter,)
@@ -62,6 +95,12 @@ class UserViewSet(viewsets.ModelViewSet):
             return UserSerializer
         return SignUpSerializer
 
+    def get_throttles(self):
+        """Ограничивает частоту регистрации и повторной отправки кода."""
+        if self.basename == 'signup':
+            return (AuthIPThrottle(), AuthUsernameThrottle())
+        return super().get_throttles()
+
     def get_permissions(self):
         if self.basename == 'signup':
             return (permissions.AllowAny(),)
@@ -99,53 +138,36 @@ class UserViewSet(viewsets.ModelViewSet):
         if self.basename == 'signup':
             username = request.data.get('username')
             if serializer.is_valid():
-                username = serializer.validated_data.get('username')
-
                 email = serializer.validated_data.get('email')
 
-                serializer.save()
-
-                user = User.objects.filter(username=username).first()
-                code = GeneratingCodeService.generate_code()
-
-                VerifyCode.objects.create(user=user, code=code)
+                # Пользователь, код и письмо в очереди сохраняются вместе:
+                # письмо уйдет только после фиксации транзакции
+                with transaction.atomic():
+                    user = serializer.save()
+                    code = GeneratingCodeService.generate_code()
+                    VerifyCode.objects.create(user=user, code=code)
+                    sender_mail(code, email)
 
                 headers = self.get_success_headers(serializer.data)
-
-                try:
-                    sender_mail(code, email)
-                    return Response(serializer.data, headers=headers)
-                except Exception as e:
-                    return Response(
-                        {'username': username,
-                         'email': email,
-                         'error': f'Письмо с кодом не отправлено: {str(e)}'}
-                    )
+                return Response(serializer.data, headers=headers)
             else:
                 user = User.objects.filter(username=username).first()
                 if user and (
                         user.email == serializer.initial_data.get('email',
                                                                   None)):
-                    try:
+                    with transaction.atomic():
                         code = VerifyCode.objects.filter(
-                            user=user, is_used=False).values('code')
+                            user=user, is_used=False
+                        ).values_list('code', flat=True).first()
                         if not code:
                             code = GeneratingCodeService.generate_code()
                             VerifyCode.objects.create(user=user, code=code)
-
                         sender_mail(code, user.email)
 
-                        return Response(
-                            {'username': user.username,
-                                'email': user.email}
-                        )
-
-                    except Exception as e:
-                        return Response(
-                            {'error': (
-                                f'Письмо с кодом не отправлено: {str(e)}')},
-                            status=status.HTTP_503_SERVICE_UNAVAILABLE
-                        )
+                    return Response(
+                        {'username': user.username,
+                            'email': user.email}
+                    )
         else:
             if serializer.is_valid():
                 serializer.save()
@@ -155,81 +177,278 @@ class UserViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CategoryViewSet(SlugNameViewset):
+class CategoryViewSet(CachedListViewset, SlugNameViewset):
     """Вьюсет для работы с категориями."""
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
-class GenreViewSet(SlugNameViewset):
+class GenreViewSet(CachedListViewset, SlugNameViewset):
     """Вьюсет для работы с жанрами."""
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
 
 
-class TitleViewSet(RestrictedMethodsViewset):
+class TitleViewSet(BatchCreateMixin, CachedReadViewset,
+                   RestrictedMethodsViewset):
     """Вьюсет для работы с произведениями."""
 
     queryset = Title.objects.all()
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, AdminOnly,)
-    filter_backends = (DjangoFilterBackend, filters.OrderingFilter)
+    filter_backends = (DjangoFilterBackend, FullTextSearchFilter,
+                       filters.OrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'review_count', 'year', 'name')
+    search_kind = 'title'
+
+    read_actions = ('list', 'retrieve', 'top', 'stats')
+
+    @classmethod
+    def get_read_queryset(cls, action, kwargs):
+        """Для чтения подгружает категорию и жанры вместе с произведениями,
+        чтобы число запросов к БД не зависело от размера страницы.
+        Список при включенных представлениях читается из них одним
+        запросом."""
+        if action in ('list', 'top') and settings.TITLE_SNAPSHOTS_ENABLED:
+            return Title.objects.select_related('snapshot').only(
+                'id', 'rating', 'snapshot__data')
+        if action == 'stats':
+            return Title.objects.only(
+                'id', 'rating', 'score_sum', 'review_count',
+                *SCORE_FIELDS.values())
+        return Title.objects.select_related(
+            'category').prefetch_related('genre')
+
+    @classmethod
+    def get_read_serializer_class(cls, action):
+        if action in ('list', 'top') and settings.TITLE_SNAPSHOTS_ENABLED:
+            return TitleSnapshotSerializer
+        if action == 'retrieve':
+            return TitleDetailSerializer
+        if action == 'stats':
+            return TitleStatsSerializer
+        return TitleReadSerializer
+
+    def get_queryset(self):
+        if self.action in self.read_actions:
+            return self.get_read_queryset(self.action, self.kwargs)
+        return super().get_queryset()
 
     def get_serializer_class(self):
         """Выбирает сериализатор в зависимости от метода запроса."""
-        if self.request.method == 'GET':
-            return TitleReadSerializer
+        if self.action in self.read_actions or self.request.method == 'GET':
+            return self.get_read_serializer_class(self.action)
         return TitleModifySerializer
 
     def get_permissions(self):
         """Устанавливает права доступа"""
-        if self.action in ('list', 'retrieve'):
+        if self.action in self.read_actions:
             return (permissions.IsAuthenticatedOrReadOnly(),)
         return super().get_permissions()
 
-
-class ReviewViewSet(PublicationViewset):
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """Создает список произведений одним запросом."""
+        result = create_titles(self.get_batch_items(request),
+                               self.get_serializer_context())
+        return self.batch_response(result, TitleDetailSerializer)
+
+    @action(detail=False, filter_backends=(),
+            cache_query_params=('genre', 'category', 'year', 'limit'))
+    def top(self, request):
+        """Список лучших произведений, при желании внутри жанра,
+        категории или года. Читается из строк рейтинга одним запросом;
+        произведения без оценок в список не попадают."""
+        return cached_response(self.get_top, request,
+                               self.cache_query_params)
+
+    def get_top(self, request):
+        params = request.query_params
+        titles = top_titles(self.get_queryset(),
+                            genre=params.get('genre') or None,
+                            category=params.get('category') or None,
+                            year=self.get_top_int(params, 'year'))
+        limit = self.get_top_int(
+            params, 'limit', settings.TOP_TITLES_DEFAULT_LIMIT)
+        if not 1 <= limit <= settings.TOP_TITLES_MAX_LIMIT:
+            raise ValidationError({'limit': [
+                f'Допустимы значения от 1 до {settings.TOP_TITLES_MAX_LIMIT}.'
+            ]})
+        return Response(self.get_serializer(titles[:limit], many=True).data)
+
+    def get_top_int(self, params, name, default=None):
+        value = params.get(name)
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({name: ['Ожидается целое число.']})
+
+    @action(detail=True, filter_backends=(), cache_query_params=())
+    def stats(self, request, pk):
+        """Статистика оценок произведения: рейтинг, количество отзывов,
+        средняя оценка и гистограмма. Читается из счетчиков
+        произведения без обращения к отзывам."""
+        return self.retrieve(request, pk=pk)
+
+
+class ReviewViewSet(BatchCreateMixin, PublicationViewset):
     """Вьюсет для работы с отзывами к произведению <title_id>."""
 
     serializer_class = ReviewSerializer
-    pagination_class = LimitOffsetPagination
+    search_kind = 'review'
+
+    def get_search_parent_id(self):
+        return int(self.kwargs['title_id'])
 
     def get_title(self):
-        """Возвращает объект текущего произведения."""
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Title, id=title_id)
+        """Возвращает объект текущего произведения.
+        Запрос к БД выполняется один раз за обработку запроса клиента."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title, id=self.kwargs.get('title_id'))
+        return self._title
+
+    @classmethod
+    def get_read_queryset(cls, action, kwargs):
+        """Для чтения автор загружается тем же запросом, что и отзывы."""
+        return Review.objects.filter(
+            title_id=kwargs['title_id']).select_related('author').only(
+                'id', 'text', 'pub_date', 'score', 'title_id',
+                'author__username')
 
     def get_queryset(self):
         """Выбирает отзывы только к текущему произведению."""
-        return self.get_title().reviews.all()
+        title = self.get_title()
+        if self.action in ('list', 'retrieve'):
+            return self.get_read_queryset(self.action, {'title_id': title.id})
+        return title.reviews.all()
 
     def perform_create(self, serializer):
         """Создает новый отзыв, привязывая его к текущему произведению
         и авторизованному пользователю."""
         title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        # Повторный отзыв отсекает ограничение unique review в БД.
+        # Review.save откатывает свою транзакцию, поэтому после ошибки
+        # можно проверить, что нарушено именно это ограничение,
+        # остальные ошибки целостности пробрасываются.
+        try:
+            serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=title, author=self.request.user).exists():
+                raise
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'Вы уже оставили отзыв на это произведение.']
+            })
+
+    @action(detail=False, methods=['post'],
+            permission_classes=(permissions.IsAuthenticated, AdminOnly,))
+    def batch(self, request, title_id):
+        """Создает отзывы разных авторов к произведению одним
+        запросом (перенос отзывов из других систем)."""
+        result = create_reviews(self.get_title(),
+                                self.get_batch_items(request),
+                                self.get_serializer_context())
+        return self.batch_response(result, ReviewSerializer)
 
 
 class CommentViewSet(PublicationViewset):
     """Вьюсет для работы с комментариями к отзыву <review_id>."""
 
     serializer_class = CommentSerializer
-    pagination_class = LimitOffsetPagination
+    search_kind = 'comment'
+
+    def get_search_parent_id(self):
+        return int(self.kwargs['review_id'])
 
     def get_review(self):
-        """Возвращает объект текущего отзыва."""
-        review_id = self.kwargs.get('review_id')
-        title_id = self.kwargs.get('title_id')
-        return get_object_or_404(Review, id=review_id, title=title_id)
+        """Возвращает объект текущего отзыва.
+        Запрос к БД выполняется один раз за обработку запроса клиента."""
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review, id=self.kwargs.get('review_id'),
+                title=self.kwargs.get('title_id'))
+        return self._review
+
+    @classmethod
+    def get_read_queryset(cls, action, kwargs):
+        """Для чтения автор загружается тем же запросом, что и
+        комментарии."""
+        return Comment.objects.filter(
+            review_id=kwargs['review_id']).select_related('author').only(
+                'id', 'text', 'pub_date', 'review_id', 'author__username')
 
     def get_queryset(self):
         """Выбирает комментарии только для текущего отзыва."""
-        return self.get_review().comments.all()
+        review = self.get_review()
+        if self.action in ('list', 'retrieve'):
+            return self.get_read_queryset(
+                self.action, {'review_id': review.id})
+        return review.comments.all()
 
     def perform_create(self, serializer):
         """Создает новый комментарий, привязывая его к отзыву и
         авторизованному пользователю."""
         review = self.get_review()
         serializer.save(author=self.request.user, review=review)
+
+
+class ExportView(APIView):
+    """Потоковая выгрузка таблицы для администратора.
+
+    Адрес: export/<таблица>.<csv|ndjson>[.gz], колонки совпадают с
+    файлами, которые загружает команда download. Параметр since
+    (дата или дата и время в ISO 8601) выгружает только записи,
+    созданные начиная с этого момента.
+    """
+    permission_classes = (permissions.IsAuthenticated, AdminOnly,)
+
+    def get(self, request, table, export_format, compress=None):
+        export_table = EXPORT_TABLES.get(table)
+        if export_table is None:
+            raise NotFound(f'Таблица {table} не выгружается.')
+        since = self.get_since(request, export_table)
+        stream, content_type = export_stream(
+            export_table, export_format, since, compress=bool(compress))
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table}.{export_format}'
+            f'{compress or ""}"')
+        return response
+
+    def get_since(self, request, export_table):
+        """Возвращает момент начала инкрементальной выгрузки или None."""
+        value = request.query_params.get('since')
+        if not value:
+            return None
+        if export_table.date_field is None:
+            raise ValidationError({'since': [
+                'Таблица выгружается только целиком.']})
+        try:
+            since = parse_datetime(value)
+            if since is None and (date := parse_date(value)):
+                since = datetime.combine(date, time.min)
+        except ValueError:
+            since = None
+        if since is None:
+            raise ValidationError({'since': ['Неверный формат даты.']})
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+        return since
+
+
+def metrics(request):
+    """Метрики процесса в текстовом формате Prometheus.
+
+    Доступны только с адресов METRICS_ALLOWED_IPS, для остальных
+    адрес не существует.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(REGISTRY.render(),
+                        content_type='text/plain; version=0.0.4')
@@ -1,10 +1,158 @@
-from rest_framework import filters, mixins, permissions, viewsets
+from django.conf import settings
+from rest_framework import filters, mixins, permissions, status, viewsets
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from .db_routers import (
+    CATALOGUE_PIN,
+    is_pinned,
+    pin_to_primary,
+    replicas_enabled,
+    routing_scope,
+    use_replica,
+)
+from .filters import FullTextSearchFilter
+from .pagination import PublicationPagination
 from .permissions import (
     AdminOnly,
     ModeratorOrOwnerOrReadOnly,
 )
+from .services.cache import cached_response
+from .services.metrics import timed_serializer_class
+
+
+class SerializerTimingMixin:
+    """Добавляет время сериализаторов вьюсета в замеры запроса
+    (заголовок Server-Timing и метрики)."""
+
+    def get_serializer(self, *args, **kwargs):
+        serializer_class = self.get_serializer_class()
+        if settings.PERFORMANCE_METRICS_ENABLED:
+            serializer_class = timed_serializer_class(serializer_class)
+        kwargs.setdefault('context', self.get_serializer_context())
+        return serializer_class(*args, **kwargs)
+
+
+class ReadQuerysetMixin:
+    """Queryset и сериализатор чтения list и retrieve, общие для вьюсета
+    и его асинхронного обработчика (api.async_views).
+
+    Классовые методы зависят только от действия и параметров адреса,
+    а не от запроса, поэтому их вызывают оба пути.
+    """
+
+    @classmethod
+    def get_read_queryset(cls, action, kwargs):
+        return cls.queryset.all()
+
+    @classmethod
+    def get_read_serializer_class(cls, action):
+        return cls.serializer_class
+
+
+class ReplicaReadMixin:
+    """Читает данные безопасных запросов с реплик БД.
+
+    После успешной записи клиент на REPLICA_PIN_SECONDS читает с основной
+    БД и видит свои изменения. Вьюсеты с pin_after_catalogue_change
+    читают с основной БД и после любого изменения каталога, чтобы не
+    закэшировать отстающие данные реплики.
+    """
+    pin_after_catalogue_change = False
+
+    def dispatch(self, request, *args, **kwargs):
+        with routing_scope():
+            return super().dispatch(request, *args, **kwargs)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (replicas_enabled()
+                and request.method in permissions.SAFE_METHODS
+                and not self.is_pinned_to_primary(request)):
+            use_replica()
+
+    def is_pinned_to_primary(self, request):
+        if self.pin_after_catalogue_change and is_pinned(CATALOGUE_PIN):
+            return True
+        return (request.user.is_authenticated
+                and is_pinned(f'user:{request.user.pk}'))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs)
+        if (replicas_enabled()
+                and request.method not in permissions.SAFE_METHODS
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            pin_to_primary(f'user:{request.user.pk}')
+        return response
+
+
+class CachedListViewset(SerializerTimingMixin, ReadQuerysetMixin,
+                        ReplicaReadMixin, viewsets.GenericViewSet):
+    """Кэширует ответы list до любого изменения каталога.
+
+    Ключ кэша строится по адресу и параметрам из cache_query_params,
+    остальные параметры запроса на ответ не влияют.
+    """
+    pin_after_catalogue_change = True
+    cache_query_params = ('genre', 'category', 'year', 'name', 'search',
+                          'q', 'ordering', 'limit', 'offset')
+
+    def list(self, request, *args, **kwargs):
+        return cached_response(super().list, request,
+                               self.cache_query_params, *args, **kwargs)
+
+
+class CachedReadViewset(CachedListViewset):
+    """Кэширует ответы list и retrieve до любого изменения каталога."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return cached_response(super().retrieve, request,
+                               self.cache_query_params, *args, **kwargs)
+
+
+class BatchCreateMixin:
+    """Создание списка объектов одним запросом.
+
+    Тело запроса - список объектов, не длиннее BATCH_MAX_SIZE. Ответ
+    содержит результат для каждого элемента в порядке запроса: data
+    созданного объекта или errors. Статус ответа 201, если созданы все
+    объекты, 400, если ни одного, иначе 207.
+    """
+
+    def get_batch_items(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Ожидается непустой список объектов.']})
+        if len(items) > settings.BATCH_MAX_SIZE:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                f'Не больше {settings.BATCH_MAX_SIZE} объектов за запрос.']})
+        return items
+
+    def batch_response(self, result, serializer_class):
+        results = []
+        for index in range(len(result.created) + len(result.errors)):
+            if index in result.created:
+                results.append({'status': status.HTTP_201_CREATED,
+                                'data': serializer_class(
+                                    result.created[index],
+                                    context=self.get_serializer_context()
+                                ).data})
+            else:
+                results.append({'status': status.HTTP_400_BAD_REQUEST,
+                                'errors': result.errors[index]})
+        if not result.errors:
+            response_status = status.HTTP_201_CREATED
+        elif not result.created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        return Response({'created': len(result.created), 'results': results},
+                        status=response_status)
 
 
 class PaginationViewset(viewsets.GenericViewSet):
@@ -36,11 +184,13 @@ class RestrictedMethodsViewset(viewsets.ModelViewSet, AdminOnlyViewset):
     http_method_names = ['get', 'post', 'patch', 'delete']
 
 
-class PublicationViewset(viewsets.ModelViewSet):
+class PublicationViewset(SerializerTimingMixin, ReadQuerysetMixin,
+                         ReplicaReadMixin, viewsets.ModelViewSet):
     """Базовый вьюсет для публикаций разного рода."""
 
-    pagination_class = LimitOffsetPagination
+    pagination_class = PublicationPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
+    filter_backends = (FullTextSearchFilter,)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
     def get_permissions(self):
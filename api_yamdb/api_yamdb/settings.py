@@ -1,3 +1,4 @@
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -31,6 +32,7 @@ INSTALLED_APPS = [
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'api.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -64,13 +66,97 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 
 # Database
 
-DATABASES = {
+# Профиль БД задается переменной окружения DB_ENGINE:
+# sqlite (по умолчанию) - один сервер, WAL и настроенные прагмы;
+# postgresql - постоянные соединения или пул (DB_POOL=true),
+# требуется пакет psycopg (для пула - psycopg[pool]).
+DB_ENGINE = os.getenv('DB_ENGINE', 'sqlite')
+
+# Время жизни соединения с БД, секунды (0 - новое соединение на запрос)
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', 60))
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('POSTGRES_DB', 'api_yamdb'),
+            'USER': os.getenv('POSTGRES_USER', 'api_yamdb'),
+            'PASSWORD': os.getenv('POSTGRES_PASSWORD', ''),
+            'HOST': os.getenv('DB_HOST', 'localhost'),
+            'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.getenv('DB_POOL', 'false').lower() == 'true':
+        # Пул соединений psycopg несовместим с CONN_MAX_AGE
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 10)),
+            },
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'OPTIONS': {
+                # Транзакция сразу берет блокировку записи: конкурирующие
+                # записи ждут busy_timeout, а не падают посреди транзакции
+                'transaction_mode': 'IMMEDIATE',
+                # WAL не блокирует чтение во время записи; synchronous=NORMAL
+                # в WAL не портит БД при сбое, но может потерять последние
+                # транзакции при отключении питания
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA cache_size=-64000;'
+                    'PRAGMA mmap_size=268435456;'
+                    'PRAGMA busy_timeout=5000;'
+                ),
+            },
+        }
+    }
+
+# Реплики для чтения: DB_REPLICAS - пути к файлам SQLite или адреса
+# серверов PostgreSQL через запятую. Данные реплицирует сама СУБД
+# (для SQLite - команда sync_replicas). В тестах реплики читают
+# тестовую основную БД.
+for replica_number, replica_location in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica_{replica_number}'] = {
+        **DATABASES['default'],
+        'NAME' if DB_ENGINE == 'sqlite' else 'HOST': replica_location.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['api.db_routers.ReplicaRouter']
+
+# Сколько секунд после записи клиент читает с основной БД
+REPLICA_PIN_SECONDS = 5
+
+
+# Cache
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+# Время жизни закэшированных ответов каталога, секунды
+CATALOGUE_CACHE_TIMEOUT = 60 * 60
+
+# Список произведений читается из заранее построенных представлений
+TITLE_SNAPSHOTS_ENABLED = True
+
 
 # Password validation
 
@@ -94,10 +180,15 @@ REST_FRAMEWORK = {
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
+    # Регистрация и получение токена: с одного IP и для одного имени
+    'DEFAULT_THROTTLE_RATES': {
+        'auth_ip': os.getenv('THROTTLE_AUTH_IP_RATE', '20/min'),
+        'auth_username': os.getenv('THROTTLE_AUTH_USERNAME_RATE', '5/min'),
+    },
 }
 
 SIMPLE_JWT = {
@@ -105,6 +196,12 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Кэш пользователей для аутентификации: время хранения в памяти процесса,
+# секунды, и наибольшее число пользователей в нем
+AUTH_USER_CACHE_TIMEOUT = 60
+
+AUTH_USER_CACHE_SIZE = 1024
+
 # Internationalization
 
 LANGUAGE_CODE = 'ru-ru'
@@ -130,6 +227,60 @@ EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 SENDERS_EMAIL = 'notificator@yamd.net'
 
+# Наибольшее число результатов полнотекстового поиска (параметр q)
+SEARCH_MAX_RESULTS = 1000
+
+# Замеры запросов: заголовок Server-Timing и метрики Prometheus
+# на адресе /metrics/, доступном с адресов METRICS_ALLOWED_IPS
+PERFORMANCE_METRICS_ENABLED = (
+    os.getenv('PERFORMANCE_METRICS_ENABLED', 'true').lower() == 'true')
+
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1').split(',')
+
+# Асинхронное чтение каталога, отзывов и комментариев; включать только
+# при запуске под ASGI (api_yamdb.asgi:application)
+ASYNC_READ_VIEWS = os.getenv('ASYNC_READ_VIEWS', 'false').lower() == 'true'
+
+# Наибольшее число объектов в одном запросе на пакетное создание
+BATCH_MAX_SIZE = 1000
+
+# Размер списка лучших произведений (/titles/top/): по умолчанию
+# и наибольший допустимый параметр limit
+TOP_TITLES_DEFAULT_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+
+# Пересчет рейтинга: sync - в транзакции изменения отзыва,
+# thread - отложенно фоновым потоком процесса, worker - отложенно
+# командой flush_ratings --loop
+RATING_UPDATE_MODE = os.getenv('RATING_UPDATE_MODE', 'sync')
+
+# Наибольшая задержка отложенного пересчета рейтинга, секунды
+RATING_MAX_STALENESS = 5
+
+# Очередь писем: eager - отправка сразу после фиксации транзакции,
+# thread - фоновый поток процесса, worker - команда send_emails
+EMAIL_OUTBOX_MODE = os.getenv('EMAIL_OUTBOX_MODE', 'thread')
+
+EMAIL_OUTBOX_BATCH_SIZE = 100
+
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+
+# Задержка перед повторной отправкой, секунды (удваивается с каждой попыткой)
+EMAIL_OUTBOX_RETRY_DELAY = 30
+
+EMAIL_OUTBOX_POLL_INTERVAL = 10
+
+# Через сколько секунд письмо, взятое на отправку, но не отмеченное
+# (обработчик завершился во время отправки), забирается снова
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
+
 CONFIRMATION_CODES_EXPAIRED_HOUR_COUNT = 1
 
+# Очистка использованных и истекших кодов подтверждения: количество
+# кодов в одной транзакции и период фоновой очистки в процессе,
+# секунды (0 - только командой purge_codes)
+VERIFY_CODE_PURGE_BATCH_SIZE = 500
+
+VERIFY_CODE_PURGE_INTERVAL = int(os.getenv('VERIFY_CODE_PURGE_INTERVAL', 0))
+
 MAX_AUTHORIZATION_ATTEMPTS = 3
@@ -17,9 +17,12 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics/', metrics, name='metrics'),
     path(
         'redoc/',
         TemplateView.as_view(template_name='redoc.html'),
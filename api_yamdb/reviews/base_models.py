@@ -1,5 +1,6 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models.functions import Lower
 
 from constants.constants import CHAR_FIELD_LENGTH, SLUG_FIELD_LENGTH
 
@@ -14,6 +15,10 @@ class NameSlugBaseModel(models.Model):
 
     class Meta:
         abstract = True
+        # Индекс для поиска по slug без учета регистра
+        indexes = (
+            models.Index(Lower('slug'), name='%(class)s_slug_lower_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -32,7 +37,8 @@ class PublicationBaseModel(models.Model):
 
     class Meta:
         abstract = True
-        ordering = ('-pub_date', )
+        # id упорядочивает публикации с одинаковой датой
+        ordering = ('-pub_date', '-id')
 
     def __str__(self):
         return self.text
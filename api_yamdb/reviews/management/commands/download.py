@@ -1,12 +1,27 @@
 import csv
+import multiprocessing
 import os
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-
+from graphlib import TopologicalSorter
+from itertools import islice
+from queue import Empty, Queue
+from threading import Event
+from time import perf_counter
+from typing import Iterator
+
+import django
 from django.apps import apps
-from django.core.management.base import BaseCommand, CommandParser
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
 from django.db import connection, transaction
 from django.db.models.base import ModelBase
 
+from reviews.models import Title
+from reviews.signals import catalogue_imported
 from users.models import User
 
 from .exceptions import CantDeleteDataError, ModelNotFoundError
@@ -19,12 +34,17 @@ from .exceptions import CantDeleteDataError, ModelNotFoundError
 # будет создан суперюзер с параметрами из константы SUPERUSER.
 # --splitter необязательный параметр. если установлен,
 # указывает разделитель в CSV файлах. По умолчанию запятая.
+# --batch-size необязательный параметр. Количество строк, которые читаются
+# из CSV и записываются в БД одним запросом. По умолчанию 1000.
+# --workers необязательный параметр. Количество процессов, которые
+# параллельно читают и проверяют CSV файлы. По умолчанию 1 (без процессов).
 # перед сохранением таблицы будут очищены
 # Слэши можно использовать любые, модуль os сам все исправит, как нужно.
 
 # Имена файлов должны соответствовать именам моделей
-# Порядок загрузки такой, чтобы при загрузке данных в модель,
-# модель с которой она имеет связанные поля была уже загружена.
+# Порядок загрузки вычисляется по ForeignKey моделей так, чтобы при загрузке
+# данных в модель, модель с которой она имеет связанные поля была уже
+# загружена. Порядок списка важен только для очистки таблиц.
 IMPORT_QUEUE = [
     'user',
     'category',
@@ -37,6 +57,28 @@ IMPORT_QUEUE = [
 # Таблицы в БД связывающие ManyToManyFields
 M2M_TABLES = ['title_genre']
 
+# Производные таблицы (приложение, таблица), которые не загружаются из CSV,
+# но ссылаются на загружаемые. Очищаются первыми, иначе внешние ключи
+# не дадут очистить произведения и пользователей. Рейтинг, представления
+# и строки рейтинга пересоздаются после импорта.
+DEPENDENT_TABLES = [
+    ('reviews', 'titlesnapshot'),
+    ('reviews', 'titleranking'),
+    ('reviews', 'dirtytitle'),
+    ('users', 'verifycode'),
+]
+
+# Количество строк CSV в одной пачке для записи в БД
+BATCH_SIZE = 1000
+
+# Сколько прочитанных пачек одной таблицы может ждать записи в очереди.
+# Файлы отдаются в пул сразу, а писатель один, поэтому без ограничения
+# процессы успевают разобрать все файлы целиком и держат их в памяти
+# процесса Manager. С ограничением в памяти не больше
+# QUEUE_SIZE * batch_size строк на таблицу, а нескольких пачек в запасе
+# хватает, чтобы писатель не ждал разбора следующей пачки.
+QUEUE_SIZE = 4
+
 SUPERUSER = {
     'username': 'admin',
     'email': 'admin@admin.ru',
@@ -45,6 +87,52 @@ SUPERUSER = {
 }
 
 
+def parse_table(file_path: str, table: str, splitter: str, batch_size: int,
+                batches: Queue, stop: Event) -> float:
+    """Читает и проверяет CSV файл в отдельном процессе,
+    передавая пачки строк писателю через очередь.
+    Разбор прекращается, если писатель установил stop.
+
+    Returns:
+        Время разбора файла в секундах.
+    """
+    started = perf_counter()
+    try:
+        for batch in Command().read_batches(
+                file_path, table, splitter, batch_size):
+            if stop.is_set():
+                break
+            batches.put(batch)
+    finally:
+        # Писатель должен узнать о конце файла и при ошибке разбора
+        batches.put(None)
+    return perf_counter() - started
+
+
+def drain_queue(batches: Queue, parsing: Future) -> Iterator[list[dict]]:
+    """Отдает пачки строк из очереди до конца файла.
+    Ошибка разбора файла пробрасывается писателю,
+    чтобы транзакция записи таблицы откатилась.
+    """
+    while (batch := batches.get()) is not None:
+        yield batch
+    parsing.result()
+
+
+def discard_queue(batches: Queue, parsing: Future, stop: Event) -> None:
+    """Останавливает разбор файла, запись которого не удалась,
+    и освобождает его очередь, пока процесс разбора не завершится.
+    Иначе процесс навсегда блокируется на заполненной очереди,
+    а пул процессов ждет его при выходе.
+    """
+    stop.set()
+    while not parsing.done():
+        try:
+            batches.get(timeout=0.1)
+        except Empty:
+            pass
+
+
 class Command(BaseCommand):
     help = 'Импорт данных из CSV файла в базу данных приложения'
 
@@ -59,6 +147,19 @@ class Command(BaseCommand):
                             help='Очистить таблицы перед записью')
         parser.add_argument('--createsuperuser', action='store_true',
                             help='Добавить аккаунт суперюзера')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=('Количество строк в одной пачке '
+                                  f'(по умолчанию: {BATCH_SIZE})'))
+        parser.add_argument('--workers', type=int, default=1,
+                            help=('Количество процессов для чтения CSV '
+                                  '(по умолчанию: 1)'))
+
+    def check_options(self, options: dict) -> None:
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        if options['workers'] < 1:
+            raise CommandError('Количество процессов должно быть '
+                               'не меньше 1.')
 
     def check_files(self, path: str) -> None:
         """Проверяет наличие файлов в папке
@@ -97,6 +198,35 @@ class Command(BaseCommand):
                 f'Ошибка при поиске модели {table} в приложении {app}. {e}')
             raise ModelNotFoundError(error_message)
 
+    def get_table_model(self, app: str, table: str) -> ModelBase:
+        """Возвращает модель таблицы, пользователи хранятся в приложении users.
+        """
+        if table == 'user':
+            return self.get_model('users', table)
+        return self.get_model(app, table)
+
+    def build_graph(self, app: str) -> dict[str, set[str]]:
+        """Строит граф зависимостей таблиц по ForeignKey их моделей.
+
+        Args:
+            app: Название приложения
+
+        Returns:
+            Словарь: таблица -> таблицы, которые нужно загрузить раньше нее.
+        """
+        tables = IMPORT_QUEUE + M2M_TABLES
+        graph = {}
+        for table in tables:
+            model = self.get_table_model(app, table)
+            graph[table] = {
+                field.related_model._meta.model_name
+                for field in model._meta.concrete_fields
+                if field.many_to_one
+                and field.related_model is not model
+                and field.related_model._meta.model_name in tables
+            }
+        return graph
+
     def clean_row(
             self, row: dict, table: str) -> dict[str, str | int | None] | None:
         """Проверяет на корректность значения полей
@@ -176,6 +306,8 @@ class Command(BaseCommand):
             # Таблицу с логами django тоже чистим, в ней ссылки на User
             # Без ее очистки не очистить таблицу с пользователями
             self.delete_table('admin_log', 'django')
+            for dependent_app, table in DEPENDENT_TABLES:
+                self.delete_table(table, dependent_app)
 
             tables = IMPORT_QUEUE + M2M_TABLES
             for table in reversed(tables):
@@ -191,66 +323,172 @@ class Command(BaseCommand):
             User.objects.create_superuser(**SUPERUSER)
             self.stdout.write(self.style.SUCCESS('superuser создан'))
 
-    def handle(self, *args, **options):
-        """Создает записи В БД, импортируя их из CSV файлов.
-        Перед сохранением выполняет валидацию значений полей,
-        Записи с невалидными полями не сохраняются.
+    def read_batches(
+            self, file_path: str, table: str, splitter: str,
+            batch_size: int) -> Iterator[list[dict[str, str | int | None]]]:
+        """Читает CSV файл пачками фиксированного размера,
+        не загружая его в память целиком.
 
-        При наличии флагов:
-            --clean - предварительно очищает БД
-            --createsuperuser - создает в БД усетку суперюзера
+        Args:
+            file_path: Путь к CSV файлу
+            table: Название таблицы
+            splitter: Разделитель в CSV файле
+            batch_size: Количество строк в пачке
+
+        Yields:
+            Список проверенных строк. Невалидные строки пропускаются.
         """
-        self.check_files(options['path'])
-        self.delete_data(options['clean'], options['app'])
+        with open(file_path, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f, delimiter=splitter)
+            while rows := list(islice(reader, batch_size)):
+                yield [cleaned_row for cleaned_row in (
+                    self.clean_row(row, table) for row in rows)
+                    if cleaned_row]
+
+    def load_table(self, model: ModelBase, batches: Iterator[list[dict]],
+                   batch_size: int) -> int:
+        """Записывает пачки строк в таблицу модели через bulk_create.
+        Сигналы post_save при этом не отправляются.
+
+        Returns:
+            Количество записанных строк.
+        """
+        count = 0
+        with transaction.atomic():
+            for batch in batches:
+                model.objects.bulk_create(
+                    [model(**row) for row in batch], batch_size=batch_size)
+                count += len(batch)
+        return count
+
+    def load_m2m_table(self, table_name: str,
+                       batches: Iterator[list[dict]]) -> int:
+        """Записывает пачки строк в связующую таблицу ManyToMany
+        одним executemany на пачку.
 
-        for table in IMPORT_QUEUE:
+        Returns:
+            Количество записанных строк.
+        """
+        count = 0
+        with transaction.atomic(), connection.cursor() as cursor:
+            for batch in batches:
+                if not batch:
+                    continue
+                # Получаем строку с именами столбцов
+                keys = list(batch[0].keys())
+                columns = ', '.join(keys)
 
+                # Заполнители для SQL запроса = числу столбцов
+                empty_values = ', '.join(['%s'] * len(keys))
+
+                query = (f'INSERT INTO {table_name} ({columns}) '
+                         f'VALUES ({empty_values})')
+                cursor.executemany(
+                    query, [[row[key] for key in keys] for row in batch])
+                count += len(batch)
+        return count
+
+    def write_table(self, table: str, app: str,
+                    batches: Iterator[list[dict]], batch_size: int) -> int:
+        """Записывает пачки строк в таблицу, выбирая способ записи.
+
+        Returns:
+            Количество записанных строк.
+        """
+        if table in M2M_TABLES:
+            return self.load_m2m_table(f'{app}_{table}', batches)
+        model = self.get_table_model(app, table)
+        return self.load_table(model, batches, batch_size)
+
+    def report(self, table: str, count: int, started: float,
+               parse_time: float | None = None) -> None:
+        """Выводит количество записей и время загрузки таблицы."""
+        message = (f'Таблица {table} загружена, записей: {count}, '
+                   f'за {perf_counter() - started:.2f} с')
+        if parse_time is not None:
+            message += f' (разбор: {parse_time:.2f} с)'
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def import_sequential(self, order: list[str], options: dict) -> None:
+        """Читает и записывает таблицы по очереди в текущем процессе."""
+        for table in order:
+            started = perf_counter()
             try:
                 file_path = os.path.join(options['path'], f'{table}.csv')
-                if table == 'user':
-                    model = self.get_model('users', table)
-                else:
-                    model = self.get_model(options['app'], table)
-
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    reader = csv.DictReader(f, delimiter=options['splitter'])
-                    rows = list(reader)
-                    with transaction.atomic():
-                        for row in rows:
-                            cleaned_row = self.clean_row(row, table)
-                            if cleaned_row:
-                                model.objects.create(**cleaned_row)
-                self.stdout.write(self.style.SUCCESS(
-                    f'Таблица {table} загружена'))
+                batches = self.read_batches(
+                    file_path, table, options['splitter'],
+                    options['batch_size'])
+                count = self.write_table(
+                    table, options['app'], batches, options['batch_size'])
+                self.report(table, count, started)
             except Exception as e:
                 self.stdout.write(self.style.ERROR(f'{e}'))
 
-        for table in M2M_TABLES:
-            file_path = os.path.join(options['path'], f'{table}.csv')
+    def import_parallel(self, order: list[str], options: dict) -> None:
+        """Читает и проверяет CSV файлы в пуле процессов.
 
-            with open(file_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f, delimiter=options['splitter'])
-                rows = list(reader)
-
-                # Получаем строку с именами столбцов
-                columns = ', '.join(rows[0].keys())
+        Файлы отправляются в пул в порядке загрузки, а единственный писатель
+        (текущий процесс) записывает таблицы в том же порядке, забирая
+        готовые пачки из ограниченных очередей. Независимые таблицы
+        (например, user, category и genre) разбираются одновременно.
+        """
+        # spawn-процессам (Windows, macOS) нужен настроенный Django
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(
+                max_workers=options['workers'],
+                initializer=django.setup) as executor:
+            tasks = {}
+            for table in order:
+                batches = manager.Queue(maxsize=QUEUE_SIZE)
+                stop = manager.Event()
+                file_path = os.path.join(options['path'], f'{table}.csv')
+                parsing = executor.submit(
+                    parse_table, file_path, table, options['splitter'],
+                    options['batch_size'], batches, stop)
+                tasks[table] = (batches, parsing, stop)
+
+            for table in order:
+                started = perf_counter()
+                batches, parsing, stop = tasks[table]
+                try:
+                    count = self.write_table(
+                        table, options['app'], drain_queue(batches, parsing),
+                        options['batch_size'])
+                    self.report(table, count, started, parsing.result())
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f'{e}'))
+                    discard_queue(batches, parsing, stop)
 
-                # Заполнители для SQL запроса = числу столбцов
-                empty_values = ', '.join(['%s'] * len(rows[0].keys()))
+    def handle(self, *args, **options):
+        """Создает записи В БД, импортируя их из CSV файлов.
+        Перед сохранением выполняет валидацию значений полей,
+        Записи с невалидными полями не сохраняются.
 
-                table_name = f'{options["app"]}_{table}'
+        Файлы читаются и записываются пачками по --batch-size строк,
+        сигналы моделей не вызываются, поэтому рейтинг произведений
+        пересчитывается один раз после загрузки всех таблиц.
+        Порядок загрузки таблиц определяется графом их зависимостей,
+        при --workers больше 1 файлы разбираются параллельно.
 
-                # Формируем SQL запрос
-                query = (f'INSERT INTO {table_name} ({columns}) '
-                         f'VALUES ({empty_values})')
+        При наличии флагов:
+            --clean - предварительно очищает БД
+            --createsuperuser - создает в БД усетку суперюзера
+        """
+        self.check_options(options)
+        self.check_files(options['path'])
+        self.delete_data(options['clean'], options['app'])
 
-                with connection.cursor() as cursor:
-                    for row in rows:
-                        cleaned_row = self.clean_row(row, table)
-                        if cleaned_row:
-                            values = ([cleaned_row[key]
-                                       for key in rows[0].keys()])
-                            cursor.execute(query, values)
-                self.stdout.write(self.style.SUCCESS(
-                    f'Таблица {table} загружена'))
+        started = perf_counter()
+        order = list(
+            TopologicalSorter(self.build_graph(options['app'])).static_order())
+        if options['workers'] > 1:
+            self.import_parallel(order, options)
+        else:
+            self.import_sequential(order, options)
+
+        Title.objects.recount_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            'Рейтинг произведений пересчитан'))
+        catalogue_imported.send(sender=self.__class__)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импорт завершен за {perf_counter() - started:.2f} с'))
         self.add_superuser(options['createsuperuser'])
@@ -0,0 +1,386 @@
+import csv
+import os
+import random
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from itertools import islice
+from time import perf_counter
+from typing import Callable, Iterator
+
+from django.core.management.base import (
+    BaseCommand,
+    CommandError,
+    CommandParser,
+)
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from constants.constants import MAX_SCORE, MIN_SCORE
+from reviews.models import Category, Comment, Genre, Review, Title
+from reviews.signals import catalogue_imported
+from users.models import User
+
+from .download import BATCH_SIZE
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py generate_data --reviews 1000000
+# --output необязательный параметр. Папка, в которую записываются CSV файлы
+# в формате команды download. Если не указан, данные пишутся прямо в БД
+# после уже существующих записей.
+# --users, --titles, --categories, --genres, --reviews, --comments
+# необязательные параметры. Количество создаваемых записей.
+# --genres-per-title необязательный параметр. Наибольшее количество жанров
+# у произведения. По умолчанию 3.
+# --skew необязательный параметр. Показатель распределения Ципфа: чем он
+# больше, тем больше отзывов достается популярным произведениям.
+# По умолчанию 1.
+# --seed необязательный параметр. При одинаковом seed и параметрах
+# генерируются одинаковые данные. По умолчанию 0.
+# --batch-size необязательный параметр. Количество строк, которые
+# записываются одним запросом. По умолчанию 1000.
+# --prefix необязательный параметр. Начало имен пользователей и slug
+# категорий и жанров. По умолчанию gen.
+# --no-search-index необязательный параметр. Если установлен, индекс
+# полнотекстового поиска не строится (его можно построить позже командой
+# rebuild_search_index): на миллионах отзывов это самый долгий шаг.
+
+# Таблицы в порядке записи и столбцы их CSV файлов в формате download
+COLUMNS = {
+    'user': ('id', 'username', 'email', 'role', 'bio', 'first_name',
+             'last_name'),
+    'category': ('id', 'name', 'slug'),
+    'genre': ('id', 'name', 'slug'),
+    'title': ('id', 'name', 'year', 'category_id'),
+    'title_genre': ('id', 'title_id', 'genre_id'),
+    'review': ('id', 'title_id', 'text', 'author_id', 'score', 'pub_date'),
+    'comment': ('id', 'review_id', 'text', 'author_id', 'pub_date'),
+}
+
+MODELS = {
+    'user': User,
+    'category': Category,
+    'genre': Genre,
+    'title': Title,
+    'title_genre': Title.genre.through,
+    'review': Review,
+    'comment': Comment,
+}
+
+# Параметры команды с количеством записей таблиц
+COUNT_OPTIONS = {
+    'user': 'users',
+    'category': 'categories',
+    'genre': 'genres',
+    'title': 'titles',
+    'review': 'reviews',
+    'comment': 'comments',
+}
+
+# Таблицы, которые пишутся через executemany без создания моделей:
+# в них больше всего строк, а bulk_create заменил бы даты публикаций
+# текущим временем (auto_now_add)
+RAW_TABLES = ('title_genre', 'review', 'comment')
+
+WORDS = (
+    'фильм', 'книга', 'сюжет', 'герой', 'финал', 'автор', 'музыка',
+    'история', 'актер', 'роль', 'сцена', 'глава', 'смысл', 'стиль',
+    'отличный', 'скучный', 'неожиданный', 'сильный', 'долгий', 'яркий',
+    'странный', 'лучший', 'слабый', 'живой', 'очень', 'совсем', 'снова',
+    'почти', 'всегда', 'никогда',
+)
+
+# Количество разных текстов отзывов и комментариев
+TEXTS_COUNT = 1000
+
+# Даты публикаций равномерно распределены по этому периоду
+PUB_DATE_START = datetime(2015, 1, 1, tzinfo=timezone.utc)
+PUB_DATE_SPAN = int(timedelta(days=10 * 365).total_seconds())
+
+# Годы выпуска произведений; постоянная верхняя граница сохраняет
+# одинаковые данные при одинаковом seed
+MIN_YEAR = 1900
+MAX_YEAR = 2024
+
+# Средняя оценка произведений и разброс оценок вокруг нее
+MEAN_QUALITY = 7
+QUALITY_DEVIATION = 1.5
+SCORE_DEVIATION = 2
+
+
+def format_csv_date(value: datetime) -> str:
+    """Дата в формате CSV файлов проекта: 2020-01-13T23:20:02.422Z."""
+    return value.isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+class DatasetGenerator:
+    """Генерирует строки таблиц в порядке столбцов COLUMNS.
+
+    У каждой таблицы свой генератор случайных чисел, зависящий только
+    от seed, поэтому данные таблицы не меняются при изменении объемов
+    других таблиц, от которых она не зависит. Количество отзывов
+    произведения пропорционально 1 / rank ** skew, где rank - место
+    произведения по популярности; комментарии распределены по отзывам
+    равномерно и потому тоже чаще достаются популярным произведениям.
+    """
+
+    def __init__(self, options: dict, first_ids: dict[str, int],
+                 format_date: Callable[[datetime], object]):
+        self.options = options
+        self.counts = {table: options[option]
+                       for table, option in COUNT_OPTIONS.items()}
+        self.first_ids = first_ids
+        self.format_date = format_date
+
+    def rng(self, table: str) -> random.Random:
+        return random.Random(f'{self.options["seed"]}:{table}')
+
+    def ids(self, table: str) -> range:
+        """id всех создаваемых записей таблицы."""
+        first_id = self.first_ids[table]
+        return range(first_id, first_id + self.counts[table])
+
+    def rows(self, table: str) -> Iterator[tuple]:
+        return getattr(self, f'{table}_rows')()
+
+    @cached_property
+    def texts(self) -> list[str]:
+        rng = self.rng('text')
+        return [
+            ' '.join(rng.choices(WORDS, k=rng.randint(3, 30))).capitalize()
+            for _ in range(TEXTS_COUNT)
+        ]
+
+    def pub_date(self, rng: random.Random):
+        return self.format_date(
+            PUB_DATE_START + timedelta(seconds=rng.randrange(PUB_DATE_SPAN)))
+
+    @cached_property
+    def review_counts(self) -> list[int]:
+        """Количество отзывов каждого произведения.
+
+        Одно произведение получает не больше отзывов, чем есть
+        пользователей (один отзыв от автора); остаток от округления
+        достается самым популярным произведениям.
+        """
+        titles, users = self.counts['title'], self.counts['user']
+        reviews, skew = self.counts['review'], self.options['skew']
+        ranks = list(range(1, titles + 1))
+        self.rng('popularity').shuffle(ranks)
+        weights = [rank ** -skew for rank in ranks]
+        total = sum(weights)
+        counts = [min(int(reviews * weight / total), users)
+                  for weight in weights]
+        left = reviews - sum(counts)
+        for index in sorted(range(titles), key=ranks.__getitem__):
+            if not left:
+                break
+            extra = min(users - counts[index], left)
+            counts[index] += extra
+            left -= extra
+        return counts
+
+    def user_rows(self) -> Iterator[tuple]:
+        prefix = self.options['prefix']
+        for user_id in self.ids('user'):
+            yield (user_id, f'{prefix}{user_id}',
+                   f'{prefix}{user_id}@yamdb.fake', User.Role.USER, '', '', '')
+
+    def category_rows(self) -> Iterator[tuple]:
+        prefix = self.options['prefix']
+        for category_id in self.ids('category'):
+            yield (category_id, f'Категория {category_id}',
+                   f'{prefix}-category-{category_id}')
+
+    def genre_rows(self) -> Iterator[tuple]:
+        prefix = self.options['prefix']
+        for genre_id in self.ids('genre'):
+            yield (genre_id, f'Жанр {genre_id}', f'{prefix}-genre-{genre_id}')
+
+    def title_rows(self) -> Iterator[tuple]:
+        rng = self.rng('title')
+        categories = self.ids('category')
+        for title_id in self.ids('title'):
+            name = ' '.join(rng.choices(WORDS, k=rng.randint(1, 4)))
+            yield (title_id, f'{name.capitalize()} {title_id}',
+                   rng.randint(MIN_YEAR, MAX_YEAR),
+                   rng.choice(categories) if categories else None)
+
+    def title_genre_rows(self) -> Iterator[tuple]:
+        rng = self.rng('title_genre')
+        genres = self.ids('genre')
+        most = min(self.options['genres_per_title'], len(genres))
+        row_id = self.first_ids['title_genre']
+        if not most:
+            return
+        for title_id in self.ids('title'):
+            for genre_id in rng.sample(genres, rng.randint(1, most)):
+                yield row_id, title_id, genre_id
+                row_id += 1
+
+    def review_rows(self) -> Iterator[tuple]:
+        rng = self.rng('review')
+        users = self.ids('user')
+        review_id = self.first_ids['review']
+        for title_id, count in zip(self.ids('title'), self.review_counts):
+            quality = rng.gauss(MEAN_QUALITY, QUALITY_DEVIATION)
+            for author_id in rng.sample(users, count):
+                score = round(rng.gauss(quality, SCORE_DEVIATION))
+                yield (review_id, title_id, rng.choice(self.texts), author_id,
+                       min(max(score, MIN_SCORE), MAX_SCORE),
+                       self.pub_date(rng))
+                review_id += 1
+
+    def comment_rows(self) -> Iterator[tuple]:
+        rng = self.rng('comment')
+        reviews = self.ids('review')
+        users = self.ids('user')
+        for comment_id in self.ids('comment'):
+            yield (comment_id, rng.choice(reviews), rng.choice(self.texts),
+                   rng.choice(users), self.pub_date(rng))
+
+
+class Command(BaseCommand):
+    help = ('Генерирует синтетические данные для нагрузочного тестирования '
+            'в БД или в CSV файлы для команды download')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--output', type=str, default=None,
+                            help='Папка для CSV файлов (по умолчанию: в БД)')
+        for name, default in (('users', 1000), ('titles', 1000),
+                              ('categories', 10), ('genres', 30),
+                              ('reviews', 10000), ('comments', 10000)):
+            parser.add_argument(f'--{name}', type=int, default=default,
+                                help=f'Количество (по умолчанию: {default})')
+        parser.add_argument('--genres-per-title', type=int, default=3,
+                            help=('Наибольшее количество жанров произведения '
+                                  '(по умолчанию: 3)'))
+        parser.add_argument('--skew', type=float, default=1.0,
+                            help=('Показатель Ципфа для отзывов '
+                                  '(по умолчанию: 1)'))
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Начальное значение (по умолчанию: 0)')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=('Количество строк в одной пачке '
+                                  f'(по умолчанию: {BATCH_SIZE})'))
+        parser.add_argument('--prefix', type=str, default='gen',
+                            help='Начало имен и slug (по умолчанию: gen)')
+        parser.add_argument('--no-search-index', action='store_true',
+                            help='Не строить индекс поиска')
+
+    def check_options(self, options: dict) -> None:
+        if min(options[name] for name in (
+                *COUNT_OPTIONS.values(), 'genres_per_title')) < 0:
+            raise CommandError('Количество записей не может быть '
+                               'отрицательным.')
+        if options['batch_size'] < 1:
+            raise CommandError('Размер пачки должен быть не меньше 1.')
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError('Отзывов больше, чем пар произведение - '
+                               'пользователь: у автора один отзыв на '
+                               'произведение.')
+        if options['comments'] and not options['reviews']:
+            raise CommandError('Для комментариев нужны отзывы.')
+        if options['output'] and os.path.isfile(options['output']):
+            raise CommandError(f'{options["output"]} - не папка.')
+
+    def get_first_ids(self, options: dict) -> dict[str, int]:
+        """Первые id новых записей: в CSV файлах нумерация с 1,
+        в БД - после уже существующих записей."""
+        if options['output']:
+            return dict.fromkeys(COLUMNS, 1)
+        return {
+            table: (model.objects.aggregate(last_id=Max('id'))['last_id']
+                    or 0) + 1
+            for table, model in MODELS.items()
+        }
+
+    def batches(self, rows: Iterator[tuple],
+                batch_size: int) -> Iterator[list[tuple]]:
+        while batch := list(islice(rows, batch_size)):
+            yield batch
+
+    def write_csv(self, path: str, table: str, rows: Iterator[tuple],
+                  batch_size: int) -> int:
+        count = 0
+        with open(os.path.join(path, f'{table}.csv'), 'w', encoding='utf-8',
+                  newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(COLUMNS[table])
+            for batch in self.batches(rows, batch_size):
+                writer.writerows(batch)
+                count += len(batch)
+        return count
+
+    def write_db(self, table: str, rows: Iterator[tuple],
+                 batch_size: int) -> int:
+        """Записывает строки таблицы пачками в одной транзакции."""
+        model = MODELS[table]
+        columns = COLUMNS[table]
+        count = 0
+        with transaction.atomic():
+            if table in RAW_TABLES:
+                quote_name = connection.ops.quote_name
+                query = (
+                    f'INSERT INTO {quote_name(model._meta.db_table)} '
+                    f'({", ".join(map(quote_name, columns))}) '
+                    f'VALUES ({", ".join(["%s"] * len(columns))})'
+                )
+                with connection.cursor() as cursor:
+                    for batch in self.batches(rows, batch_size):
+                        cursor.executemany(query, batch)
+                        count += len(batch)
+            else:
+                for batch in self.batches(rows, batch_size):
+                    model.objects.bulk_create(
+                        model(**dict(zip(columns, row))) for row in batch)
+                    count += len(batch)
+        return count
+
+    def reset_sequences(self) -> None:
+        """Сдвигает счетчики id после записи с явными id
+        (в SQLite AUTOINCREMENT сдвигается сам)."""
+        statements = connection.ops.sequence_reset_sql(
+            no_style(), list(MODELS.values()))
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def handle(self, *args, **options):
+        """Генерирует таблицы пачками по --batch-size строк, не держа
+        их в памяти. При записи в БД сигналы моделей не вызываются,
+        поэтому затем, как и после download, пересчитывается рейтинг
+        и отправляется сигнал catalogue_imported."""
+        self.check_options(options)
+        output = options['output']
+        if output:
+            os.makedirs(output, exist_ok=True)
+        first_ids = self.get_first_ids(options)
+        generator = DatasetGenerator(
+            options, first_ids,
+            format_csv_date if output
+            else connection.ops.adapt_datetimefield_value)
+
+        started = perf_counter()
+        for table in COLUMNS:
+            table_started = perf_counter()
+            rows = generator.rows(table)
+            if output:
+                count = self.write_csv(output, table, rows,
+                                       options['batch_size'])
+            else:
+                count = self.write_db(table, rows, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(
+                f'Таблица {table} сгенерирована, записей: {count}, '
+                f'за {perf_counter() - table_started:.2f} с'))
+
+        if not output:
+            self.reset_sequences()
+            Title.objects.filter(id__gte=first_ids['title']).recount_ratings()
+            self.stdout.write(self.style.SUCCESS(
+                'Рейтинг произведений пересчитан'))
+            catalogue_imported.send(
+                sender=self.__class__,
+                search_index=not options['no_search_index'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Генерация завершена за {perf_counter() - started:.2f} с'))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from reviews.models import Title
+
+# Запуск из корня проекта:
+# python .\api_yamdb\manage.py recount_ratings
+# --title необязательный параметр. id произведения (можно несколько),
+# для которого пересчитываются счетчики. По умолчанию - все произведения.
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает сумму, количество оценок и рейтинг произведений '
+            'по всем отзывам')
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('--title', type=int, nargs='+', default=None,
+                            help='id произведений для пересчета')
+
+    def handle(self, *args, **options):
+        """Пересчитывает счетчики оценок одним UPDATE-запросом."""
+        titles = Title.objects.all()
+        if options['title']:
+            titles = titles.filter(id__in=options['title'])
+        with transaction.atomic():
+            updated = titles.recount_ratings()
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг пересчитан для произведений: {updated}'))
@@ -0,0 +1,41 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_score_counters(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    Title.objects.update(
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(total=Sum('score')).values('total')),
+            0),
+        review_count=Coalesce(
+            Subquery(reviews.annotate(total=Count('id')).values('total')),
+            0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0035_alter_comment_author_alter_comment_review_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_score_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0036_title_score_sum_review_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSnapshot',
+            fields=[
+                ('title', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='snapshot', serialize=False, to='reviews.title', verbose_name='Произведение')),
+                ('data', models.JSONField(verbose_name='Представление')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'представление произведения',
+                'verbose_name_plural': 'представления произведений',
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-18 01:58
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0037_titlesnapshot'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(django.db.models.functions.text.Lower('slug'), name='category_slug_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', '-pub_date'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(django.db.models.functions.text.Lower('slug'), name='genre_slug_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date'], name='review_title_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year'], name='title_year_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name'], name='title_name_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0038_lookup_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ('-pub_date', '-id'), 'verbose_name': 'комментарий', 'verbose_name_plural': 'комментарии'},
+        ),
+        migrations.AlterModelOptions(
+            name='review',
+            options={'ordering': ('-pub_date', '-id'), 'verbose_name': 'отзыв', 'verbose_name_plural': 'отзывы'},
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_review_pub_date_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_title_pub_date_idx',
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['review', '-pub_date', '-id'], name='comment_review_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', '-pub_date', '-id'], name='review_title_pub_date_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0039_publication_keyset_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirtyTitle',
+            fields=[
+                ('title_id', models.PositiveIntegerField(primary_key=True, serialize=False, verbose_name='id произведения')),
+                ('marked_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата отметки')),
+            ],
+            options={
+                'verbose_name': 'произведение для пересчета рейтинга',
+                'verbose_name_plural': 'произведения для пересчета рейтинга',
+                'ordering': ('marked_at',),
+            },
+        ),
+    ]
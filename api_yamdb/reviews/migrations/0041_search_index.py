@@ -0,0 +1,71 @@
+# Таблицы полнотекстового поиска (api.services.search): FTS5 для SQLite,
+# tsvector с GIN-индексом для PostgreSQL. Для других СУБД поиск
+# выполняется без индекса.
+
+from django.db import migrations
+
+SQLITE_TABLES = (
+    'CREATE VIRTUAL TABLE search_title USING fts5('
+    "name, description, tokenize='unicode61 remove_diacritics 2', "
+    "prefix='2 3')",
+    'CREATE VIRTUAL TABLE search_review USING fts5('
+    "parent, text, tokenize='unicode61 remove_diacritics 2', "
+    "prefix='2 3')",
+    'CREATE VIRTUAL TABLE search_comment USING fts5('
+    "parent, text, tokenize='unicode61 remove_diacritics 2', "
+    "prefix='2 3')",
+    'INSERT INTO search_title (rowid, name, description) '
+    'SELECT id, name, description FROM reviews_title',
+    'INSERT INTO search_review (rowid, parent, text) '
+    "SELECT id, 'p' || title_id, text FROM reviews_review",
+    'INSERT INTO search_comment (rowid, parent, text) '
+    "SELECT id, 'p' || review_id, text FROM reviews_comment",
+)
+
+POSTGRESQL_TABLES = tuple(
+    statement
+    for table in ('search_title', 'search_review', 'search_comment')
+    for statement in (
+        f'CREATE TABLE {table} (id integer PRIMARY KEY, '
+        'parent_id integer NULL, document tsvector NOT NULL)',
+        f'CREATE INDEX {table}_document_idx ON {table} USING GIN (document)',
+        f'CREATE INDEX {table}_parent_idx ON {table} (parent_id)',
+    )
+) + (
+    'INSERT INTO search_title (id, document) '
+    "SELECT id, setweight(to_tsvector('russian', name), 'A') "
+    "|| setweight(to_tsvector('russian', description), 'B') "
+    'FROM reviews_title',
+    'INSERT INTO search_review (id, parent_id, document) '
+    "SELECT id, title_id, to_tsvector('russian', text) FROM reviews_review",
+    'INSERT INTO search_comment (id, parent_id, document) '
+    "SELECT id, review_id, to_tsvector('russian', text) "
+    'FROM reviews_comment',
+)
+
+
+def create_search_tables(apps, schema_editor):
+    statements = {
+        'sqlite': SQLITE_TABLES,
+        'postgresql': POSTGRESQL_TABLES,
+    }.get(schema_editor.connection.vendor, ())
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_tables(apps, schema_editor):
+    if schema_editor.connection.vendor not in ('sqlite', 'postgresql'):
+        return
+    for table in ('search_title', 'search_review', 'search_comment'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0040_dirtytitle'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_tables, drop_search_tables),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def fill_rankings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    TitleRanking = apps.get_model('reviews', 'TitleRanking')
+    genres = {}
+    for title_id, genre_id in Title.genre.through.objects.values_list(
+            'title_id', 'genre_id'):
+        genres.setdefault(title_id, []).append(genre_id)
+    TitleRanking.objects.bulk_create(
+        (
+            TitleRanking(title_id=title_id, genre_id=genre_id,
+                         category_id=category_id, year=year,
+                         rating=rating, review_count=review_count)
+            for title_id, category_id, year, rating, review_count
+            in Title.objects.values_list(
+                'id', 'category_id', 'year', 'rating', 'review_count')
+            for genre_id in [None, *genres.get(title_id, ())]
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0041_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.SmallIntegerField(verbose_name='Год выпуска')),
+                ('rating', models.PositiveSmallIntegerField(null=True, verbose_name='Рейтинг')),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'строка рейтинга',
+                'verbose_name_plural': 'рейтинг произведений',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', '-review_count'], name='title_rating_idx'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='category',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.category', verbose_name='Категория'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='genre',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.genre', verbose_name='Жанр'),
+        ),
+        migrations.AddField(
+            model_name='titleranking',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='reviews.title', verbose_name='Произведение'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', '-rating', '-review_count'], name='ranking_genre_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'category', '-rating', '-review_count'], name='ranking_genre_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titleranking',
+            index=models.Index(fields=['genre', 'year', '-rating', '-review_count'], name='ranking_genre_year_idx'),
+        ),
+        migrations.RunPython(fill_rankings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.1.1 on 2026-10-18 03:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_score_histogram(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    Title = apps.get_model('reviews', 'Title')
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')).order_by().values('title')
+    Title.objects.update(**{
+        f'score_{score}': Coalesce(
+            Subquery(reviews.filter(score=score).annotate(
+                total=Count('id')).values('total')),
+            0)
+        for score in range(1, 11)
+    })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0042_title_ranking'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='score_1',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 1'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_10',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 10'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_2',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 2'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_3',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 3'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_4',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 4'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_5',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 5'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_6',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 6'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_7',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 7'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_8',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 8'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_9',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Оценок 9'),
+        ),
+        migrations.RunPython(fill_score_histogram,
+                             migrations.RunPython.noop),
+    ]
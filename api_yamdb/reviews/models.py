@@ -1,6 +1,18 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import connections, models, router, transaction
+from django.db.models import (
+    Case,
+    F,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    When,
+)
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Mod
+from django.db.models.lookups import Exact
+from django.db.models.sql import Query
 
 from constants.constants import CHAR_FIELD_LENGTH, MAX_SCORE, MIN_SCORE
 
@@ -12,18 +24,114 @@ User = get_user_model()
 
 class Category(NameSlugBaseModel):
 
-    class Meta:
+    class Meta(NameSlugBaseModel.Meta):
         verbose_name = 'категория'
         verbose_name_plural = 'категории'
 
 
 class Genre(NameSlugBaseModel):
 
-    class Meta:
+    class Meta(NameSlugBaseModel.Meta):
         verbose_name = 'жанр'
         verbose_name_plural = 'жанры'
 
 
+# Возможные оценки и поля произведения с количеством каждой из них
+SCORES = range(MIN_SCORE, MAX_SCORE + 1)
+SCORE_FIELDS = {score: f'score_{score}' for score in SCORES}
+
+
+def rating_expression(score_sum, review_count):
+    """Рейтинг - средняя оценка score_sum / review_count, округленная
+    как round() в Python: половина округляется к четному (6.5 -> 6,
+    7.5 -> 8). ROUND в БД округляет половину от нуля, поэтому
+    округление выражено целочисленной арифметикой, одинаковой
+    в SQLite и PostgreSQL. Без отзывов рейтинг - NULL.
+    """
+    rounded = (2 * score_sum + review_count) / (2 * review_count)
+    return Case(
+        When(Exact(review_count, 0), then=None),
+        # Ровно половина: из двух соседних целых выбирается четное
+        When(Exact(Mod(2 * score_sum, 2 * review_count), review_count),
+             then=rounded - Mod(rounded, 2)),
+        default=rounded,
+        output_field=IntegerField(),
+    )
+
+
+class TitleQuerySet(models.QuerySet):
+
+    def change_scores(self, score_delta, count_delta, histogram_delta=None):
+        """Атомарно изменяет сумму, количество оценок и счетчики
+        гистограммы произведений и пересчитывает рейтинг одним
+        UPDATE-запросом.
+
+        histogram_delta - словарь {оценка: изменение количества}.
+        """
+        score_sum = F('score_sum') + score_delta
+        review_count = F('review_count') + count_delta
+        updated = self.update(
+            score_sum=score_sum,
+            review_count=review_count,
+            rating=rating_expression(score_sum, review_count),
+            **{SCORE_FIELDS[score]: F(SCORE_FIELDS[score]) + delta
+               for score, delta in (histogram_delta or {}).items() if delta}
+        )
+        self.sync_rankings()
+        return updated
+
+    def recount_ratings(self):
+        """Пересчитывает счетчики оценок, гистограмму и рейтинг
+        произведений одним UPDATE ... FROM по сгруппированным отзывам
+        и переносит рейтинг в строки TitleRanking."""
+        using = self._db or router.db_for_write(self.model)
+        connection = connections[using]
+        title_table = connection.ops.quote_name(Title._meta.db_table)
+        review_table = connection.ops.quote_name(Review._meta.db_table)
+        titles_sql, params = self.order_by().values('pk').query.get_compiler(
+            using).as_sql()
+        query = Query(self.model)
+        rating_sql, rating_params = query.get_compiler(using).compile(
+            rating_expression(
+                RawSQL('scores.score_sum', [], IntegerField()),
+                RawSQL('scores.review_count', [], IntegerField()),
+            ).resolve_expression(query))
+        histogram_set = ''.join(
+            f', {field} = scores.{field}' for field in SCORE_FIELDS.values())
+        histogram_select = ''.join(
+            f', SUM(CASE WHEN r.score = {score} THEN 1 ELSE 0 END) '
+            f'AS {field}' for score, field in SCORE_FIELDS.items())
+        # LEFT JOIN оставляет произведения, у которых удалены все отзывы
+        sql = (
+            f'UPDATE {title_table} SET score_sum = scores.score_sum, '
+            'review_count = scores.review_count, '
+            f'rating = {rating_sql}'
+            f'{histogram_set} '
+            'FROM (SELECT t.id AS title_id, '
+            'COALESCE(SUM(r.score), 0) AS score_sum, '
+            'COUNT(r.id) AS review_count'
+            f'{histogram_select} '
+            f'FROM {title_table} t LEFT JOIN {review_table} r '
+            'ON r.title_id = t.id '
+            f'WHERE t.id IN ({titles_sql}) GROUP BY t.id) AS scores '
+            f'WHERE {title_table}.id = scores.title_id'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, (*rating_params, *params))
+            updated = cursor.rowcount
+        self.sync_rankings()
+        return updated
+
+    def sync_rankings(self):
+        """Переносит рейтинг и количество отзывов произведений в их
+        строки TitleRanking одним UPDATE-запросом."""
+        titles = Title.objects.filter(pk=OuterRef('title_id'))
+        return TitleRanking.objects.filter(title__in=self).update(
+            rating=Subquery(titles.values('rating')),
+            review_count=Subquery(titles.values('review_count')),
+        )
+
+
 class Title(models.Model):
     name = models.CharField('Название', max_length=CHAR_FIELD_LENGTH)
     year = models.SmallIntegerField(
@@ -34,6 +142,12 @@ class Title(models.Model):
     # усреднённая оценка произведения — рейтинг (целое число)
     rating = models.PositiveSmallIntegerField('Рейтинг', default=None,
                                               null=True)
+    # Сумма и количество оценок хранятся, чтобы пересчитывать рейтинг
+    # за O(1) при каждом изменении отзыва.
+    score_sum = models.PositiveIntegerField('Сумма оценок', default=0,
+                                            editable=False)
+    review_count = models.PositiveIntegerField('Количество отзывов',
+                                               default=0, editable=False)
     description = models.TextField('Описание', blank=True)
     genre = models.ManyToManyField(Genre, related_name='titles',
                                    verbose_name='Жанр')
@@ -41,13 +155,134 @@ class Title(models.Model):
                                  related_name='titles', null=True,
                                  verbose_name='Категория')
 
+    objects = TitleQuerySet.as_manager()
+
     class Meta:
         verbose_name = 'произведение'
         verbose_name_plural = 'произведения'
+        indexes = (
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(fields=('name',), name='title_name_idx'),
+            # Сортировка списка произведений по рейтингу (ordering)
+            models.Index(fields=('-rating', '-review_count'),
+                         name='title_rating_idx'),
+        )
 
     def __str__(self):
         return f'{self.name} ({self.year})'
 
+    @property
+    def score_histogram(self):
+        """Количество отзывов с каждой оценкой."""
+        return {score: getattr(self, field)
+                for score, field in SCORE_FIELDS.items()}
+
+
+# Гистограмма оценок: количество отзывов с каждой оценкой, меняется вместе
+# с суммой и количеством оценок. Поля создаются по SCORES, поэтому
+# не расходятся с допустимыми оценками.
+for score, field_name in SCORE_FIELDS.items():
+    Title.add_to_class(field_name, models.PositiveIntegerField(
+        f'Оценок {score}', default=0, editable=False))
+
+
+class TitleSnapshot(models.Model):
+    """Готовое представление произведения для списка произведений.
+
+    Хранит жанры и категорию уже сериализованными, чтобы список
+    произведений читался без соединения с жанрами и категориями.
+    Рейтинг не хранится: он читается из самого произведения.
+    """
+
+    title = models.OneToOneField(
+        Title,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='snapshot',
+        verbose_name='Произведение'
+    )
+    data = models.JSONField('Представление')
+    updated_at = models.DateTimeField('Дата обновления', auto_now=True)
+
+    class Meta:
+        verbose_name = 'представление произведения'
+        verbose_name_plural = 'представления произведений'
+
+    def __str__(self):
+        return str(self.title_id)
+
+
+class TitleRanking(models.Model):
+    """Строка рейтинга произведений для списков лучших.
+
+    У каждого произведения одна строка без жанра (общий рейтинг) и по
+    строке на каждый его жанр. Рейтинг, количество отзывов, категория
+    и год скопированы из произведения, чтобы список лучших по жанру,
+    категории или году читался одним запросом по индексу.
+    """
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='rankings',
+        verbose_name='Произведение'
+    )
+    genre = models.ForeignKey(
+        Genre,
+        on_delete=models.CASCADE,
+        null=True,
+        related_name='+',
+        verbose_name='Жанр'
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='+',
+        verbose_name='Категория'
+    )
+    year = models.SmallIntegerField('Год выпуска')
+    rating = models.PositiveSmallIntegerField('Рейтинг', null=True)
+    review_count = models.PositiveIntegerField('Количество отзывов',
+                                               default=0)
+
+    class Meta:
+        verbose_name = 'строка рейтинга'
+        verbose_name_plural = 'рейтинг произведений'
+        indexes = (
+            models.Index(fields=('genre', '-rating', '-review_count'),
+                         name='ranking_genre_idx'),
+            models.Index(fields=('genre', 'category', '-rating',
+                                 '-review_count'),
+                         name='ranking_genre_category_idx'),
+            models.Index(fields=('genre', 'year', '-rating',
+                                 '-review_count'),
+                         name='ranking_genre_year_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.title_id}: {self.rating}'
+
+
+class DirtyTitle(models.Model):
+    """Произведение, рейтинг которого нужно пересчитать.
+
+    Заполняется при отложенном пересчете рейтинга (RATING_UPDATE_MODE):
+    сколько бы отзывов ни изменилось, произведение попадает в очередь
+    один раз. Хранится id, а не внешний ключ, чтобы отметка не мешала
+    удалению произведения вместе с отзывами.
+    """
+    title_id = models.PositiveIntegerField('id произведения',
+                                           primary_key=True)
+    marked_at = models.DateTimeField('Дата отметки', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'произведение для пересчета рейтинга'
+        verbose_name_plural = 'произведения для пересчета рейтинга'
+        ordering = ('marked_at',)
+
+    def __str__(self):
+        return str(self.title_id)
+
 
 class Review(PublicationBaseModel):
     """Класс для работы с отзывами на произведения."""
@@ -72,6 +307,24 @@ class Review(PublicationBaseModel):
         constraints = [models.UniqueConstraint(
             fields=('title', 'author'), name='unique review')
         ]
+        indexes = (
+            models.Index(fields=('title', '-pub_date', '-id'),
+                         name='review_title_pub_date_idx'),
+        )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает оценку, загруженную из БД, чтобы при изменении отзыва
+        скорректировать сумму оценок произведения без лишнего запроса."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв в одной транзакции с обновлением рейтинга
+        произведения в обработчике post_save."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
 
 class Comment(PublicationBaseModel):
@@ -87,3 +340,7 @@ class Comment(PublicationBaseModel):
     class Meta(PublicationBaseModel.Meta):
         verbose_name = 'комментарий'
         verbose_name_plural = 'комментарии'
+        indexes = (
+            models.Index(fields=('review', '-pub_date', '-id'),
+                         name='comment_review_pub_date_idx'),
+        )
@@ -0,0 +1,7 @@
+from django.dispatch import Signal
+
+# Отправляется после массовой загрузки данных в обход сигналов моделей,
+# чтобы обработчики могли обновить производные данные. Аргумент
+# search_index=False откладывает построение индекса поиска (команда
+# rebuild_search_index).
+catalogue_imported = Signal()
@@ -2,7 +2,17 @@ from django.contrib import admin
 from django.contrib.auth import get_user_model
 from django.contrib.auth.admin import UserAdmin
 
+from .models import OutgoingEmail
+
 User = get_user_model()
 
 
 admin.site.register(User, UserAdmin)
+
+
+@admin.register(OutgoingEmail)
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'status', 'attempts',
+                    'created_at', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('recipient',)
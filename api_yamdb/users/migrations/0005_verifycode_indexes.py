@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 02:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_outgoingemail'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='verifycode',
+            index=models.Index(fields=['user', 'is_used'], name='verify_code_user_used_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='verifycode',
+            index=models.Index(fields=['expires_at'], name='verify_code_expires_at_idx'),
+        ),
+    ]
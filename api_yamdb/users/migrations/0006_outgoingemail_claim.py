@@ -0,0 +1,23 @@
+# Generated by Django 5.1.1 on 2026-10-18 03:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_verifycode_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outgoingemail',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято на отправку'),
+        ),
+        migrations.AlterField(
+            model_name='outgoingemail',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=256, verbose_name='Статус'),
+        ),
+    ]
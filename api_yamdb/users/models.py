@@ -4,6 +4,7 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from django.db import models
+from django.db.models import F
 from django.utils import timezone
 
 from constants.constants import ATTEMPT, CHAR_FIELD_LENGTH, FORBIDDEN_USERNAME
@@ -62,6 +63,14 @@ class VerifyCode(models.Model):
     class Meta:
         verbose_name = 'Код доступа'
         verbose_name_plural = 'Коды доступа'
+        indexes = (
+            # Поиск неиспользованного кода пользователя при выдаче токена
+            models.Index(fields=('user', 'is_used'),
+                         name='verify_code_user_used_idx'),
+            # Поиск истекших кодов для очистки
+            models.Index(fields=('expires_at',),
+                         name='verify_code_expires_at_idx'),
+        )
 
     def save(self, *args, **kwargs):
         if not self.expires_at:
@@ -75,7 +84,57 @@ class VerifyCode(models.Model):
                 and (self.failed_attempt
                      <= settings.MAX_AUTHORIZATION_ATTEMPTS))
 
-    @property
     def increase_attempts(self):
+        """Увеличивает счетчик неудачных попыток атомарным UPDATE,
+        не перезаписывая остальные поля кода."""
+        VerifyCode.objects.filter(pk=self.pk).update(
+            failed_attempt=F('failed_attempt') + 1)
         self.failed_attempt += 1
-        self.save()
+
+    def mark_used(self):
+        """Помечает код использованным одним UPDATE."""
+        VerifyCode.objects.filter(pk=self.pk).update(is_used=True)
+        self.is_used = True
+
+
+class OutgoingEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Записывается в одной транзакции с данными, о которых сообщает,
+    и отправляется фоновым обработчиком очереди.
+    """
+    class Status(models.TextChoices):
+        PENDING = 'pending'
+        SENDING = 'sending'
+        SENT = 'sent'
+        FAILED = 'failed'
+    recipient = models.EmailField('Получатель')
+    subject = models.CharField('Тема', max_length=CHAR_FIELD_LENGTH)
+    body = models.TextField('Текст')
+    status = models.CharField(
+        'Статус',
+        choices=Status,
+        default=Status.PENDING,
+        max_length=CHAR_FIELD_LENGTH
+    )
+    attempts = models.PositiveSmallIntegerField('Попытки', default=ATTEMPT)
+    next_attempt_at = models.DateTimeField('Следующая попытка',
+                                           default=timezone.now)
+    created_at = models.DateTimeField('Создано', auto_now_add=True)
+    # Когда обработчик очереди забрал письмо на отправку
+    claimed_at = models.DateTimeField('Взято на отправку', null=True,
+                                      blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        verbose_name = 'Письмо'
+        verbose_name_plural = 'Очередь писем'
+        ordering = ('next_attempt_at', 'id')
+        indexes = (
+            models.Index(fields=('status', 'next_attempt_at'),
+                         name='outgoing_email_queue_idx'),
+        )
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject}'
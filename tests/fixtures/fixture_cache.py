@@ -0,0 +1,13 @@
+import pytest
+from django.core.cache import cache
+
+from api.services.cache import clear_user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    clear_user_cache()
+    yield
+    cache.clear()
+    clear_user_cache()
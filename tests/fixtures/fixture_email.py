@@ -0,0 +1,6 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def eager_email_outbox(settings):
+    settings.EMAIL_OUTBOX_MODE = 'eager'
@@ -0,0 +1,226 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import ReviewSerializer
+from reviews.models import Category, Comment, Genre, Review, Title
+from tests.utils import create_comments
+
+
+def capture_queries(client, url, data=None,
+                    expected_status=HTTPStatus.OK):
+    method = 'POST' if data else 'GET'
+    with CaptureQueriesContext(connection) as context:
+        if data:
+            response = client.post(url, data=data)
+        else:
+            response = client.get(url)
+    assert response.status_code == expected_status, (
+        f'Проверьте, что {method}-запрос к `{url}` возвращает ответ со '
+        f'статусом {expected_status}.'
+    )
+    return [query['sql'] for query in context.captured_queries]
+
+
+def count_queries(client, url):
+    return len(capture_queries(client, url))
+
+
+def create_catalogue(titles_count, genres_per_title):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(genres_per_title)
+    ]
+    titles = []
+    for idx in range(titles_count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleQueryCount:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def test_01_titles_list_constant_queries(self, client):
+        create_catalogue(titles_count=20, genres_per_title=1)
+        small_page = count_queries(client, f'{self.TITLES_URL}?limit=1')
+        big_page = count_queries(client, f'{self.TITLES_URL}?limit=20')
+        assert small_page == big_page, (
+            f'Проверьте, что число запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от размера страницы: '
+            f'{small_page} запрос(ов) для 1 произведения и {big_page} для 20.'
+        )
+
+    def test_02_titles_list_queries_do_not_depend_on_genres(self, client):
+        titles = create_catalogue(titles_count=5, genres_per_title=1)
+        one_genre = count_queries(client, self.TITLES_URL)
+        extra_genres = [
+            Genre.objects.create(name=f'Ещё жанр {idx}', slug=f'extra-{idx}')
+            for idx in range(5)
+        ]
+        for title in titles:
+            title.genre.add(*extra_genres)
+        many_genres = count_queries(client, self.TITLES_URL)
+        assert one_genre == many_genres, (
+            f'Проверьте, что число запросов к БД при GET-запросе к '
+            f'`{self.TITLES_URL}` не зависит от количества жанров '
+            'произведения.'
+        )
+
+    def test_03_title_detail_queries(self, client):
+        title, *_ = create_catalogue(titles_count=1, genres_per_title=5)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+        queries = count_queries(client, url)
+        assert queries <= 2, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_DETAIL_URL_TEMPLATE}` '
+            'получает произведение, категорию и жанры не более чем за два '
+            f'запроса к БД. Сейчас запросов: {queries}.'
+        )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08PublicationQueryCount:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def urls(self, admin_client, admin, user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        return (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+        )
+
+    def parent_lookups(self, queries, table):
+        return [
+            sql for sql in queries if sql.startswith(f'SELECT "{table}"."id"')
+        ]
+
+    def test_01_review_parent_resolved_once(self, client, moderator_client,
+                                            urls):
+        reviews_url, _ = urls
+        for queries in (
+            capture_queries(client, reviews_url),
+            capture_queries(
+                moderator_client, reviews_url, {'text': 'text', 'score': 3},
+                HTTPStatus.CREATED
+            ),
+        ):
+            assert len(self.parent_lookups(queries, 'reviews_title')) == 1, (
+                f'Проверьте, что запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+                'получает произведение из БД один раз.'
+            )
+
+    def test_02_post_review_queries(self, moderator_client, urls):
+        reviews_url, _ = urls
+        queries = capture_queries(
+            moderator_client, reviews_url, {'text': 'text', 'score': 3},
+            HTTPStatus.CREATED
+        )
+        # пользователь, произведение, BEGIN, INSERT, UPDATE рейтинга,
+        # UPDATE строк рейтинга, запись в индекс поиска, COMMIT
+        assert len(queries) <= 8, (
+            f'Проверьте, что POST-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+            f'выполняет не более 8 запросов к БД. Сейчас: {queries}'
+        )
+        queries = capture_queries(
+            moderator_client, reviews_url, {'text': 'text', 'score': 3},
+            HTTPStatus.BAD_REQUEST
+        )
+        review_queries = [sql for sql in queries if 'reviews_review' in sql]
+        assert review_queries and review_queries[0].startswith('INSERT'), (
+            'Проверьте, что повторный отзыв отсекается ограничением БД, '
+            'а отзыв ищется только после ошибки записи.'
+        )
+
+    def test_03_comment_parent_resolved_once(self, client, moderator_client,
+                                             urls):
+        _, comments_url = urls
+        queries = capture_queries(client, comments_url)
+        assert len(self.parent_lookups(queries, 'reviews_review')) == 1, (
+            f'Проверьте, что GET-запрос к `{self.COMMENTS_URL_TEMPLATE}` '
+            'получает отзыв из БД один раз.'
+        )
+        queries = capture_queries(
+            moderator_client, comments_url, {'text': 'text'},
+            HTTPStatus.CREATED
+        )
+        # пользователь, отзыв, INSERT, запись в индекс поиска
+        assert len(queries) <= 4, (
+            f'Проверьте, что POST-запрос к `{self.COMMENTS_URL_TEMPLATE}` '
+            f'выполняет не более 4 запросов к БД. Сейчас: {queries}'
+        )
+
+    def add_publications(self, django_user_model, title_id, review_id):
+        authors = django_user_model.objects.bulk_create(
+            django_user_model(username=f'reader{idx}',
+                              email=f'reader{idx}@yamdb.fake')
+            for idx in range(5)
+        )
+        for author in authors:
+            Review.objects.create(title_id=title_id, author=author,
+                                  text='text', score=5)
+            Comment.objects.create(review_id=review_id, author=author,
+                                   text='text')
+
+    @pytest.mark.parametrize('cursor', ['', '&cursor='])
+    def test_04_list_pages_constant_queries(self, client, urls,
+                                            django_user_model, cursor):
+        reviews_url, comments_url = urls
+        title_id, review_id = map(int, re.findall(r'/(\d+)/', comments_url))
+        self.add_publications(django_user_model, title_id, review_id)
+        for url in (reviews_url, comments_url):
+            small_page = capture_queries(client, f'{url}?limit=1{cursor}')
+            queries = capture_queries(client, f'{url}?limit=10{cursor}')
+            assert len(queries) == len(small_page), (
+                f'Проверьте, что число запросов к БД при GET-запросе к '
+                f'`{url}` не зависит от размера страницы: авторы должны '
+                'загружаться тем же запросом, что и публикации.'
+            )
+            # родитель, публикации (и количество для limit/offset)
+            assert len(queries) == (2 if cursor else 3), (
+                f'Проверьте, что GET-запрос к `{url}` выполняет '
+                f'фиксированное число запросов к БД. Сейчас: {queries}'
+            )
+            assert not self.parent_lookups(queries, 'users_user')
+
+    def test_05_detail_queries(self, client, urls):
+        reviews_url, comments_url = urls
+        review_id = int(re.findall(r'/(\d+)/', comments_url)[1])
+        comment_id = Comment.objects.filter(review_id=review_id).first().id
+        for url in (f'{reviews_url}{review_id}/',
+                    f'{comments_url}{comment_id}/'):
+            queries = capture_queries(client, url)
+            assert len(queries) == 2, (
+                f'Проверьте, что GET-запрос к `{url}` получает публикацию '
+                'вместе с автором. Сейчас запросов: '
+                f'{len(queries)}.'
+            )
+
+    def test_06_other_integrity_errors_not_hidden(self, moderator_client,
+                                                   urls, monkeypatch):
+        reviews_url, _ = urls
+
+        def save(serializer, **kwargs):
+            raise IntegrityError('NOT NULL constraint failed')
+
+        monkeypatch.setattr(ReviewSerializer, 'save', save)
+        with pytest.raises(IntegrityError):
+            moderator_client.post(reviews_url, data={'text': 'text',
+                                                     'score': 3})
@@ -0,0 +1,116 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import DirtyTitle, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleRating:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def check_counters(self, title_id, score_sum, review_count, rating):
+        title = Title.objects.get(id=title_id)
+        assert (title.score_sum, title.review_count, title.rating) == (
+            score_sum, review_count, rating
+        ), (
+            'Проверьте, что сумма оценок, количество отзывов и рейтинг '
+            'произведения обновляются при изменении отзывов.'
+        )
+
+    def test_01_counters_follow_reviews(self, admin_client, user_client,
+                                        moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'review', 3)
+        response = create_single_review(
+            moderator_client, title_id, 'review', 8
+        )
+        self.check_counters(title_id, 11, 2, 6)
+
+        review_url = self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=response.json()['id']
+        )
+        response = moderator_client.patch(review_url, data={'score': 10})
+        assert response.status_code == HTTPStatus.OK
+        self.check_counters(title_id, 13, 2, 6)
+
+        response = moderator_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        self.check_counters(title_id, 3, 1, 3)
+
+    def test_02_recount_ratings_command(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'review', 7)
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+
+        call_command('recount_ratings')
+        self.check_counters(title_id, 7, 1, 7)
+        self.check_counters(titles[1]['id'], 0, 0, None)
+
+    def test_03_deferred_updates_are_coalesced(self, admin_client,
+                                               user_client, moderator_client,
+                                               settings):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        settings.RATING_UPDATE_MODE = 'worker'
+        create_single_review(user_client, title_id, 'review', 3)
+        response = create_single_review(
+            moderator_client, title_id, 'review', 8
+        )
+        self.check_counters(title_id, 0, 0, None)
+        assert list(DirtyTitle.objects.values_list('title_id', flat=True)) == [
+            title_id
+        ], (
+            'Проверьте, что при отложенном пересчете произведение попадает '
+            'в очередь один раз, сколько бы отзывов ни изменилось.'
+        )
+
+        call_command('flush_ratings')
+        self.check_counters(title_id, 11, 2, 6)
+        assert not DirtyTitle.objects.exists()
+
+        moderator_client.delete(self.REVIEW_DETAIL_URL_TEMPLATE.format(
+            title_id=title_id, review_id=response.json()['id']
+        ))
+        Title.objects.get(id=title_id).reviews.all().delete()
+        call_command('flush_ratings')
+        self.check_counters(title_id, 0, 0, None)
+
+    @pytest.mark.parametrize('batch_size', ['0', '-1'])
+    def test_04_flush_invalid_batch_size(self, batch_size):
+        with pytest.raises(CommandError):
+            call_command('flush_ratings', '--batch-size', batch_size)
+
+    @pytest.mark.parametrize('scores, rating', [
+        ((6, 7), 6),
+        ((7, 8), 8),
+        ((1, 2), 2),
+        ((6, 6, 7), 6),
+    ])
+    def test_05_half_rounds_to_even(self, admin_client, user_client,
+                                    moderator_client, scores, rating):
+        # Как round() в Python: 6.5 -> 6, 7.5 -> 8
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for client, score in zip(
+                (user_client, moderator_client, admin_client), scores):
+            create_single_review(client, title_id, 'review', score)
+        self.check_counters(title_id, sum(scores), len(scores), rating)
+        response = admin_client.get(f'/api/v1/titles/{title_id}/')
+        assert response.json()['rating'] == rating, (
+            'Проверьте, что рейтинг произведения округляется как round(): '
+            'половина округляется к четному.'
+        )
+
+        Title.objects.update(score_sum=0, review_count=0, rating=None)
+        call_command('recount_ratings')
+        self.check_counters(title_id, sum(scores), len(scores), rating)
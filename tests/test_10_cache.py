@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CatalogueCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def test_01_cached_list_skips_database(self, client, admin_client):
+        create_titles(admin_client)
+        first = client.get(self.TITLES_URL)
+        with CaptureQueriesContext(connection) as context:
+            second = client.get(self.TITLES_URL)
+        assert second.status_code == HTTPStatus.OK
+        assert second.json() == first.json(), (
+            f'Проверьте, что закэшированный ответ `{self.TITLES_URL}` '
+            'совпадает с исходным.'
+        )
+        assert not context.captured_queries, (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'обслуживается из кэша без обращения к БД.'
+        )
+
+    def test_02_etag_not_modified(self, client, admin_client):
+        create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        etag = response.headers.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит заголовок ETag.'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с актуальным '
+            'If-None-Match возвращает ответ со статусом 304.'
+        )
+        assert not context.captured_queries
+
+        response = client.get(
+            f'{self.TITLES_URL}?limit=1', HTTP_IF_NONE_MATCH=etag
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что ETag зависит от параметров запроса.'
+        )
+
+    def test_03_writes_invalidate_cache(self, client, admin_client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        etag = client.get(self.TITLES_URL).headers['ETag']
+
+        create_single_review(user_client, titles[0]['id'], 'review', 9)
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв делает недействительным кэш '
+            f'`{self.TITLES_URL}`.'
+        )
+        ratings = {
+            title['id']: title['rating'] for title in response.json()['results']
+        }
+        assert ratings[titles[0]['id']] == 9
+
+        client.get(self.CATEGORIES_URL)
+        admin_client.post(
+            self.CATEGORIES_URL, data={'name': 'Музыка', 'slug': 'music'}
+        )
+        response = client.get(self.CATEGORIES_URL)
+        assert response.json()['count'] == 3, (
+            f'Проверьте, что новая категория сбрасывает кэш '
+            f'`{self.CATEGORIES_URL}`.'
+        )
@@ -0,0 +1,82 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Category, Genre, TitleSnapshot
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSnapshots:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def get_list_item(self, client, title_id):
+        response = client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        return next(
+            item for item in response.json()['results']
+            if item['id'] == title_id
+        )
+
+    def test_01_list_matches_detail(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        for title in titles:
+            detail = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title['id'])
+            ).json()
+            # Гистограмма оценок отдается только для одного произведения
+            detail.pop('score_histogram')
+            assert self.get_list_item(client, title['id']) == detail, (
+                f'Проверьте, что элементы списка `{self.TITLES_URL}` '
+                'совпадают с ответом на запрос к '
+                f'`{self.TITLES_DETAIL_URL_TEMPLATE}`.'
+            )
+
+    def test_02_snapshots_follow_related_changes(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        title_id = titles[0]['id']
+
+        Genre.objects.filter(slug=genres[0]['slug']).update(name='Триллер')
+        genre = Genre.objects.get(slug=genres[0]['slug'])
+        genre.save()
+        item = self.get_list_item(client, title_id)
+        assert {'name': 'Триллер', 'slug': genre.slug} in item['genre'], (
+            'Проверьте, что изменение жанра обновляет список произведений.'
+        )
+
+        Genre.objects.get(slug=genres[1]['slug']).delete()
+        item = self.get_list_item(client, title_id)
+        assert len(item['genre']) == 1, (
+            'Проверьте, что удаление жанра обновляет список произведений.'
+        )
+
+        Category.objects.get(slug=categories[0]['slug']).delete()
+        item = self.get_list_item(client, title_id)
+        assert item['category'] == {'name': '', 'slug': ''}, (
+            'Проверьте, что удаление категории обновляет список произведений.'
+        )
+        call_command('check_title_snapshots')
+
+    def test_03_check_and_rebuild_commands(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        TitleSnapshot.objects.filter(title_id=titles[0]['id']).update(
+            data={}
+        )
+        TitleSnapshot.objects.filter(title_id=titles[1]['id']).delete()
+        with pytest.raises(CommandError):
+            call_command('check_title_snapshots')
+
+        call_command('check_title_snapshots', '--fix')
+        call_command('check_title_snapshots')
+
+        TitleSnapshot.objects.all().delete()
+        call_command('rebuild_title_snapshots')
+        assert TitleSnapshot.objects.count() == len(titles)
+
+    def test_04_rebuild_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command('rebuild_title_snapshots', '--batch-size', '0')
@@ -0,0 +1,83 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review
+from tests.utils import create_comments
+
+# Таблицы, полный просмотр которых недопустим при фильтрации
+INDEXED_TABLES = (
+    'reviews_title',
+    'reviews_genre',
+    'reviews_category',
+    'reviews_review',
+    'reviews_comment',
+)
+
+
+def full_scans(client, url):
+    """Выполняет запрос и возвращает строки планов SQLite,
+    в которых таблица просматривается целиком без индекса."""
+    with CaptureQueriesContext(connection) as context:
+        client.get(url)
+    scans = []
+    with connection.cursor() as cursor:
+        for query in context.captured_queries:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            for *_, detail in cursor.fetchall():
+                if (detail.startswith('SCAN')
+                        and 'INDEX' not in detail
+                        and detail.split()[1] in INDEXED_TABLES):
+                    scans.append(f'{query["sql"]}: {detail}')
+    return scans
+
+
+@pytest.mark.skipif(connection.vendor != 'sqlite',
+                    reason='Планы запросов проверяются для SQLite')
+@pytest.mark.django_db(transaction=True)
+class Test12QueryPlans:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    @pytest.fixture
+    def comments(self, admin_client, admin, user_client, user,
+                 moderator_client, moderator):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        return create_comments(admin_client, author_map)
+
+    def test_01_title_filters_use_indexes(self, client, comments):
+        _, _, titles = comments
+        title = titles[0]
+        for query in (f'genre={title["genre"][0].upper()}',
+                      f'category={title["category"].upper()}',
+                      f'year={title["year"]}',
+                      f'name={title["name"]}'):
+            url = f'{self.TITLES_URL}?{query}'
+            scans = full_scans(client, url)
+            assert not scans, (
+                f'Проверьте, что GET-запрос к `{url}` использует индексы. '
+                f'Полный просмотр таблиц: {scans}'
+            )
+
+    def test_02_reviews_and_comments_use_indexes(self, client, comments):
+        _, reviews, titles = comments
+        assert Review.objects.count() and Comment.objects.count()
+        for url in (
+            self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            self.COMMENTS_URL_TEMPLATE.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            ),
+        ):
+            scans = full_scans(client, url)
+            assert not scans, (
+                f'Проверьте, что GET-запрос к `{url}` использует индексы. '
+                f'Полный просмотр таблиц: {scans}'
+            )
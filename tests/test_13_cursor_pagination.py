@@ -0,0 +1,94 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Review, Title
+
+
+@pytest.fixture
+def reviews(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(7)
+    ]
+    for author in authors:
+        Review.objects.create(title=title, author=author, text='text', score=5)
+    # Одинаковая дата у части отзывов проверяет сортировку по id
+    Review.objects.filter(author__in=authors[2:5]).update(
+        pub_date=timezone.now()
+    )
+    return title, list(title.reviews.values_list('id', flat=True))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13CursorPagination:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def collect_pages(self, client, url, key):
+        ids, pages = [], []
+        while url:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            data = response.json()
+            pages.append(data)
+            ids.extend(item['id'] for item in data['results'])
+            url = data[key]
+        return ids, pages
+
+    def test_01_cursor_pages_cover_all_reviews(self, client, reviews):
+        title, expected_ids = reviews
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        ids, pages = self.collect_pages(
+            client, f'{url}?cursor=&limit=2', 'next'
+        )
+        assert ids == expected_ids, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'отзывы по одному разу в порядке убывания даты публикации.'
+        )
+        assert 'count' not in pages[0], (
+            'Проверьте, что курсорная пагинация не считает общее количество '
+            'записей без параметра `count=true`.'
+        )
+        assert pages[0]['previous'] is None
+
+        response = client.get(f'{url}?cursor=&count=true')
+        assert response.json()['count'] == len(expected_ids)
+
+    def test_02_previous_links(self, client, reviews):
+        title, expected_ids = reviews
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        _, pages = self.collect_pages(client, f'{url}?cursor=&limit=3', 'next')
+        ids, _ = self.collect_pages(client, pages[-1]['previous'], 'previous')
+        assert ids == [
+            review_id for page in reversed(pages[:-1])
+            for review_id in [item['id'] for item in page['results']]
+        ], (
+            'Проверьте, что ссылки `previous` курсорной пагинации '
+            'возвращают предыдущие страницы.'
+        )
+
+    def test_03_stable_under_inserts(self, client, reviews,
+                                     django_user_model):
+        title, expected_ids = reviews
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        first_page = client.get(f'{url}?cursor=&limit=3').json()
+        author = django_user_model.objects.create_user(
+            username='late', email='late@yamdb.fake'
+        )
+        Review.objects.create(title=title, author=author, text='new', score=1)
+        ids, _ = self.collect_pages(client, first_page['next'], 'next')
+        assert ids == expected_ids[3:], (
+            'Проверьте, что новые отзывы не сдвигают страницы курсорной '
+            'пагинации.'
+        )
+
+    def test_04_invalid_cursor(self, client, reviews):
+        title, _ = reviews
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=title.id)
+        response = client.get(f'{url}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,161 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.services.email import deliver_pending
+from api.services.metrics import REGISTRY
+from users.models import OutgoingEmail
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14EmailOutbox:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def signup(self, client, idx):
+        response = client.post(self.SIGNUP_URL, data={
+            'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'
+        })
+        assert response.status_code == HTTPStatus.OK
+        return response
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        outbox_before = len(mail.outbox)
+        for idx in range(3):
+            self.signup(client, idx)
+        assert len(mail.outbox) == outbox_before, (
+            f'Проверьте, что POST-запрос к `{self.SIGNUP_URL}` не отправляет '
+            'письмо сам, а ставит его в очередь.'
+        )
+        assert OutgoingEmail.objects.filter(
+            status=OutgoingEmail.Status.PENDING
+        ).count() == 3
+
+        call_command('send_emails', '--batch-size', '2')
+        assert len(mail.outbox) == outbox_before + 3, (
+            'Проверьте, что команда `send_emails` отправляет все письма '
+            'из очереди.'
+        )
+        assert not OutgoingEmail.objects.exclude(
+            status=OutgoingEmail.Status.SENT
+        ).exists()
+
+    def test_02_failed_delivery_is_retried(self, client, settings):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        settings.EMAIL_OUTBOX_MAX_ATTEMPTS = 2
+        self.signup(client, 0)
+        settings.EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+        settings.EMAIL_HOST = 'localhost'
+        settings.EMAIL_PORT = 1
+
+        call_command('send_emails')
+        email = OutgoingEmail.objects.get()
+        assert email.status == OutgoingEmail.Status.PENDING
+        assert email.attempts == 1 and email.last_error
+        assert email.next_attempt_at > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается '
+            'на следующую попытку.'
+        )
+
+        OutgoingEmail.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        call_command('send_emails')
+        email.refresh_from_db()
+        assert email.status == OutgoingEmail.Status.FAILED, (
+            'Проверьте, что после EMAIL_OUTBOX_MAX_ATTEMPTS попыток '
+            'письмо помечается как неотправленное.'
+        )
+
+    def test_03_partial_failure_not_resent(self, client, settings,
+                                           monkeypatch):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        for idx in range(3):
+            self.signup(client, idx)
+        send_messages = EmailBackend.send_messages
+
+        def fail_second(backend, messages):
+            assert not connection.in_atomic_block, (
+                'Проверьте, что письма отправляются вне транзакции.'
+            )
+            if messages[0].to == ['user1@yamdb.fake']:
+                raise ConnectionError('SMTP connection lost')
+            return send_messages(backend, messages)
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', fail_second)
+        REGISTRY.clear()
+        outbox_before = len(mail.outbox)
+        deliver_pending()
+        assert len(mail.outbox) == outbox_before + 1
+        statuses = dict(OutgoingEmail.objects.values_list(
+            'recipient', 'status'))
+        assert statuses == {
+            'user0@yamdb.fake': OutgoingEmail.Status.SENT,
+            'user1@yamdb.fake': OutgoingEmail.Status.PENDING,
+            'user2@yamdb.fake': OutgoingEmail.Status.PENDING,
+        }, (
+            'Проверьте, что письма, отправленные до ошибки, отмечаются '
+            'отправленными, а остальные откладываются.'
+        )
+        metrics = REGISTRY.render()
+        for line in ('yamdb_email_sent_total 1',
+                     'yamdb_email_failed_total 2',
+                     'yamdb_email_queue_depth 2'):
+            assert line in metrics, (
+                'Проверьте, что метрики очереди писем содержат количество '
+                'отправленных, неотправленных и ожидающих писем.'
+            )
+
+        monkeypatch.setattr(EmailBackend, 'send_messages', send_messages)
+        OutgoingEmail.objects.update(
+            next_attempt_at=timezone.now() - timedelta(seconds=1)
+        )
+        deliver_pending()
+        assert len(mail.outbox) == outbox_before + 3, (
+            'Проверьте, что уже отправленное письмо не отправляется '
+            'повторно.'
+        )
+
+    def test_04_stale_claim_is_retried(self, client, settings):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        self.signup(client, 0)
+        self.signup(client, 1)
+        now = timezone.now()
+        OutgoingEmail.objects.filter(recipient='user0@yamdb.fake').update(
+            status=OutgoingEmail.Status.SENDING,
+            claimed_at=now - timedelta(
+                seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT + 1))
+        OutgoingEmail.objects.filter(recipient='user1@yamdb.fake').update(
+            status=OutgoingEmail.Status.SENDING, claimed_at=now)
+        outbox_before = len(mail.outbox)
+        call_command('send_emails')
+        assert len(mail.outbox) == outbox_before + 1
+        assert dict(OutgoingEmail.objects.values_list(
+            'recipient', 'status')) == {
+            'user0@yamdb.fake': OutgoingEmail.Status.SENT,
+            'user1@yamdb.fake': OutgoingEmail.Status.SENDING,
+        }, (
+            'Проверьте, что письмо, которое другой обработчик забрал и не '
+            'отметил за EMAIL_OUTBOX_CLAIM_TIMEOUT, отправляется снова, '
+            'а недавно забранное - нет.'
+        )
+
+    @pytest.mark.parametrize('batch_size', ['0', '-1'])
+    def test_05_invalid_batch_size(self, client, settings, batch_size):
+        settings.EMAIL_OUTBOX_MODE = 'worker'
+        self.signup(client, 0)
+        with pytest.raises(CommandError):
+            call_command('send_emails', '--batch-size', batch_size)
+        assert OutgoingEmail.objects.get().status == (
+            OutgoingEmail.Status.PENDING), (
+            'Проверьте, что `send_emails` с размером пачки меньше 1 '
+            'не забирает письма из очереди.'
+        )
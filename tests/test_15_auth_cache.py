@@ -0,0 +1,53 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15AuthenticationCache:
+
+    USERS_URL = '/api/v1/users/'
+    USERS_DETAIL_URL_TEMPLATE = '/api/v1/users/{username}/'
+    USERS_ME_URL = '/api/v1/users/me/'
+
+    def user_queries(self, client, url, expected_status=HTTPStatus.OK):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == expected_status
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('SELECT') and 'users_user' in query['sql']
+        ]
+
+    def test_01_user_is_not_reloaded(self, user_client):
+        user_client.get(self.USERS_ME_URL)
+        queries = self.user_queries(user_client, self.USERS_ME_URL)
+        assert not queries, (
+            'Проверьте, что повторный запрос с тем же токеном не получает '
+            f'пользователя из БД. Запросы: {queries}'
+        )
+
+    def test_02_role_change_applies_immediately(self, admin_client,
+                                                user_client, user):
+        self.user_queries(user_client, self.USERS_URL, HTTPStatus.FORBIDDEN)
+        response = admin_client.patch(
+            self.USERS_DETAIL_URL_TEMPLATE.format(username=user.username),
+            data={'role': 'admin'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        self.user_queries(user_client, self.USERS_URL, HTTPStatus.OK)
+
+    def test_03_deleted_user_is_rejected(self, admin_client, user_client,
+                                         user):
+        self.user_queries(user_client, self.USERS_ME_URL)
+        response = admin_client.delete(
+            self.USERS_DETAIL_URL_TEMPLATE.format(username=user.username)
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = user_client.get(self.USERS_ME_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что токен удаленного пользователя перестает '
+            'действовать сразу после удаления.'
+        )
@@ -0,0 +1,70 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from reviews.models import Review, Title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16Benchmark:
+
+    def test_01_reviews_scenario(self, capsys):
+        # Тестовая БД SQLite в памяти не допускает параллельной записи
+        call_command('benchmark', 'reviews', '--requests', '4',
+                     '--concurrency', '1', '--use-default-db')
+        output = capsys.readouterr().out
+        assert '4 запросов' in output and 'ошибок: 0' in output, (
+            'Проверьте, что сценарий `reviews` команды `benchmark` '
+            f'выполняет все запросы без ошибок. Вывод: {output}'
+        )
+        assert not Title.objects.exists() and not Review.objects.exists(), (
+            'Проверьте, что команда `benchmark` удаляет данные сценария.'
+        )
+
+    def test_02_search_corpus_needs_benchmark_database(self, capsys):
+        with pytest.raises(CommandError, match='benchmark'):
+            call_command('benchmark', 'search', '--requests', '2',
+                         '--concurrency', '1', '--corpus-size', '20',
+                         '--use-default-db')
+        assert not Review.objects.exists(), (
+            'Проверьте, что сценарий `search` не создает корпус в БД, '
+            'которая не выделена для нагрузочных прогонов.'
+        )
+
+        call_command('benchmark', 'search', '--requests', '2',
+                     '--concurrency', '1', '--corpus-size', '20', '--force',
+                     '--use-default-db')
+        output = capsys.readouterr().out
+        assert '2 запросов' in output and 'ошибок: 0' in output
+        assert not Title.objects.exists() and not Review.objects.exists(), (
+            'Проверьте, что сценарий `search` удаляет корпус после прогона.'
+        )
+
+    def test_03_profiles_on_dedicated_database(self, capsys):
+        # Профили прогоняются в отдельных процессах, каждый в своей
+        # временной БД: тестовая БД не изменяется
+        call_command('benchmark', 'reviews', '--requests', '2',
+                     '--concurrency', '1', '--profile', 'sqlite',
+                     '--profile', 'sqlite-no-reuse')
+        output = capsys.readouterr().out
+        rows = {line.split()[0]: line.split()
+                for line in output.splitlines()[1:]}
+        assert set(rows) == {'sqlite', 'sqlite-no-reuse'}, (
+            'Проверьте, что команда `benchmark --profile` выводит строку '
+            f'сравнения для каждого профиля. Вывод: {output}'
+        )
+        assert all(row[-1] == '0' for row in rows.values()), (
+            'Проверьте, что прогоны профилей выполняются без ошибок. '
+            f'Вывод: {output}'
+        )
+        assert not Title.objects.exists() and not Review.objects.exists()
+
+    @pytest.mark.parametrize('args', [
+        ('--requests', '0'),
+        ('--concurrency', '0'),
+        ('--requests', '-1', '--profile', 'sqlite'),
+        ('--batch-size', '0'),
+    ])
+    def test_04_invalid_options(self, args):
+        with pytest.raises(CommandError, match='не меньше 1'):
+            call_command('benchmark', 'reviews', *args)
@@ -0,0 +1,65 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def replica(settings):
+    """Реплика - отдельное соединение с той же тестовой БД."""
+    primary = connections['default']
+    connections['replica'] = primary.__class__(
+        primary.settings_dict, alias='replica'
+    )
+    settings.DATABASE_REPLICAS = ['replica']
+    yield connections['replica']
+    connections['replica'].close()
+    del connections['replica']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ReplicaRouting:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def read_queries(self, client, url, replica):
+        with (CaptureQueriesContext(replica) as replica_queries,
+              CaptureQueriesContext(connections['default']) as queries):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return (
+            [query['sql'] for query in replica_queries.captured_queries],
+            [query['sql'] for query in queries.captured_queries
+             if 'reviews_' in query['sql']],
+        )
+
+    def test_01_reads_go_to_replica(self, client, admin_client, replica):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        replica_queries, primary_queries = self.read_queries(
+            client, url, replica
+        )
+        assert replica_queries and not primary_queries, (
+            f'Проверьте, что GET-запрос к `{self.REVIEWS_URL_TEMPLATE}` '
+            'читает данные с реплики.'
+        )
+
+    def test_02_read_your_writes(self, client, admin_client, user_client,
+                                 replica):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'review', 5)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        replica_queries, primary_queries = self.read_queries(
+            user_client, url, replica
+        )
+        assert primary_queries and not replica_queries, (
+            'Проверьте, что после записи клиент читает с основной БД.'
+        )
+        replica_queries, _ = self.read_queries(client, url, replica)
+        assert replica_queries, (
+            'Проверьте, что другие клиенты продолжают читать с реплики.'
+        )
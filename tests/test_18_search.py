@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+
+from reviews.models import Title
+from tests.utils import (
+    create_single_comment,
+    create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18FullTextSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def search(self, client, url, query):
+        response = client.get(url, data={'q': query})
+        assert response.status_code == HTTPStatus.OK
+        return [item['id'] for item in response.json()['results']]
+
+    def test_01_titles_search_ranked(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id']),
+            data={'description': 'Не путать с фильмом Терминатор'}
+        )
+        found = self.search(client, self.TITLES_URL, 'термина')
+        assert found == [titles[0]['id'], titles[1]['id']], (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`q` находит произведения по началу слова в названии и '
+            'описании и ставит совпадения в названии выше.'
+        )
+        assert self.search(client, self.TITLES_URL, 'орешек крепкий') == [
+            titles[1]['id']
+        ]
+        assert self.search(client, self.TITLES_URL, '"OR*') == []
+
+    def test_02_reviews_and_comments_search(self, client, admin_client,
+                                            user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        first, second = titles[0]['id'], titles[1]['id']
+        review = create_single_review(
+            user_client, first, 'Отличные спецэффекты', 8
+        ).json()
+        create_single_review(moderator_client, first, 'Скучный сюжет', 3)
+        create_single_review(user_client, second, 'Тоже спецэффекты', 5)
+        assert self.search(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=first),
+            'спецэффекты'
+        ) == [review['id']], (
+            f'Проверьте, что поиск `{self.REVIEWS_URL_TEMPLATE}` находит '
+            'отзывы только к текущему произведению.'
+        )
+
+        comment = create_single_comment(
+            user_client, first, review['id'], 'Согласен полностью'
+        ).json()
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=first, review_id=review['id']
+        )
+        assert self.search(client, url, 'согласен') == [comment['id']]
+
+        moderator_client.delete(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=first)
+            + f'{review["id"]}/'
+        )
+        assert self.search(
+            client, self.REVIEWS_URL_TEMPLATE.format(title_id=first),
+            'спецэффекты'
+        ) == [], 'Проверьте, что удаленные отзывы пропадают из поиска.'
+
+    def test_03_rebuild_command(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM search_title')
+        Title.objects.filter(id=titles[0]['id']).update(name='Чужой')
+        call_command('rebuild_search_index', '--kind', 'title')
+        assert self.search(client, self.TITLES_URL, 'чужой') == [
+            titles[0]['id']
+        ]
+
+    @pytest.mark.parametrize('batch_size', ['0', '-1'])
+    def test_04_rebuild_invalid_batch_size(self, batch_size):
+        with pytest.raises(CommandError):
+            call_command('rebuild_search_index', '--batch-size', batch_size)
@@ -0,0 +1,88 @@
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from reviews.models import Review
+from tests.conftest import MANAGE_PATH
+from tests.utils import create_reviews
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Export:
+
+    EXPORT_URL_TEMPLATE = '/api/v1/export/{table}.{export_format}'
+
+    def export(self, client, table, export_format, **params):
+        url = self.EXPORT_URL_TEMPLATE.format(
+            table=table, export_format=export_format
+        )
+        response = client.get(url, data=params)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос администратора к `{url}` '
+            'возвращает ответ со статусом 200.'
+        )
+        return b''.join(response.streaming_content)
+
+    def test_01_admin_only(self, client, user_client):
+        url = self.EXPORT_URL_TEMPLATE.format(
+            table='review', export_format='csv'
+        )
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(url).status_code == HTTPStatus.FORBIDDEN
+
+    @pytest.mark.parametrize('table', ['category', 'genre', 'review'])
+    def test_02_csv_matches_import_files(self, admin_client, admin, user,
+                                         user_client, table):
+        create_reviews(admin_client, {admin: admin_client, user: user_client})
+        content = self.export(admin_client, table, 'csv').decode()
+        with open(os.path.join(DATA_PATH, f'{table}.csv'),
+                  encoding='utf-8') as file:
+            expected_header = next(csv.reader(file))
+        header, *rows = csv.reader(io.StringIO(content))
+        assert header == expected_header, (
+            'Проверьте, что выгрузка CSV содержит колонки файлов, которые '
+            'загружает команда `download`.'
+        )
+        assert rows
+
+    def test_03_gzip_ndjson_since(self, admin_client, admin, user,
+                                  user_client):
+        create_reviews(admin_client, {admin: admin_client, user: user_client})
+        old_review = Review.objects.order_by('id').first()
+        Review.objects.filter(id=old_review.id).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        since = (timezone.now() - timedelta(days=1)).date().isoformat()
+        url = self.EXPORT_URL_TEMPLATE.format(
+            table='review', export_format='ndjson'
+        ) + '.gz'
+        response = admin_client.get(url, data={'since': since})
+        assert response.status_code == HTTPStatus.OK
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).decode().splitlines()
+        ids = [json.loads(line)['id'] for line in lines]
+        assert ids == list(
+            Review.objects.exclude(id=old_review.id).order_by('id')
+            .values_list('id', flat=True)
+        ), (
+            'Проверьте, что параметр `since` выгружает только записи, '
+            'созданные начиная с указанной даты.'
+        )
+
+        response = admin_client.get(
+            self.EXPORT_URL_TEMPLATE.format(
+                table='genre', export_format='csv'
+            ),
+            data={'since': since}
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
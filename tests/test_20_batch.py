@@ -0,0 +1,126 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20Batch:
+
+    TITLES_BATCH_URL = '/api/v1/titles/batch/'
+    TITLES_SEARCH_URL = '/api/v1/titles/?q=Пакетное'
+    REVIEWS_BATCH_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/batch/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def make_titles(self, count, genres, category):
+        return [
+            {'name': f'Пакетное произведение {idx}', 'year': 2000,
+             'genre': [genre['slug'] for genre in genres],
+             'category': category['slug']}
+            for idx in range(count)
+        ]
+
+    def test_01_admin_only(self, client, user_client):
+        assert client.post(
+            self.TITLES_BATCH_URL, data=[], content_type='application/json'
+        ).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.post(
+            self.TITLES_BATCH_URL, data=[], format='json'
+        ).status_code == HTTPStatus.FORBIDDEN
+
+    def test_02_titles_batch(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        # Кэш списка заполняется до пакетного создания
+        assert admin_client.get(self.TITLES_SEARCH_URL).json()['count'] == 0
+        items = self.make_titles(3, genres, categories[0])
+        items.insert(1, {**items[0], 'genre': ['unknown']})
+        items.append('not an object')
+
+        with CaptureQueriesContext(connection) as small:
+            admin_client.post(self.TITLES_BATCH_URL, data=items[:2],
+                              format='json')
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.TITLES_BATCH_URL, data=items,
+                                         format='json')
+        assert len(context.captured_queries) == len(small.captured_queries), (
+            f'Проверьте, что число запросов к БД при POST-запросе к '
+            f'`{self.TITLES_BATCH_URL}` не зависит от размера пачки.'
+        )
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        data = response.json()
+        assert data['created'] == 3
+        assert [item['status'] for item in data['results']] == [
+            201, 400, 201, 201, 400
+        ], (
+            f'Проверьте, что POST-запрос к `{self.TITLES_BATCH_URL}` '
+            'возвращает результат для каждого элемента в порядке запроса.'
+        )
+        assert 'genre' in data['results'][1]['errors']
+        created = data['results'][0]['data']
+        detail = admin_client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=created['id'])
+        ).json()
+        assert created == detail
+        assert len(detail['genre']) == len(genres)
+        assert admin_client.get(
+            self.TITLES_SEARCH_URL
+        ).json()['count'] == 4, (
+            'Проверьте, что пакетное создание сбрасывает кэш списка '
+            'произведений и обновляет индекс поиска.'
+        )
+
+    def test_03_invalid_body(self, admin_client):
+        for data in ({'name': 'Не список'}, []):
+            response = admin_client.post(self.TITLES_BATCH_URL, data=data,
+                                         format='json')
+            assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_04_reviews_batch(self, admin_client, admin, user, moderator):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        Review.objects.create(title_id=title_id, author=moderator,
+                              text='Уже есть', score=1)
+        url = self.REVIEWS_BATCH_URL_TEMPLATE.format(title_id=title_id)
+        response = admin_client.post(url, data=[
+            {'author': admin.username, 'text': 'Отзыв', 'score': 10},
+            {'author': user.username, 'text': 'Отзыв', 'score': 5},
+            {'author': user.username, 'text': 'Повтор', 'score': 5},
+            {'author': moderator.username, 'text': 'Повтор', 'score': 5},
+            {'author': 'nobody', 'text': 'Отзыв', 'score': 5},
+            {'author': admin.username, 'text': 'Отзыв', 'score': 11},
+        ], format='json')
+        assert response.status_code == HTTPStatus.MULTI_STATUS
+        results = response.json()['results']
+        assert [item['status'] for item in results] == [
+            201, 201, 400, 400, 400, 400
+        ], (
+            f'Проверьте, что POST-запрос к `{self.REVIEWS_BATCH_URL_TEMPLATE}`'
+            ' отклоняет повторные отзывы, неизвестных авторов и неверные '
+            'оценки.'
+        )
+        assert results[0]['data']['author'] == admin.username
+        title = Title.objects.get(id=title_id)
+        assert (title.review_count, title.score_sum, title.rating) == (
+            3, 16, 5
+        ), 'Проверьте, что пакетное создание отзывов обновляет рейтинг.'
+        assert (title.score_1, title.score_5, title.score_10) == (1, 1, 1), (
+            'Проверьте, что пакетное создание отзывов обновляет гистограмму '
+            'оценок.'
+        )
+
+    def test_05_benchmark_scenarios(self, capsys):
+        for scenario in ('titles', 'titles-batch'):
+            call_command('benchmark', scenario, '--requests', '2',
+                         '--concurrency', '1', '--batch-size', '5',
+                         '--use-default-db')
+            output = capsys.readouterr().out
+            assert 'ошибок: 0' in output, (
+                f'Проверьте, что сценарий `{scenario}` команды `benchmark` '
+                f'выполняет все запросы без ошибок. Вывод: {output}'
+            )
+        assert not Title.objects.exists()
@@ -0,0 +1,96 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.throttling import SlidingWindowThrottle
+from users.models import VerifyCode
+
+SIGNUP_URL = '/api/v1/auth/signup/'
+TOKEN_URL = '/api/v1/auth/token/'
+
+
+@pytest.fixture(autouse=True)
+def frozen_timer(monkeypatch):
+    # Середина окна: переход через границу окна во время теста
+    # сделал бы число разрешенных запросов случайным
+    monkeypatch.setattr(SlidingWindowThrottle, 'timer',
+                        staticmethod(lambda: 60 * 1_000_000 + 30))
+
+
+@pytest.fixture
+def throttle_rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {'auth_ip': '5/min',
+                                   'auth_username': '3/min'},
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Throttling:
+
+    def signup(self, client, idx, ip='10.0.0.1'):
+        return client.post(
+            SIGNUP_URL,
+            data={'username': f'user{idx}', 'email': f'user{idx}@yamdb.fake'},
+            REMOTE_ADDR=ip,
+        )
+
+    def test_01_signup_throttled_by_ip(self, client, throttle_rates):
+        statuses = [self.signup(client, idx).status_code for idx in range(6)]
+        assert statuses == [HTTPStatus.OK] * 5 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ], (
+            f'Проверьте, что POST-запросы к `{SIGNUP_URL}` с одного IP '
+            'сверх лимита получают ответ со статусом 429.'
+        )
+        response = self.signup(client, 6)
+        assert response.headers['Retry-After'] == '30'
+        assert self.signup(client, 6, ip='10.0.0.2').status_code == (
+            HTTPStatus.OK
+        ), 'Проверьте, что лимит считается отдельно для каждого IP.'
+
+    def test_02_token_throttled_by_username(self, client, user,
+                                            throttle_rates):
+        VerifyCode.objects.create(user=user, code='12345')
+        statuses, writes = [], []
+        for idx in range(10):
+            with CaptureQueriesContext(connection) as context:
+                response = client.post(
+                    TOKEN_URL,
+                    data={'username': user.username,
+                          'confirmation_code': 'wrong'},
+                    REMOTE_ADDR=f'10.0.1.{idx}',
+                )
+            statuses.append(response.status_code)
+            writes.extend(
+                query['sql'] for query in context.captured_queries
+                if query['sql'].startswith(('INSERT', 'UPDATE', 'DELETE'))
+            )
+        assert statuses == [HTTPStatus.BAD_REQUEST] * 3 + [
+            HTTPStatus.TOO_MANY_REQUESTS
+        ] * 7, (
+            f'Проверьте, что POST-запросы к `{TOKEN_URL}` для одного '
+            'пользователя ограничены независимо от IP.'
+        )
+        assert len(writes) == 3 and all(
+            '"failed_attempt" = ("users_verifycode"."failed_attempt" + 1)'
+            in sql for sql in writes
+        ), (
+            'Проверьте, что неудачная попытка увеличивает счетчик одним '
+            f'атомарным UPDATE. Запросы на запись: {writes}'
+        )
+        assert VerifyCode.objects.get(user=user).failed_attempt == 3
+
+    def test_03_token_attack_benchmark(self, capsys):
+        call_command('benchmark', 'token-attack', '--requests', '30',
+                     '--concurrency', '1', '--use-default-db')
+        output = capsys.readouterr().out
+        assert 'ошибок: 0' in output
+        assert 'запросов на запись в БД: 5' in output, (
+            'Проверьте, что сценарий `token-attack` пишет в БД не больше '
+            f'лимита попыток для одного пользователя. Вывод: {output}'
+        )
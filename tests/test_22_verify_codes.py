@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from api.services.verify_codes import purge_codes
+from users.models import VerifyCode
+
+
+@pytest.fixture
+def codes(user):
+    expired = VerifyCode.objects.bulk_create(
+        VerifyCode(user=user, code=str(idx),
+                   expires_at=timezone.now() - timedelta(minutes=1))
+        for idx in range(3)
+    )
+    used = VerifyCode.objects.bulk_create(
+        VerifyCode(user=user, code=str(idx), is_used=True,
+                   expires_at=timezone.now() + timedelta(hours=1))
+        for idx in range(2)
+    )
+    active = VerifyCode.objects.create(user=user, code='12345')
+    return expired + used, active
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22VerifyCodes:
+
+    def test_01_purge_command(self, codes, capsys):
+        _, active = codes
+        call_command('purge_codes', '--batch-size', '2')
+        output = capsys.readouterr().out
+        assert list(VerifyCode.objects.values_list('id', flat=True)) == [
+            active.id
+        ], (
+            'Проверьте, что команда `purge_codes` удаляет использованные '
+            'и истекшие коды и оставляет действующие.'
+        )
+        assert 'Удалено кодов: 5 (3 пачек' in output
+        assert 'в таблице: 1, из них устаревших: 0' in output
+
+    def test_02_purge_bounded_batches(self, codes):
+        report = purge_codes(batch_size=2, max_batches=1)
+        assert (report.purged, report.batches) == (2, 1), (
+            'Проверьте, что очистка кодов удаляет не больше `batch_size` '
+            'кодов за пачку.'
+        )
+        assert VerifyCode.objects.count() == 4
+
+    def test_03_token_lookup_index(self, user):
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, VerifyCode._meta.db_table
+            )
+        assert any(
+            index['columns'] == ['user_id', 'is_used']
+            for index in indexes.values()
+        ), (
+            'Проверьте, что для поиска неиспользованного кода пользователя '
+            'есть индекс по полям (user, is_used).'
+        )
@@ -0,0 +1,91 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+
+from api.services.metrics import REGISTRY
+from tests.utils import create_titles
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    REGISTRY.clear()
+    yield
+    REGISTRY.clear()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Metrics:
+
+    TITLES_URL = '/api/v1/titles/'
+    METRICS_URL = '/metrics/'
+
+    def parse_server_timing(self, response):
+        assert 'Server-Timing' in response.headers, (
+            'Проверьте, что ответ API содержит заголовок `Server-Timing`.'
+        )
+        return {
+            name: params
+            for name, params in (
+                metric.strip().split(';', 1)
+                for metric in response.headers['Server-Timing'].split(',')
+            )
+        }
+
+    def test_01_server_timing(self, admin_client):
+        create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(self.TITLES_URL)
+        assert response.status_code == HTTPStatus.OK
+        timing = self.parse_server_timing(response)
+        assert {'total', 'sql', 'auth', 'serializer', 'view'} <= set(timing)
+        assert timing['view'] == 'desc="titles-list"'
+        queries = re.search(r'desc="(\d+) queries"', timing['sql']).group(1)
+        assert int(queries) == len(context.captured_queries), (
+            'Проверьте, что `Server-Timing` содержит количество запросов '
+            'к БД, выполненных при обработке запроса.'
+        )
+
+    def test_02_prometheus_endpoint(self, client, admin_client):
+        create_titles(admin_client)
+        for _ in range(2):
+            client.get(self.TITLES_URL)
+        response = client.get(self.METRICS_URL)
+        assert response.status_code == HTTPStatus.OK
+        content = response.content.decode()
+        labels = '{view="titles-list",method="GET"}'
+        assert f'yamdb_request_duration_seconds_count{labels} 2' in content, (
+            f'Проверьте, что `{self.METRICS_URL}` отдает гистограммы времени '
+            'запросов по маршрутам в формате Prometheus.'
+        )
+        assert (
+            'yamdb_request_sql_queries_bucket'
+            '{view="titles-list",method="GET",le="+Inf"} 2'
+        ) in content
+        assert 'view="metrics"' not in content
+
+    def test_03_metrics_restricted(self, client):
+        response = client.get(self.METRICS_URL, REMOTE_ADDR='10.0.0.1')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что `{self.METRICS_URL}` недоступен с адресов, '
+            'не указанных в METRICS_ALLOWED_IPS.'
+        )
+
+    @pytest.mark.parametrize('async_views', [False, True])
+    def test_04_asgi_sql_count(self, admin_client, settings, async_views):
+        create_titles(admin_client)
+        settings.ASYNC_READ_VIEWS = async_views
+        for url in (self.TITLES_URL, '/api/v1/categories/'):
+            response = async_to_sync(AsyncClient().get)(url)
+            assert response.status_code == HTTPStatus.OK
+            timing = self.parse_server_timing(response)
+            queries = re.search(
+                r'desc="(\d+) queries"', timing['sql']).group(1)
+            assert int(queries) > 0, (
+                'Проверьте, что под ASGI `Server-Timing` учитывает запросы '
+                'к БД, выполненные в потоках sync_to_async.'
+            )
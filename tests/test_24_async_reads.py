@@ -0,0 +1,113 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import AsyncClient
+
+from api.async_views import AsyncReadHandler
+from tests.utils import create_comments
+
+
+@pytest.fixture
+def handled(monkeypatch):
+    """Запросы, обработанные асинхронно."""
+    calls = []
+    handle = AsyncReadHandler.handle
+
+    async def spy(self, request, action, kwargs):
+        calls.append(request.get_full_path())
+        return await handle(self, request, action, kwargs)
+
+    monkeypatch.setattr(AsyncReadHandler, 'handle', spy)
+    return calls
+
+
+@pytest.fixture
+def urls(admin_client, admin, user_client, user):
+    comments, reviews, titles = create_comments(
+        admin_client, {admin: admin_client, user: user_client}
+    )
+    title_id, review_id = titles[0]['id'], reviews[0]['id']
+    reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+    comments_url = f'{reviews_url}{review_id}/comments/'
+    return [
+        '/api/v1/titles/',
+        '/api/v1/titles/?limit=1&offset=1',
+        f'/api/v1/titles/{title_id}/',
+        '/api/v1/titles/0/',
+        '/api/v1/categories/',
+        '/api/v1/genres/',
+        reviews_url,
+        f'{reviews_url}{review_id}/',
+        '/api/v1/titles/0/reviews/',
+        comments_url,
+        f'{comments_url}{comments[0]["id"]}/',
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24AsyncReads:
+
+    def async_get(self, url, **headers):
+        return async_to_sync(AsyncClient().get)(url, headers=headers)
+
+    def test_01_async_matches_sync(self, client, settings, urls, handled):
+        expected = {}
+        for url in urls:
+            response = client.get(url)
+            expected[url] = (response.status_code, response.json())
+        settings.ASYNC_READ_VIEWS = True
+        for url in urls:
+            response = self.async_get(url)
+            assert (response.status_code, response.json()) == expected[url], (
+                f'Проверьте, что асинхронный GET-запрос к `{url}` возвращает '
+                'тот же ответ, что и синхронный.'
+            )
+        assert handled == urls, (
+            'Проверьте, что при ASYNC_READ_VIEWS анонимные GET-запросы без '
+            'фильтров обрабатываются асинхронно.'
+        )
+
+    def test_02_unsupported_requests_delegated(self, settings, urls,
+                                               handled, admin_client,
+                                               user_client):
+        settings.ASYNC_READ_VIEWS = True
+        response = self.async_get(f'{urls[0]}?year=1984')
+        assert response.status_code == HTTPStatus.OK
+        assert {title['year'] for title in response.json()['results']} == {
+            1984
+        }
+        response = self.async_get(
+            urls[0], Authorization=user_client._credentials[
+                'HTTP_AUTHORIZATION'
+            ]
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert handled == [], (
+            'Проверьте, что запросы с фильтрами и токеном обрабатывает '
+            'синхронный вьюсет.'
+        )
+        response = admin_client.post(
+            '/api/v1/categories/', data={'name': 'Новая', 'slug': 'new'}
+        )
+        assert response.status_code == HTTPStatus.CREATED
+        slugs = [
+            category['slug']
+            for category in self.async_get('/api/v1/categories/').json()[
+                'results'
+            ]
+        ]
+        assert 'new' in slugs, (
+            'Проверьте, что асинхронное чтение видит изменения каталога.'
+        )
+
+    def test_03_benchmark_scenarios(self, capsys):
+        for scenario in ('catalogue', 'catalogue-async'):
+            call_command('benchmark', scenario, '--requests', '4',
+                         '--concurrency', '1', '--use-default-db')
+            output = capsys.readouterr().out
+            assert '4 запросов' in output and 'ошибок: 0' in output, (
+                f'Проверьте, что сценарий `{scenario}` команды `benchmark` '
+                f'выполняет все запросы без ошибок. Вывод: {output}'
+            )
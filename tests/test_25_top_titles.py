@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Genre, Review, Title, TitleRanking
+
+TOP_URL = '/api/v1/titles/top/'
+
+
+@pytest.fixture
+def catalogue(django_user_model):
+    """Произведения с оценками: рейтинг 9 у двух произведений с разным
+    количеством отзывов, 5 у третьего, четвертое без отзывов."""
+    films = Category.objects.create(name='Фильм', slug='films')
+    books = Category.objects.create(name='Книга', slug='books')
+    drama = Genre.objects.create(name='Драма', slug='drama')
+    comedy = Genre.objects.create(name='Комедия', slug='comedy')
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+        )
+        for idx in range(3)
+    ]
+    titles = {}
+    for name, year, category, genres, scores in (
+        ('one', 2000, films, [drama], [9]),
+        ('two', 2001, films, [drama, comedy], [9, 9, 9]),
+        ('three', 2000, books, [comedy], [5, 5]),
+        ('four', 2000, books, [drama], []),
+    ):
+        title = Title.objects.create(name=name, year=year, category=category)
+        title.genre.set(genres)
+        for author, score in zip(authors, scores):
+            Review.objects.create(title=title, author=author, text='text',
+                                  score=score)
+        titles[name] = title
+    return titles
+
+
+def top_names(client, query=''):
+    response = client.get(f'{TOP_URL}{query}')
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{TOP_URL}{query}` возвращает ответ '
+        'со статусом 200.'
+    )
+    return [title['name'] for title in response.json()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25TopTitles:
+
+    def test_01_order_and_filters(self, client, catalogue):
+        assert top_names(client) == ['two', 'one', 'three'], (
+            f'Проверьте, что `{TOP_URL}` упорядочивает произведения по '
+            'убыванию рейтинга, при равном рейтинге - по количеству '
+            'отзывов, и не включает произведения без оценок.'
+        )
+        for query, expected in (
+            ('?genre=comedy', ['two', 'three']),
+            ('?genre=DRAMA', ['two', 'one']),
+            ('?category=books', ['three']),
+            ('?year=2000', ['one', 'three']),
+            ('?genre=drama&category=films&year=2001', ['two']),
+            ('?genre=unknown', []),
+            ('?limit=1', ['two']),
+        ):
+            assert top_names(client, query) == expected, (
+                f'Проверьте фильтры `{TOP_URL}`: запрос `{query}` должен '
+                f'вернуть {expected}.'
+            )
+
+    def test_02_single_query(self, client, catalogue):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{TOP_URL}?genre=drama&limit=2')
+        queries = [query['sql'] for query in context.captured_queries]
+        assert len(queries) == 1 and 'reviews_titleranking' in queries[0], (
+            f'Проверьте, что `{TOP_URL}` читает список одним запросом '
+            f'к строкам рейтинга. Сейчас: {queries}'
+        )
+        assert response.json()[0] == client.get(
+            '/api/v1/titles/?name=two').json()['results'][0], (
+            f'Проверьте, что `{TOP_URL}` возвращает произведения в том же '
+            'виде, что и `/api/v1/titles/`.'
+        )
+
+    def test_03_rankings_follow_changes(self, client, catalogue,
+                                        django_user_model):
+        four = catalogue['four']
+        Review.objects.create(
+            title=four, text='text', score=10,
+            author=django_user_model.objects.create_user(
+                username='late', email='late@yamdb.fake'
+            )
+        )
+        assert top_names(client, '?genre=drama') == ['four', 'two', 'one'], (
+            'Проверьте, что новый отзыв обновляет рейтинг в списке лучших.'
+        )
+        four.genre.set([Genre.objects.get(slug='comedy')])
+        assert top_names(client, '?genre=drama') == ['two', 'one']
+        assert top_names(client, '?genre=comedy') == ['four', 'two', 'three'], (
+            'Проверьте, что изменение жанров произведения обновляет '
+            'списки лучших по жанрам.'
+        )
+        four.refresh_from_db()
+        four.year = 2001
+        four.save()
+        assert top_names(client, '?year=2001') == ['four', 'two']
+        catalogue['two'].reviews.all().delete()
+        assert top_names(client) == ['four', 'one', 'three'], (
+            'Проверьте, что удаление отзывов убирает произведение из '
+            'списка лучших.'
+        )
+
+    def test_04_rebuild_command(self, client, catalogue):
+        expected = top_names(client, '?genre=drama')
+        TitleRanking.objects.all().delete()
+        call_command('rebuild_title_rankings')
+        assert top_names(client, '?genre=drama') == expected
+        assert TitleRanking.objects.count() == 4 + 5, (
+            'Проверьте, что у произведения есть общая строка рейтинга '
+            'и по строке на каждый жанр.'
+        )
+
+    @pytest.mark.parametrize('query', ['?limit=0', '?limit=101', '?year=x'])
+    def test_05_invalid_params(self, client, catalogue, query):
+        response = client.get(f'{TOP_URL}{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{TOP_URL}{query}` возвращает '
+            'ответ со статусом 400.'
+        )
+
+    def test_06_ordering_fields(self, client, catalogue):
+        response = client.get('/api/v1/titles/?ordering=-rating,name')
+        assert [title['name'] for title in response.json()['results']][
+            :3] == ['one', 'two', 'three'], (
+            'Проверьте, что список произведений сортируется по рейтингу '
+            'параметром `ordering`.'
+        )
+
+    def test_07_rebuild_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command('rebuild_title_rankings', '--batch-size', '0')
@@ -0,0 +1,151 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import SCORE_FIELDS, Review, Title
+
+
+def empty_histogram(**counts):
+    return {str(score): counts.get(f'score_{score}', 0)
+            for score in SCORE_FIELDS}
+
+
+@pytest.fixture
+def title(django_user_model):
+    title = Title.objects.create(name='Произведение', year=2000)
+    for idx, score in enumerate((3, 3, 8)):
+        Review.objects.create(
+            title=title, text='text', score=score,
+            author=django_user_model.objects.create_user(
+                username=f'critic{idx}', email=f'critic{idx}@yamdb.fake'
+            )
+        )
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26ScoreStats:
+
+    STATS_URL_TEMPLATE = '/api/v1/titles/{title_id}/stats/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    def get_stats(self, client, title):
+        response = client.get(self.STATS_URL_TEMPLATE.format(
+            title_id=title.id))
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос к `{self.STATS_URL_TEMPLATE}` '
+            'возвращает ответ со статусом 200.'
+        )
+        return response.json()
+
+    def test_01_stats(self, client, title):
+        with CaptureQueriesContext(connection) as context:
+            stats = self.get_stats(client, title)
+        assert stats == {
+            'id': title.id,
+            'rating': 5,
+            'review_count': 3,
+            'average': 4.67,
+            'score_histogram': empty_histogram(score_3=2, score_8=1),
+        }, (
+            f'Проверьте, что `{self.STATS_URL_TEMPLATE}` возвращает рейтинг, '
+            'количество отзывов, среднюю оценку и гистограмму оценок.'
+        )
+        queries = [query['sql'] for query in context.captured_queries]
+        assert len(queries) == 1 and 'reviews_review' not in queries[0], (
+            f'Проверьте, что `{self.STATS_URL_TEMPLATE}` читает статистику '
+            f'из счетчиков произведения одним запросом. Сейчас: {queries}'
+        )
+        detail = client.get(self.TITLE_DETAIL_URL_TEMPLATE.format(
+            title_id=title.id)).json()
+        assert detail['score_histogram'] == stats['score_histogram'], (
+            f'Проверьте, что `{self.TITLE_DETAIL_URL_TEMPLATE}` содержит '
+            'гистограмму оценок произведения.'
+        )
+        response = client.get(self.STATS_URL_TEMPLATE.format(title_id=0))
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_histogram_follows_reviews(self, client, title):
+        review = Review.objects.get(title=title, score=8)
+        review.score = 3
+        review.save()
+        assert self.get_stats(client, title)['score_histogram'] == (
+            empty_histogram(score_3=3)
+        ), 'Проверьте, что изменение оценки обновляет гистограмму.'
+        Review.objects.filter(title=title).first().delete()
+        stats = self.get_stats(client, title)
+        assert stats['score_histogram'] == empty_histogram(score_3=2), (
+            'Проверьте, что удаление отзыва обновляет гистограмму.'
+        )
+        Review.objects.filter(title=title).delete()
+        assert self.get_stats(client, title) == {
+            'id': title.id, 'rating': None, 'review_count': 0,
+            'average': None, 'score_histogram': empty_histogram(),
+        }
+
+    def test_03_deferred_recount(self, settings, client, title,
+                                 django_user_model):
+        settings.RATING_UPDATE_MODE = 'worker'
+        Review.objects.create(
+            title=title, text='text', score=10,
+            author=django_user_model.objects.create_user(
+                username='late', email='late@yamdb.fake'
+            )
+        )
+        call_command('flush_ratings')
+        assert self.get_stats(client, title)['score_histogram'] == (
+            empty_histogram(score_3=2, score_8=1, score_10=1)
+        ), (
+            'Проверьте, что отложенный пересчет рейтинга обновляет '
+            'гистограмму оценок.'
+        )
+
+    def test_04_rebuild_command(self, client, title):
+        expected = self.get_stats(client, title)
+        Title.objects.update(**dict.fromkeys(SCORE_FIELDS.values(), 0))
+        call_command('rebuild_score_histograms', '--batch-size', '1')
+        assert self.get_stats(client, title) == expected, (
+            'Проверьте, что команда rebuild_score_histograms '
+            'восстанавливает гистограммы оценок.'
+        )
+        Title.objects.update(**dict.fromkeys(SCORE_FIELDS.values(), 0))
+        call_command('recount_ratings')
+        title.refresh_from_db()
+        assert title.score_histogram == {
+            int(score): count
+            for score, count in expected['score_histogram'].items()
+        }, 'Проверьте, что команда recount_ratings пересчитывает гистограмму.'
+
+    def test_05_one_recount_query(self, title):
+        other = Title.objects.create(name='Другое', year=2000, score_sum=5)
+        Title.objects.update(**dict.fromkeys(SCORE_FIELDS.values(), 0))
+        with CaptureQueriesContext(connection) as context:
+            Title.objects.filter(id=title.id).recount_ratings()
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "reviews_title"')]
+        assert len(updates) == 1, (
+            'Проверьте, что recount_ratings пересчитывает счетчики одним '
+            'сгруппированным UPDATE-запросом.'
+        )
+        title.refresh_from_db()
+        other.refresh_from_db()
+        assert (title.score_sum, title.review_count, title.rating) == (
+            14, 3, 5)
+        assert title.score_histogram == {
+            score: {3: 2, 8: 1}.get(score, 0) for score in SCORE_FIELDS}
+        assert other.score_sum == 5, (
+            'Проверьте, что recount_ratings пересчитывает только '
+            'произведения из queryset.'
+        )
+        assert [
+            field.name for field in Title._meta.get_fields()
+            if field.name.startswith('score_') and field.name != 'score_sum'
+        ] == list(SCORE_FIELDS.values())
+
+    def test_06_rebuild_invalid_batch_size(self):
+        with pytest.raises(CommandError):
+            call_command('rebuild_score_histograms', '--batch-size', '0')
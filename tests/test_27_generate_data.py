@@ -0,0 +1,79 @@
+from collections import Counter
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Sum
+
+from reviews.models import Comment, Review, Title, TitleRanking, TitleSnapshot
+from users.models import User
+
+SIZES = ('--users', '40', '--titles', '30', '--categories', '3',
+         '--genres', '5', '--reviews', '400', '--comments', '50')
+
+
+def generate(*args):
+    call_command('generate_data', *SIZES, *args)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27GenerateData:
+
+    def read_files(self, path):
+        return {file.name: file.read_text(encoding='utf-8')
+                for file in sorted(path.iterdir())}
+
+    def test_01_csv_is_deterministic(self, tmp_path):
+        for name, seed in (('first', '1'), ('second', '1'), ('other', '2')):
+            generate('--output', str(tmp_path / name), '--seed', seed)
+        first = self.read_files(tmp_path / 'first')
+        assert set(first) == {
+            f'{table}.csv' for table in ('user', 'category', 'genre', 'title',
+                                         'title_genre', 'review', 'comment')
+        }, 'Проверьте, что generate_data создает все CSV файлы download.'
+        assert first == self.read_files(tmp_path / 'second'), (
+            'Проверьте, что при одинаковом seed generate_data создает '
+            'одинаковые данные.'
+        )
+        assert first != self.read_files(tmp_path / 'other')
+
+    def test_02_csv_loads_with_download(self, tmp_path, capsys):
+        generate('--output', str(tmp_path))
+        call_command('download', str(tmp_path))
+        assert 'Ошибка' not in capsys.readouterr().out
+        assert (User.objects.count(), Title.objects.count(),
+                Review.objects.count(), Comment.objects.count()) == (
+            40, 30, 400, 50
+        ), 'Проверьте, что CSV файлы generate_data загружает команда download.'
+
+    def test_03_generate_into_db(self, admin):
+        generate('--no-search-index')
+        generate('--prefix', 'more', '--seed', '1')
+        assert Review.objects.count() == 800 and User.objects.count() == 81, (
+            'Проверьте, что generate_data добавляет записи после уже '
+            'существующих.'
+        )
+        titles = Title.objects.all()
+        assert titles.aggregate(total=Sum('review_count'))['total'] == 800, (
+            'Проверьте, что generate_data пересчитывает рейтинг произведений.'
+        )
+        assert TitleSnapshot.objects.count() == titles.count() == (
+            TitleRanking.objects.filter(genre=None).count()
+        )
+        counts = sorted(Counter(
+            Review.objects.values_list('title_id', flat=True)).values())
+        assert counts[-1] > 5 * counts[len(counts) // 2], (
+            'Проверьте, что отзывы generate_data чаще достаются популярным '
+            'произведениям.'
+        )
+        assert len(set(Review.objects.values_list('pub_date', flat=True))) > 1
+
+    @pytest.mark.parametrize('args', [
+        ('--reviews', '2000'),
+        ('--reviews', '0', '--comments', '1'),
+        ('--users', '-1'),
+        ('--batch-size', '0'),
+    ])
+    def test_04_invalid_sizes(self, args):
+        with pytest.raises(CommandError):
+            call_command('generate_data', *SIZES, *args)
@@ -0,0 +1,137 @@
+import csv
+import os
+import shutil
+from threading import Thread
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Count, Sum
+
+from reviews.models import (
+    Comment,
+    DirtyTitle,
+    Review,
+    Title,
+    TitleRanking,
+    TitleSnapshot,
+)
+from tests.conftest import MANAGE_PATH
+from users.models import User
+
+DATA_PATH = os.path.join(MANAGE_PATH, 'static', 'data')
+
+
+def download(*args):
+    call_command('download', DATA_PATH, *args)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28Download:
+
+    def count_rows(self):
+        return (User.objects.count(), Title.objects.count(),
+                Review.objects.count(), Comment.objects.count())
+
+    def test_01_clean_reloads_data(self, capsys):
+        download()
+        expected = self.count_rows()
+        assert TitleSnapshot.objects.exists() and TitleRanking.objects.exists()
+        DirtyTitle.objects.create(title_id=Title.objects.first().id)
+
+        download('--clean')
+        assert 'Ошибка' not in capsys.readouterr().out
+        assert self.count_rows() == expected, (
+            'Проверьте, что `download --clean` очищает таблицы, которые '
+            'ссылаются на произведения, и загружает данные заново.'
+        )
+        assert not DirtyTitle.objects.exists()
+        assert TitleSnapshot.objects.count() == Title.objects.count()
+
+    def test_02_small_batches(self, capsys):
+        download('--batch-size', '5')
+        assert 'Ошибка' not in capsys.readouterr().out
+        assert (Title.objects.count(), Review.objects.count()) == (32, 72), (
+            'Проверьте, что `download --batch-size` загружает все строки CSV '
+            'файлов, когда их больше размера пачки.'
+        )
+        reviews = Review.objects.values('title').annotate(
+            total=Sum('score'), count=Count('id'))
+        assert reviews
+        for row in reviews:
+            title = Title.objects.get(pk=row['title'])
+            assert (title.score_sum, title.review_count, title.rating) == (
+                row['total'], row['count'],
+                round(row['total'] / row['count'])
+            ), (
+                'Проверьте, что после загрузки пачками рейтинг произведений '
+                'пересчитывается по всем отзывам.'
+            )
+
+    def read_tables(self):
+        # pub_date не сравнивается: auto_now_add проставляет время записи
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT title_id, genre_id FROM reviews_title_genre')
+            title_genre = sorted(cursor.fetchall())
+        return {
+            'title': list(Title.objects.order_by('id').values_list(
+                'id', 'name', 'year', 'category_id', 'score_sum',
+                'review_count', 'rating')),
+            'review': list(Review.objects.order_by('id').values_list(
+                'id', 'title_id', 'author_id', 'score', 'text')),
+            'comment': list(Comment.objects.order_by('id').values_list(
+                'id', 'review_id', 'author_id', 'text')),
+            'title_genre': title_genre,
+        }
+
+    def test_04_parallel_matches_sequential(self, capsys):
+        download()
+        sequential = self.read_tables()
+        assert [len(sequential[table]) for table in (
+            'review', 'title', 'title_genre')] == [72, 32, 42]
+
+        download('--clean', '--workers', '3', '--batch-size', '10')
+        assert 'Ошибка' not in capsys.readouterr().out
+        assert self.read_tables() == sequential, (
+            'Проверьте, что `download --workers` загружает те же данные, '
+            'что и последовательный импорт.'
+        )
+
+    @pytest.mark.parametrize('args', [
+        ('--batch-size', '0'),
+        ('--batch-size', '-1'),
+        ('--workers', '0'),
+    ])
+    def test_03_invalid_options(self, args):
+        with pytest.raises(CommandError):
+            download(*args)
+        assert not Title.objects.exists()
+
+    def test_05_parallel_write_error_does_not_hang(self, capsys, tmp_path):
+        # Повтор отзыва с тем же id: запись таблицы review не удается,
+        # а разбор файла еще не закончен
+        data_path = tmp_path / 'data'
+        shutil.copytree(DATA_PATH, data_path)
+        with open(data_path / 'review.csv', encoding='utf-8') as file:
+            rows = list(csv.reader(file))
+        rows.insert(5, rows[3])
+        with open(data_path / 'review.csv', 'w', encoding='utf-8',
+                  newline='') as file:
+            csv.writer(file).writerows(rows)
+
+        command = Thread(target=call_command, daemon=True, args=(
+            'download', str(data_path), '--workers', '2', '--batch-size', '1'))
+        command.start()
+        command.join(timeout=60)
+        assert not command.is_alive(), (
+            'Проверьте, что `download --workers` завершается, если запись '
+            'таблицы не удалась.'
+        )
+        output = capsys.readouterr().out
+        assert 'UNIQUE constraint failed' in output
+        assert not Review.objects.exists()
+        assert Title.genre.through.objects.count() == 42, (
+            'Проверьте, что после ошибки записи таблицы `download --workers` '
+            'загружает следующие таблицы.'
+        )